@@ -1,10 +1,11 @@
+import os
+import sys
 import uvicorn
 from fastapi import FastAPI
 import datetime
 import time
 from loguru import logger
 from pydantic import BaseModel
-from openai import OpenAI
 
 HOST = "0.0.0.0"
 PORT = 8000
@@ -20,11 +21,19 @@ app = FastAPI()
 start_time = time.time()
 
 
-# Create OpenAI client pointing to local ollama instance
-client = OpenAI(
-    base_url="http://localhost:11434/v1",
-    api_key="dummy"  # ollama doesn't require real API key
-)
+# OpenAI client pointing to local ollama instance. Created on the first request:
+# importing openai is slow and it is only needed once a statement arrives
+client = None
+
+def get_client():
+    global client
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI(
+            base_url="http://localhost:11434/v1",
+            api_key="dummy"  # ollama doesn't require real API key
+        )
+    return client
 
 @app.get('/api')
 def hello():
@@ -74,7 +83,7 @@ def predict_llm(statement: str, model_name="llama3.2:3b") -> bool:
     
 
     try:
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model=model_name,
             messages=[
                 {
@@ -109,6 +118,12 @@ def predict_llm(statement: str, model_name="llama3.2:3b") -> bool:
 
 if __name__ == '__main__':
 
+    if "--profile-startup" in sys.argv:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+        from startup_profile import print_startup_profile
+        print_startup_profile(__file__)
+        sys.exit(0)
+
     uvicorn.run(
         'api:app',
         host=HOST,
@@ -1,9 +1,29 @@
 # api_rl.py
-import time, datetime, os
-from fastapi import FastAPI, Body
-from dtos import RaceCarPredictRequestDto, RaceCarPredictResponseDto
-from stable_baselines3 import PPO
+import time
+STARTUP_TIMES = {}  # phase -> seconds spent loading this module, see --profile-startup
+_phase_start = time.perf_counter()
+
+def _startup_phase(name: str):
+    global _phase_start
+    now = time.perf_counter()
+    STARTUP_TIMES[name] = now - _phase_start
+    _phase_start = now
+
+import asyncio, datetime, os, sys, threading
+from typing import List
+from fastapi import FastAPI, Body, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+from dtos import (RaceCarPredictRequestDto, RaceCarPredictResponseDto,
+                  RaceCarPredictBatchRequestDto, RaceCarPredictBatchResponseDto)
+from batching import MicroBatcher
+from src.game.core import ACTIONS, SENSOR_ORDER
+from src.game.wire import MEDIA_TYPE, decode_request, encode_actions
+from numpy_policy import NumpyPolicy
+from reflex import (ReflexPolicy, PREPARE_FRONT, COMMIT_FRONT, BRAKE_FRONT, HARD_FRONT, SIDE_HARD, SIDE_SAFE,
+                    PREPARE_BACK, BRAKE_SPEED, EMERGENCY_SPEED, TAILGATED_SPEED, CRUISE_SPEED,
+                    CORRIDOR_MARGIN, NARROW_PENALTY, COMMIT_COOLDOWN, DRIFT_COOLDOWN)
 import numpy as np
+_startup_phase("imports")
 
 DEBUG = True
 _debug_counter = 0
@@ -20,21 +40,34 @@ HOST = "0.0.0.0"
 PORT = 9052
 BATCH_LEN = 10  # small, keeps latency low
 
-SENSOR_ORDER = [
-    "left_side","left_side_front","left_front","front_left_front",
-    "front","front_right_front","right_front","right_side_front",
-    "right_side","right_side_back","right_back","back_right_back",
-    "back","back_left_back","left_back","left_side_back",
-]
-ACTIONS = ["ACCELERATE","DECELERATE","STEER_LEFT","STEER_RIGHT","NOTHING"]
-
-# Try loading the model; if missing, fall back to a trivial policy
+# The RL model is loaded the first time the RL policy decides (_rl_model), so a server
+# that answers with the reflex never imports torch / SB3. If it is missing, a trivial
+# fallback policy is used.
+# The NumPy export (python export_policy.py) is preferred: no torch / SB3 import needed
+NUMPY_MODEL_PATH = "models/ppo_racecar.npz"
 MODEL_PATH = "models/ppo_racecar.zip"
-RL_MODEL = PPO.load(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
-if RL_MODEL:
-    print(f"[API] Loaded RL model: {MODEL_PATH}")
-else:
-    print(f"[API] RL model not found at {MODEL_PATH}; using fallback policy.")
+RL_MODEL = None
+_rl_model_loaded = False
+
+def _rl_model():
+    global RL_MODEL, _rl_model_loaded
+    if _rl_model_loaded:
+        return RL_MODEL
+    _rl_model_loaded = True
+    zip_is_newer = (os.path.exists(NUMPY_MODEL_PATH) and os.path.exists(MODEL_PATH)
+                    and os.path.getmtime(MODEL_PATH) > os.path.getmtime(NUMPY_MODEL_PATH))
+    if zip_is_newer:
+        print(f"[API] {MODEL_PATH} is newer than {NUMPY_MODEL_PATH}; ignoring the stale export")
+    if os.path.exists(NUMPY_MODEL_PATH) and not zip_is_newer:
+        RL_MODEL = NumpyPolicy.load(NUMPY_MODEL_PATH)
+        print(f"[API] Loaded RL model: {NUMPY_MODEL_PATH}")
+    elif os.path.exists(MODEL_PATH):
+        from stable_baselines3 import PPO
+        RL_MODEL = PPO.load(MODEL_PATH)
+        print(f"[API] Loaded RL model: {MODEL_PATH} (run export_policy.py for faster startup)")
+    else:
+        print(f"[API] RL model not found at {MODEL_PATH}; using fallback policy.")
+    return RL_MODEL
 
 def _obs_from_request(req: dict) -> np.ndarray:
     sensors = req.get("sensors", {}) or {}
@@ -82,33 +115,46 @@ def _safety_override(req: dict, proposed: str) -> str:
     # Otherwise, accept the model's choice
     return proposed
 
-def _decide(req: dict) -> str:
+def _decide(req: dict, game=None) -> str:
     if USE_REFLEX:
-        return _reflex_decide(req)
+        if not REFLEX_COMPILED:
+            return _reflex_decide(req)
+        with REFLEX_LOCK:
+            return REFLEX.decide(req, _reflex_row(game))
 
     # otherwise: RL + safety net
-    if RL_MODEL is None:
+    model = _rl_model()
+    if model is None:
         proposed = _fallback_policy(req)
     else:
         obs = _obs_from_request(req)
-        action_idx, _ = RL_MODEL.predict(obs, deterministic=True)
+        action_idx, _ = model.predict(obs, deterministic=True)
         proposed = ACTIONS[int(action_idx)]
+    return _checked(req, proposed)
+
+def _checked(req: dict, proposed: str) -> str:
     # safety (in case you switch RL back on)
     return _safety_override(req, proposed) if 'SAFE_FRONT' in globals() else proposed
 
-
-# --- Reflex planner thresholds (pixels) ---
+def _decide_batch(items: List[tuple]) -> List[str]:
+    """Same as _decide for every (game, request) pair, but the model runs once on the whole batch."""
+    if USE_REFLEX and REFLEX_COMPILED:
+        # Every game steers from its own row, so its answers do not depend on what else
+        # shares the batch; a game's repeated requests are decided in order
+        with REFLEX_LOCK:
+            return REFLEX.decide_batch([req for _, req in items], [_reflex_row(game) for game, _ in items])
+    model = None if USE_REFLEX else _rl_model()
+    if model is None:
+        return [_decide(req, game) for game, req in items]
+    reqs = [req for _, req in items]
+    obs = np.stack([_obs_from_request(req) for req in reqs])
+    action_idx, _ = model.predict(obs, deterministic=True)
+    return [_checked(req, ACTIONS[int(a)]) for req, a in zip(reqs, np.atleast_1d(action_idx))]
+
+
+# --- Reflex planner thresholds (pixels) and speeds (px/tick) live in reflex.py ---
 COLLISION      = 320.0      # front crash line (already used)
 SIDE_COLLISION = 120.0      # left/right crash line from car center
-PREPARE_FRONT = 900.0        # start planning when we first see something
-COMMIT_FRONT = 650.0         # definitely start moving over
-BRAKE_FRONT = 420.0          # never accelerate below this
-HARD_FRONT = 340.0           # emergency brake
-
-SIDE_HARD = 140.0  # never steer into a side tighter than this
-SIDE_SAFE = 180.0  # prefer not to steer if corridor is tighter than this
-
-PREPARE_BACK = 450.0         # start reacting to rear cars
 TAILGATE = 260.0             # rear too close
 
 # State to keep steering consistent over multiple ticks
@@ -132,7 +178,7 @@ def _corridor_score_left(s):
     rear  = min(_g(s,"left_back"), _g(s,"left_side_back"), _g(s,"back_left_back"))
     base  = 0.6*ahead + 0.3*side + 0.1*rear
     # hard penalty if the side corridor is below the safe margin
-    if side < SIDE_SAFE: base -= (500.0 - side)
+    if side < SIDE_SAFE: base -= (NARROW_PENALTY - side)
     return base
 
 def _corridor_score_right(s):
@@ -140,7 +186,7 @@ def _corridor_score_right(s):
     side  = _g(s,"right_side")
     rear  = min(_g(s,"right_back"), _g(s,"right_side_back"), _g(s,"back_right_back"))
     base  = 0.6*ahead + 0.3*side + 0.1*rear
-    if side < SIDE_SAFE: base -= (500.0 - side)
+    if side < SIDE_SAFE: base -= (NARROW_PENALTY - side)
     return base
 
 
@@ -168,6 +214,50 @@ def _best_steer(s):
 
 
 USE_REFLEX = True  # set False to let pure RL act (still protected by safety)
+REFLEX_COMPILED = True  # use the vectorised form in reflex.py (same decisions as _reflex_decide below)
+REFLEX = ReflexPolicy(0)
+if not USE_REFLEX:
+    _rl_model()  # The RL policy answers: load it now rather than on the first request
+USE_PLANNER = False  # set True to answer with a tree-searched batch from planner.py instead
+
+# One Planner per game, built on first use (importing it loads the whole game simulation).
+# A /ws connection is one game; plain HTTP requests carry no game id and share the None
+# entry, so /predict and /predict_bin support one planned game at a time.
+PLANNERS = {}  # game -> (Planner, lock held while it plans)
+
+def _planner(game=None):
+    entry = PLANNERS.get(game)
+    if entry is None:
+        from planner import Planner
+        entry = PLANNERS[game] = (Planner(batch_len=BATCH_LEN), threading.Lock())
+    return entry
+
+def _plan(game, req: dict) -> List[str]:
+    planner, lock = _planner(game)
+    with lock:
+        return planner.plan(req)
+
+# One compiled reflex steering row per game, keyed like PLANNERS. /predict_batch requests
+# carry no game id either: the i-th request of every call is game ("batch", i).
+REFLEX_GAMES = {}  # game -> row of REFLEX
+REFLEX_LOCK = threading.Lock()  # Held while REFLEX decides or its rows change
+
+def _reflex_row(game) -> int:
+    row = REFLEX_GAMES.get(game)
+    if row is None:
+        row = REFLEX_GAMES[game] = REFLEX.add_game()
+    return row
+
+def _forget_game(game):
+    PLANNERS.pop(game, None)
+    with REFLEX_LOCK:
+        row = REFLEX_GAMES.pop(game, None)
+        if row is not None:
+            REFLEX.remove_game(row)
+
+# Concurrent /predict and /predict_batch requests are decided together (one model call)
+MICRO_BATCH_MAX = 64
+MICRO_BATCHER = MicroBatcher(_decide_batch, max_batch=MICRO_BATCH_MAX)
 
 def _reflex_decide(req: dict) -> str:
     s = req.get("sensors", {}) or {}
@@ -192,11 +282,11 @@ def _reflex_decide(req: dict) -> str:
         # commit once inside COMMIT_FRONT
         if minF <= COMMIT_FRONT:
             REFLEX_STATE["intent"] = dirn
-            REFLEX_STATE["cooldown"] = 8  # keep steering this way for a bit
+            REFLEX_STATE["cooldown"] = COMMIT_COOLDOWN  # keep steering this way for a bit
         # never accelerate below BRAKE_FRONT
-        if minF <= BRAKE_FRONT and vx > 8.0:
+        if minF <= BRAKE_FRONT and vx > BRAKE_SPEED:
             # if we’re very fast, brake first; otherwise steer
-            return "DECELERATE" if vx > 14.0 else steer
+            return "DECELERATE" if vx > EMERGENCY_SPEED else steer
         # if we already committed, keep steering that way
         # before returning based on intent:
         if REFLEX_STATE["intent"] == "LEFT" and _side_left_min(s) < SIDE_HARD:  REFLEX_STATE["intent"] = None
@@ -206,12 +296,12 @@ def _reflex_decide(req: dict) -> str:
     # 3) REAR danger: don't brake to zero; prefer accelerate or move to space
     if minB <= PREPARE_BACK:
         steer, dirn = _best_steer(s)
-        if vx < 6.0:           # being tailgated and slow -> create space
+        if vx < TAILGATED_SPEED:  # being tailgated and slow -> create space
             return "ACCELERATE"
         # if front is clear but one side is much more open, start moving there
-        if abs(_corridor_score_left(s) - _corridor_score_right(s)) > 80.0:
+        if abs(_corridor_score_left(s) - _corridor_score_right(s)) > CORRIDOR_MARGIN:
             REFLEX_STATE["intent"] = dirn
-            REFLEX_STATE["cooldown"] = 6
+            REFLEX_STATE["cooldown"] = DRIFT_COOLDOWN
             return steer
         # otherwise maintain speed
         return "NOTHING"
@@ -221,7 +311,7 @@ def _reflex_decide(req: dict) -> str:
     if REFLEX_STATE["intent"] == "RIGHT" and REFLEX_STATE["cooldown"] > 0: return "STEER_RIGHT"
 
     # 5) CRUISE: accelerate gently when totally clear
-    return "ACCELERATE" if vx < 18.0 else "NOTHING"
+    return "ACCELERATE" if vx < CRUISE_SPEED else "NOTHING"
 
 
 app = FastAPI()
@@ -235,11 +325,54 @@ def root():
 def hello():
     return {"service":"race-car-usecase","uptime":str(datetime.timedelta(seconds=time.time()-_start))}
 
-@app.post('/predict', response_model=RaceCarPredictResponseDto)
-def predict(request: RaceCarPredictRequestDto = Body(...)):
-    req = request.dict()
-    act = _decide(req)
+async def _answer(req: dict, game=None) -> List[str]:
+    if USE_PLANNER:
+        # The planner keeps its own time budget and returns a whole batch
+        return await run_in_threadpool(_plan, game, req)
+    act = await MICRO_BATCHER.submit((game, req))
+    _debug_print(req, act)
+    return [act] * BATCH_LEN
 
+@app.post('/predict', response_model=RaceCarPredictResponseDto)
+async def predict(request: RaceCarPredictRequestDto = Body(...)):
+    return RaceCarPredictResponseDto(actions=await _answer(request.dict()))
+
+# Same as /predict in the packed format of src/game/wire.py (no JSON, no pydantic)
+@app.post('/predict_bin')
+async def predict_bin(request: Request):
+    try:
+        req = decode_request(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=encode_actions(req["elapsed_ticks"], await _answer(req)), media_type=MEDIA_TYPE)
+
+# Persistent mode: one connection per game, one packed request / response per frame
+@app.websocket('/ws')
+async def predict_ws(websocket: WebSocket):
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_bytes()
+            try:
+                req = decode_request(data)
+            except ValueError as e:
+                await websocket.close(code=1003, reason=str(e))
+                return
+            await websocket.send_bytes(encode_actions(req["elapsed_ticks"], await _answer(req, id(websocket))))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _forget_game(id(websocket))
+
+@app.post('/predict_batch', response_model=RaceCarPredictBatchResponseDto)
+async def predict_batch(request: RaceCarPredictBatchRequestDto = Body(...)):
+    # One request per game; they join whatever else is being batched right now
+    reqs = [r.dict() for r in request.requests]
+    acts = await asyncio.gather(*(MICRO_BATCHER.submit((("batch", i), req)) for i, req in enumerate(reqs)))
+    return RaceCarPredictBatchResponseDto(
+        responses=[RaceCarPredictResponseDto(actions=[act] * BATCH_LEN) for act in acts])
+
+def _debug_print(req: dict, act: str):
     # ---- DEBUG PRINT (every 10th call) ----
     global _debug_counter
     if DEBUG:
@@ -264,8 +397,13 @@ def predict(request: RaceCarPredictRequestDto = Body(...)):
             print(
                 f"[VAL] vx={vx:.1f} minF={mf:.1f} minB={mb:.1f} lMin={lm:.1f} rMin={rm:.1f} -> {act} | sensors={watch}")
 
-    return RaceCarPredictResponseDto(actions=[act] * BATCH_LEN)
+_startup_phase("app")
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+        from startup_profile import print_startup_profile
+        print_startup_profile(__file__, STARTUP_TIMES)
+        sys.exit(0)
     import uvicorn
     uvicorn.run("api_rl:app", host="0.0.0.0", port=9052, reload=False)
@@ -0,0 +1,126 @@
+# batch_env.py
+# RaceCarEnv for N games at once on the array-backed BatchGame simulator, as an SB3
+# VecEnv: one step() advances every game FRAME_SKIP ticks with NumPy, and the shaping
+# reward of all games is computed in one vectorised call per tick. Same observations,
+# actions and reward as RaceCarEnv, without a Python GameState per env.
+#
+#   env = BatchRaceCarEnv(64)
+#   model = PPO("MlpPolicy", env)          # or: python train_ppo.py --batched --n-envs 64
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from racecar_env import (ACTIONS, FRAME_SKIP, SENSOR_ORDER, SENSOR_RANGE, clearances, observation_from,
+                         shaping_reward)
+from src.game.batch import BatchGame, SENSOR_NAMES
+
+
+class BatchRaceCarEnv(VecEnv):
+    """
+    n_envs RaceCarEnv games stepped together. Finished games are reset automatically
+    (with info["terminal_observation"] set), like every SB3 VecEnv.
+    """
+
+    def __init__(self, n_envs: int, max_steps: int = 1800, sensor_removal: int = 0, sampler=None):
+        """
+        :param n_envs: Number of games.
+        :param max_steps: Steps after which a game is truncated (as in RaceCarEnv).
+        :param sensor_removal: Number of randomly removed sensors per game.
+        :param sampler: Optional seed_bank.CurriculumSampler, as in RaceCarEnv.
+        """
+        self.max_steps = max_steps
+        self.sampler = sampler
+        self.game_seeds = [None] * n_envs
+        self.render_mode = None
+        self.game = BatchGame([None] * n_envs, sensor_removal, max_ticks=max_steps * FRAME_SKIP)
+        self.steps = np.zeros(n_envs, dtype=np.int64)
+        # BatchGame keeps readings in SENSOR_OPTIONS order; the env's live in one
+        # preallocated float32 array in SENSOR_ORDER
+        self._columns = np.array([SENSOR_NAMES.index(name) for name in SENSOR_ORDER])
+        self.readings = np.full((n_envs, len(SENSOR_ORDER)), SENSOR_RANGE, dtype=np.float32)
+        self._last = np.full((n_envs, 3), np.nan)  # Shaping memory, see shaping_reward
+        self._actions = np.zeros(n_envs, dtype=np.int64)
+
+        observation_space = spaces.Box(low=0.0, high=1.0, shape=(len(SENSOR_ORDER) + 2,), dtype=np.float32)
+        super().__init__(n_envs, observation_space, spaces.Discrete(len(ACTIONS)))
+
+    def _read_sensors(self):
+        np.take(self.game.readings, self._columns, axis=1, out=self.readings, mode="clip")
+        self.readings[np.isnan(self.readings)] = SENSOR_RANGE
+
+    def _obs(self) -> np.ndarray:
+        return observation_from(self.readings, self.game.ego_vx, self.game.ego_vy)
+
+    def _reset_games(self, games):
+        for i in games:
+            seed = self._seeds[i]
+            if seed is None and self.sampler is not None:
+                seed = self.sampler.sample()
+            self.game_seeds[i] = seed
+            self.game.reset_game(i, seed)
+        self.steps[games] = 0
+        self._last[games] = np.nan
+
+    def reset(self):
+        self._reset_games(range(self.num_envs))
+        self._reset_seeds()
+        self._reset_options()
+        self._read_sensors()
+        return self._obs()
+
+    def step_async(self, actions: np.ndarray):
+        self._actions = np.clip(np.asarray(actions, dtype=np.int64).reshape(-1), 0, len(ACTIONS) - 1)
+
+    def step_wait(self):
+        game = self.game
+        n = self.num_envs
+        rewards = np.zeros(n)
+        terminated = np.zeros(n, dtype=bool)
+        active = np.ones(n, dtype=bool)
+        for _ in range(FRAME_SKIP):
+            distance = game.distance.copy()
+            game.step(self._actions, active)
+            self._read_sensors()
+            clear = clearances(self.readings)
+            r, done = shaping_reward(clear, self._last, game.ego_vx, game.ego_vy, game.distance - distance,
+                                     self._actions, game.crashed)
+            rewards[active] += r[active]
+            self._last[active] = clear[active, :3]
+            terminated |= active & done
+            active &= ~done
+            if not active.any():
+                break
+
+        self.steps += 1
+        truncated = self.steps >= self.max_steps
+        dones = terminated | truncated
+        obs = self._obs()
+        infos = [{} for _ in range(n)]
+        finished = np.flatnonzero(dones)
+        if finished.size:
+            for i in finished:
+                if self.sampler is not None:
+                    self.sampler.record(self.game_seeds[i], bool(terminated[i]), float(self.game.distance[i]))
+                infos[i]["terminal_observation"] = obs[i].copy()
+                infos[i]["TimeLimit.truncated"] = bool(truncated[i] and not terminated[i])
+            self._reset_games(finished)
+            self.readings[finished] = SENSOR_RANGE  # No readings before a game's first tick
+            obs[finished] = self._obs()[finished]
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    # Every game is the same kind of env, so attributes / methods come from this object
+    def get_attr(self, attr_name: str, indices=None) -> list:
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> list:
+        return [getattr(self, method_name)(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> list:
+        return [False for _ in self._get_indices(indices)]
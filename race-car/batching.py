@@ -0,0 +1,90 @@
+# batching.py
+# Micro-batcher for the policy servers: coalesces requests that arrive together into one
+# call of a batch function, so the model runs once on a stacked matrix instead of once
+# per HTTP request.
+#
+#   batcher = MicroBatcher(decide_batch, max_batch=64)
+#   action = await batcher.submit(request_dict)      # inside an async endpoint
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from coroutines and hands them to fn(list_of_items) in
+    batches. An idle batcher sends a batch on the next event loop iteration after an item
+    arrives, so a lone request never waits, while items submitted in the same iteration
+    (e.g. all requests of one /predict_batch call) share it. Only one batch runs at a time
+    (in a worker thread, so the event loop keeps accepting requests); whatever arrives
+    meanwhile forms the next batch, so batches grow by themselves when the server is busy.
+    """
+
+    def __init__(self, fn, max_batch: int = 64):
+        """
+        Create a batcher.
+
+        :param fn: Callable taking a list of items and returning one result per item.
+        :param max_batch: Largest batch handed to fn.
+        """
+        self.fn = fn
+        self.max_batch = max_batch
+        self._pending = []      # (item, future)
+        self._handle = None     # The scheduled _flush, if any
+        self._running = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batcher")
+        # Counters for logging / tuning
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        """
+        Queue one item and wait for its result.
+
+        :param item: One input for fn.
+        :return: fn's result for this item.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        self._schedule()
+        return await future
+
+    def _schedule(self):
+        if self._running or not self._pending:
+            return  # The running batch flushes the queue when it is done
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._handle is None:
+            self._handle = asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._running or not self._pending:
+            return
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        self._running = True
+        asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, self.fn, [item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"batch function returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():  # The caller may have gone away
+                    future.set_result(result)
+        finally:
+            self.batches += 1
+            self.items += len(batch)
+            self._running = False
+            # Requests that queued up meanwhile have already waited long enough
+            if self._pending:
+                self._flush()
@@ -17,3 +17,11 @@ class RaceCarPredictResponseDto(BaseModel):
     # 'STEER_LEFT'
     # 'STEER_RIGHT'
     # 'NOTHING''
+
+
+class RaceCarPredictBatchRequestDto(BaseModel):
+    requests: List[RaceCarPredictRequestDto]  # One per game
+
+
+class RaceCarPredictBatchResponseDto(BaseModel):
+    responses: List[RaceCarPredictResponseDto]  # Same order as the requests
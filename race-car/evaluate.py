@@ -0,0 +1,213 @@
+# evaluate.py
+# Plays a policy headless over a range of seeds in a process pool and reports
+# distance / crash statistics, plus per-seed results as JSON and/or CSV.
+#
+#   python evaluate.py --policy example --seeds 0-99
+#   python evaluate.py --policy reflex --seeds 3-8 --workers 4 --json eval.json --csv eval.csv
+#   python evaluate.py --policy models/ppo_racecar.zip --seeds 0-199
+#   python evaluate.py --policy example --seeds 0-99 --record-dir replays   # then:
+#   python -m src.game.replay replays/*.replay                                # re-check them
+#   python evaluate.py --policy reflex --seeds 0-999 --trajectory-dir crashes   # then:
+#   python -m src.game.trajectory crashes/seed_17 seed_17.mp4 --start -180     # watch the last 3 s
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import src.game.core as core
+from src.game.replay import ActionRecorder
+
+_POLICY = None   # Loaded once per worker process
+_RESET = None    # Clears the policy's per-game memory between seeds
+
+
+def parse_seeds(spec: str):
+    """Parse '3-8', '1,4,9' or '0-9,20-29' into a list of int seeds."""
+    seeds = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            seeds.extend(range(int(lo), int(hi) + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+
+def load_policy(spec: str, batch_len: int):
+    """
+    Return (policy, reset) for a policy spec:
+      example      -> example.return_action (lane-switch FSM)
+      reflex       -> reflex.ReflexPolicy (compiled reflex planner), repeated batch_len times like the API does
+      api_rl       -> api_rl._decide, whatever the API is configured to do
+      planner      -> planner.Planner (tree search, returns its own batch_len actions)
+      <path>.zip   -> a saved PPO model, deterministic, repeated batch_len times
+    """
+    if spec == "example":
+        import example
+
+        return example.return_action, example._reset_state
+
+    if spec == "reflex":
+        from reflex import ReflexPolicy
+
+        reflex = ReflexPolicy()
+        return (lambda req: [reflex.decide(req)] * batch_len), reflex.reset
+
+    if spec == "api_rl":
+        import api_rl
+
+        def reset():
+            api_rl.REFLEX.reset()
+            api_rl.REFLEX_STATE.update(intent=None, cooldown=0)
+
+        return (lambda req: [api_rl._decide(req)] * batch_len), reset
+
+    if spec == "planner":
+        from planner import Planner
+
+        planner = Planner(batch_len=batch_len)
+        return planner.plan, planner.reset
+
+    if spec.endswith(".zip"):
+        from stable_baselines3 import PPO
+        from api_rl import _obs_from_request
+        from src.game.core import ACTIONS
+
+        model = PPO.load(spec)
+
+        def ppo_policy(req):
+            action_idx, _ = model.predict(_obs_from_request(req), deterministic=True)
+            return [ACTIONS[int(action_idx)]] * batch_len
+
+        return ppo_policy, None
+
+    raise ValueError(f"Unknown policy '{spec}' (use example, reflex, api_rl, planner or a .zip model path)")
+
+
+def _init_worker(policy_spec: str, batch_len: int, quiet: bool):
+    global _POLICY, _RESET
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        _POLICY, _RESET = load_policy(policy_spec, batch_len)
+
+
+def _play(args):
+    seed, sensor_removal, quiet, record_dir, trajectory_dir = args
+    started = time.perf_counter()
+    try:
+        recorder = ActionRecorder(seed, sensor_removal) if record_dir else None
+        trajectory_path = os.path.join(trajectory_dir, f"seed_{seed}") if trajectory_dir else None
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            if _RESET:
+                _RESET()
+            result = core.play_headless(_POLICY, seed, sensor_removal, recorder, trajectory_path=trajectory_path)
+        if recorder is not None:
+            recorder.finish(result["distance"], result["crash_tick"]).save(
+                os.path.join(record_dir, f"seed_{seed}.replay"))
+        if trajectory_path and not result["crashed"]:
+            shutil.rmtree(trajectory_path)  # Only crashes need a post-mortem
+        result["error"] = None
+    except Exception as e:
+        result = {"seed": seed, "distance": None, "crashed": None, "crash_tick": None, "ticks": None, "error": repr(e)}
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def summarize(results):
+    """Aggregate per-seed results into distance and crash statistics."""
+    ok = [r for r in results if r["error"] is None]
+    distances = sorted(r["distance"] for r in ok)
+    crash_ticks = [r["crash_tick"] for r in ok if r["crashed"]]
+
+    def pct(p):
+        if not distances:
+            return None
+        k = (len(distances) - 1) * p / 100
+        lo, hi = int(k), min(int(k) + 1, len(distances) - 1)
+        return distances[lo] + (distances[hi] - distances[lo]) * (k - lo)
+
+    return {
+        "games": len(results),
+        "errors": len(results) - len(ok),
+        "distance": {
+            "mean": statistics.fmean(distances) if distances else None,
+            "std": statistics.pstdev(distances) if distances else None,
+            "min": distances[0] if distances else None,
+            "p10": pct(10),
+            "p25": pct(25),
+            "median": pct(50),
+            "p75": pct(75),
+            "p90": pct(90),
+            "max": distances[-1] if distances else None,
+        },
+        "crash_rate": len(crash_ticks) / len(ok) if ok else None,
+        "crash_tick": {
+            "mean": statistics.fmean(crash_ticks) if crash_ticks else None,
+            "median": statistics.median(crash_ticks) if crash_ticks else None,
+            "min": min(crash_ticks) if crash_ticks else None,
+        },
+    }
+
+
+def evaluate(policy: str, seeds, workers: int = None, sensor_removal: int = 0,
+             batch_len: int = 10, quiet: bool = True, record_dir: str = None, trajectory_dir: str = None):
+    """Play every seed and return (summary, per-seed results in seed order)."""
+    for directory in (record_dir, trajectory_dir):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    jobs = [(seed, sensor_removal, quiet, record_dir, trajectory_dir) for seed in seeds]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(policy, batch_len, quiet)) as pool:
+        results = list(pool.map(_play, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+    return summarize(results), results
+
+
+def write_csv(path: str, results):
+    fields = ["seed", "distance", "crashed", "crash_tick", "ticks", "seconds", "error"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate a race-car policy over many seeds.")
+    parser.add_argument("--policy", default="example", help="example | reflex | api_rl | planner | path/to/model.zip")
+    parser.add_argument("--seeds", default="0-19", help="e.g. 3-8 or 1,4,9 or 0-99,200-299")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--sensor-removal", type=int, default=0)
+    parser.add_argument("--batch-len", type=int, default=10, help="actions per call for single-action policies")
+    parser.add_argument("--json", dest="json_path", help="write summary + per-seed results here")
+    parser.add_argument("--csv", dest="csv_path", help="write per-seed results here")
+    parser.add_argument("--record-dir", help="save a binary replay of every game here")
+    parser.add_argument("--trajectory-dir", help="save the trajectory of every crashed game here")
+    parser.add_argument("--verbose", action="store_true", help="keep policy/simulator prints")
+    args = parser.parse_args()
+
+    seeds = parse_seeds(args.seeds)
+    started = time.perf_counter()
+    summary, results = evaluate(args.policy, seeds, args.workers, args.sensor_removal,
+                                args.batch_len, quiet=not args.verbose, record_dir=args.record_dir,
+                                trajectory_dir=args.trajectory_dir)
+    summary["policy"] = args.policy
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+
+    for r in results:
+        status = f"crash @ {r['crash_tick']}" if r["crashed"] else ("ERROR " + r["error"] if r["error"] else "survived")
+        print(f"seed {r['seed']:>6}: distance {r['distance'] or 0:>12.1f}  {status}")
+    print(json.dumps(summary, indent=2))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2)
+    if args.csv_path:
+        write_csv(args.csv_path, results)
@@ -0,0 +1,80 @@
+# export_policy.py
+# Writes the actor of a trained PPO model to a plain .npz that numpy_policy.NumpyPolicy
+# (and so api_rl) can run without torch / stable_baselines3.
+#
+#   python export_policy.py                                  # models/ppo_racecar.zip -> .npz
+#   python export_policy.py --model models/other.zip --out models/other.npz
+#
+# The exported policy is checked against PPO.predict on random observations before it
+# replaces the .npz; a policy that fails the check is not written.
+
+import argparse
+import os
+
+import numpy as np
+import torch.nn as nn
+from stable_baselines3 import PPO
+from stable_baselines3.common.torch_layers import FlattenExtractor
+
+from numpy_policy import NumpyPolicy
+
+CHECK_SAMPLES = 10_000
+TIE_TOLERANCE = 1e-4  # Logit gap below which the two frameworks may disagree
+
+
+def export(model_path: str, out_path: str) -> NumpyPolicy:
+    model = PPO.load(model_path, device="cpu")
+    policy = model.policy
+    # Only the plain MlpPolicy layout can be exported
+    if not isinstance(policy.pi_features_extractor, FlattenExtractor):
+        raise ValueError(f"Unsupported features extractor {type(policy.pi_features_extractor).__name__}")
+    if not hasattr(policy.action_net, "weight"):
+        raise ValueError("Only discrete action spaces are supported")
+
+    layers = [m for m in policy.mlp_extractor.policy_net if isinstance(m, nn.Linear)] + [policy.action_net]
+    # torch keeps Linear weights as (out, in); NumpyPolicy multiplies x @ w
+    weights = [layer.weight.detach().cpu().numpy().T for layer in layers]
+    biases = [layer.bias.detach().cpu().numpy() for layer in layers]
+    activation = policy.activation_fn.__name__.lower()
+
+    exported = NumpyPolicy(weights, biases, activation)
+    arrays = {f"w{i}": w for i, w in enumerate(exported.weights)}
+    arrays.update({f"b{i}": b for i, b in enumerate(exported.biases)})
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    # Written under a temporary name and only moved to out_path once it passed the check,
+    # so a failed export never leaves a wrong .npz that api_rl would prefer over the model
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, n_layers=len(layers), activation=activation, **arrays)
+
+    try:
+        # Same decisions as the original on observations from the whole observation space
+        space = model.observation_space
+        obs = np.random.default_rng(0).uniform(space.low, space.high, size=(CHECK_SAMPLES,) + space.shape)
+        obs = obs.astype(np.float32)
+        expected, _ = model.predict(obs, deterministic=True)
+        loaded = NumpyPolicy.load(tmp_path)
+        got, _ = loaded.predict(obs, deterministic=True)
+        # float32 rounding may only flip near-ties between the two best actions
+        top2 = np.sort(loaded.logits(obs), axis=1)[:, -2:]
+        mismatches = int(np.sum((expected != got) & (top2[:, 1] - top2[:, 0] > TIE_TOLERANCE)))
+        if mismatches:
+            print(f"Not saving {out_path}: {mismatches}/{CHECK_SAMPLES} decisions differ from PPO.predict")
+            raise SystemExit(1)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"Saved {out_path}: {len(layers)} layers, {activation}, "
+          f"0/{CHECK_SAMPLES} decisions differ from PPO.predict")
+    return exported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a PPO policy to .npz for NumpyPolicy.")
+    parser.add_argument("--model", default="models/ppo_racecar.zip")
+    parser.add_argument("--out", default=None, help="default: the model path with .npz")
+    args = parser.parse_args()
+    export(args.model, args.out or os.path.splitext(args.model)[0] + ".npz")
@@ -0,0 +1,208 @@
+# imitation_data.py
+# Generates behaviour-cloning data: plays a scripted policy (the example.py lane-switch
+# FSM, the reflex planner, ...) headless over many seeds in a process pool and writes
+# (observation, action, outcome) samples as memory-mapped .npy shards, one directory of
+# columns per chunk of seeds.
+#
+#   python imitation_data.py --policy reflex --seeds 0-9999 --out data/reflex
+#   python imitation_data.py --policy example --seeds 0-999 --workers 4 --out data/fsm
+#   python train_ppo.py --pretrain data/reflex            # warm start PPO from it
+#
+# Samples are taken every racecar_env.FRAME_SKIP ticks, the rate at which RaceCarEnv
+# asks PPO for an action, with the observation RaceCarEnv would return at that tick and
+# the action the scripted policy applied on it.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import src.game.core as core
+from evaluate import load_policy, parse_seeds
+from racecar_env import ACTIONS, FRAME_SKIP, observation
+
+ACTION_INDEX = {name: i for i, name in enumerate(ACTIONS)}
+MANIFEST = "manifest.json"
+
+# Column name -> dtype; obs is (samples, 18), every other column (samples,)
+COLUMNS = {
+    "obs": np.float32,             # RaceCarEnv observation
+    "action": np.int64,            # Index into racecar_env.ACTIONS
+    "seed": np.int64,
+    "tick": np.int32,              # Game tick of the sample
+    "ticks_to_end": np.int32,      # Ticks left until the game ended
+    "final_distance": np.float32,  # Distance the game reached
+    "crashed": np.bool_,           # Whether the game ended in a crash
+}
+
+_POLICY = None   # Loaded once per worker process
+_RESET = None
+
+
+def play_samples(policy, seed: int, sensor_removal: int = 0, frame_skip: int = FRAME_SKIP) -> dict:
+    """
+    Play one game like core.play_headless and collect a sample every frame_skip ticks.
+
+    :return: Dict of column arrays for this game.
+    """
+    state = core.create_game_state(None, seed, sensor_removal)
+    actions = []
+    obs, codes, ticks = [], [], []
+
+    while True:
+        state.ticks += 1
+        state.elapsed_game_time = state.ticks * core.MS_PER_TICK
+        if state.crashed or state.ticks > core.MAX_TICKS:
+            break
+
+        sample = (state.ticks - 1) % frame_skip == 0
+        if sample or not actions:
+            state.update_sensors()
+        if not actions:
+            actions = list(policy(state.build_payload()) or ["NOTHING"])
+        action = actions.pop(0)
+        if sample:
+            obs.append(observation(state))
+            codes.append(ACTION_INDEX.get(action, ACTION_INDEX["NOTHING"]))
+            ticks.append(state.ticks)
+        state.step(action)
+
+    n = len(codes)
+    end_tick = state.ticks - 1
+    return {
+        "obs": np.array(obs, dtype=np.float32).reshape(n, -1),
+        "action": np.array(codes, dtype=np.int64),
+        "seed": np.full(n, seed, dtype=np.int64),
+        "tick": np.array(ticks, dtype=np.int32),
+        "ticks_to_end": end_tick - np.array(ticks, dtype=np.int32),
+        "final_distance": np.full(n, state.distance, dtype=np.float32),
+        "crashed": np.full(n, state.crashed, dtype=np.bool_),
+    }
+
+
+def write_shard(path: str, columns: dict):
+    """Write one shard: a directory with one .npy file per column."""
+    os.makedirs(path, exist_ok=True)
+    for name, values in columns.items():
+        out = np.lib.format.open_memmap(os.path.join(path, f"{name}.npy"), mode="w+",
+                                        dtype=values.dtype, shape=values.shape)
+        out[...] = values
+        out.flush()
+        del out
+
+
+def _init_worker(policy_spec: str, batch_len: int, quiet: bool):
+    global _POLICY, _RESET
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        _POLICY, _RESET = load_policy(policy_spec, batch_len)
+
+
+def _make_shard(args):
+    path, seeds, sensor_removal, frame_skip, quiet = args
+    games = []
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        for seed in seeds:
+            if _RESET:
+                _RESET()
+            games.append(play_samples(_POLICY, seed, sensor_removal, frame_skip))
+    columns = {name: np.concatenate([g[name] for g in games]) for name in COLUMNS}
+    write_shard(path, columns)
+    return {
+        "name": os.path.basename(path),
+        "samples": len(columns["action"]),
+        "seeds": [int(s) for s in seeds],
+        "mean_distance": float(np.mean([g["final_distance"][0] for g in games])),  # Every game has a tick-1 sample
+    }
+
+
+def generate(policy_spec: str, seeds, out_dir: str, shard_seeds: int = 64, workers: int = None,
+             batch_len: int = 10, sensor_removal: int = 0, frame_skip: int = FRAME_SKIP,
+             quiet: bool = True) -> dict:
+    """
+    Play every seed and write the samples to out_dir as shards of shard_seeds games.
+
+    :param policy_spec: Policy for evaluate.load_policy (example, reflex, planner, model.zip).
+    :param seeds: Int seeds, one game each.
+    :param out_dir: Output directory; gets one subdirectory per shard plus MANIFEST.
+    :param shard_seeds: Games per shard (and per worker task).
+    :param workers: Worker processes (default: all cores).
+    :param batch_len: Batch length passed to the policy.
+    :param sensor_removal: Number of randomly removed sensors per game.
+    :param frame_skip: Ticks between samples.
+    :param quiet: Swallow the policies' prints.
+    :return: The manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [
+        (os.path.join(out_dir, f"shard_{k:05d}"), seeds[start:start + shard_seeds], sensor_removal, frame_skip, quiet)
+        for k, start in enumerate(range(0, len(seeds), shard_seeds))
+    ]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(policy_spec, batch_len, quiet)) as pool:
+        shards = list(pool.map(_make_shard, tasks))
+
+    manifest = {
+        "policy": policy_spec,
+        "frame_skip": frame_skip,
+        "sensor_removal": sensor_removal,
+        "actions": ACTIONS,
+        "columns": {name: np.dtype(dtype).name for name, dtype in COLUMNS.items()},
+        "samples": sum(shard["samples"] for shard in shards),
+        "shards": shards,
+    }
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def iter_shards(path: str, columns=None):
+    """
+    Yield every shard of a dataset as a dict of read-only memory-mapped column arrays.
+
+    :param path: The dataset directory.
+    :param columns: Column names to open (default: all).
+    """
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    for shard in manifest["shards"]:
+        yield {name: np.load(os.path.join(path, shard["name"], f"{name}.npy"), mmap_mode="r")
+               for name in (columns or manifest["columns"])}
+
+
+def load_dataset(path: str, columns=None) -> dict:
+    """
+    Load whole columns of a dataset into memory.
+
+    :param path: The dataset directory.
+    :param columns: Column names to load (default: all).
+    :return: Dict of column name -> array over all shards.
+    """
+    shards = list(iter_shards(path, columns))
+    if not shards:
+        return {}
+    return {name: np.concatenate([shard[name] for shard in shards]) for name in shards[0]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate behaviour-cloning data from a scripted policy.")
+    parser.add_argument("--policy", default="reflex", help="example | reflex | planner | path/to/model.zip")
+    parser.add_argument("--seeds", default="0-999", help="e.g. 0-9999 or 1,4,9")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--shard-seeds", type=int, default=64, help="games per shard")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--batch-len", type=int, default=10)
+    parser.add_argument("--sensor-removal", type=int, default=0)
+    parser.add_argument("--frame-skip", type=int, default=FRAME_SKIP, help="ticks between samples")
+    parser.add_argument("--verbose", action="store_true", help="show the policies' prints")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = generate(args.policy, parse_seeds(args.seeds), args.out, args.shard_seeds, args.workers,
+                        args.batch_len, args.sensor_removal, args.frame_skip, not args.verbose)
+    print(f"Wrote {manifest['samples']} samples in {len(manifest['shards'])} shards to {args.out} "
+          f"in {time.perf_counter() - started:.1f} s")
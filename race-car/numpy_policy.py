@@ -0,0 +1,81 @@
+# numpy_policy.py
+# Runs a PPO policy exported by export_policy.py with plain NumPy, so the API does not
+# need torch / stable_baselines3 (seconds of import time and hundreds of MB) just to
+# evaluate a 64x64 MLP.
+#
+#   policy = NumpyPolicy.load("models/ppo_racecar.npz")
+#   action, _ = policy.predict(obs, deterministic=True)     # same call as PPO.predict
+
+import numpy as np
+
+ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+}
+
+
+class NumpyPolicy:
+    """
+    The actor of an SB3 MlpPolicy with a discrete action space: Flatten -> (Linear ->
+    activation) * n -> Linear to the action logits. The value head is not exported.
+    """
+
+    def __init__(self, weights, biases, activation: str = "tanh"):
+        """
+        :param weights: One (in, out) matrix per layer; the last one produces the logits.
+        :param biases: One vector per layer.
+        :param activation: Name of the activation between layers (see ACTIVATIONS).
+        """
+        if activation not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation {activation!r}, expected one of {list(ACTIVATIONS)}")
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activation = activation
+        self._act = ACTIVATIONS[activation]
+        self.obs_dim = self.weights[0].shape[0]
+        self.n_actions = self.weights[-1].shape[1]
+        self.rng = np.random.default_rng()
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyPolicy":
+        """
+        Load a policy written by export_policy.py.
+
+        :param path: Path of the .npz file.
+        """
+        with np.load(path) as data:
+            n_layers = int(data["n_layers"])
+            weights = [data[f"w{i}"] for i in range(n_layers)]
+            biases = [data[f"b{i}"] for i in range(n_layers)]
+            activation = str(data["activation"])
+        return cls(weights, biases, activation)
+
+    def logits(self, obs: np.ndarray) -> np.ndarray:
+        """
+        Action logits for a (obs_dim,) observation or a (n, obs_dim) batch.
+        """
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, self.obs_dim)
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            x = x @ w + b
+            if i < last:
+                x = self._act(x)
+        return x
+
+    def predict(self, obs: np.ndarray, state=None, episode_start=None, deterministic: bool = False):
+        """
+        Same contract as PPO.predict for a discrete action space.
+
+        :param obs: One observation or a batch of them.
+        :param deterministic: Take the most likely action instead of sampling.
+        :return: (action or actions, None)
+        """
+        logits = self.logits(obs)
+        if deterministic:
+            actions = logits.argmax(axis=1)
+        else:
+            # Gumbel-max: one sample per row from softmax(logits)
+            actions = (logits - np.log(-np.log(self.rng.random(logits.shape)))).argmax(axis=1)
+        if np.ndim(obs) == 1:
+            return actions[0], None
+        return actions, None
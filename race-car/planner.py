@@ -0,0 +1,306 @@
+# planner.py
+# Search-based policy: rebuilds the visible traffic from one request's sensor readings
+# into a small surrogate GameState and runs Monte-Carlo tree search over macro-actions
+# (one action held for MACRO_TICKS ticks) on it, using core's own update functions as
+# the forward model. Returns a BATCH_LEN action batch like api_rl.
+#
+#   planner = Planner()
+#   actions = planner.plan(request.dict())    # list of BATCH_LEN action strings
+#
+# The search stops at a hard wall-clock deadline (TIME_BUDGET, well under the client's
+# 0.15 s timeout) and the subtree under the actions it sent is kept as a warm start for
+# the next call.
+
+import math
+import time
+
+import src.game.core as core
+from src.game.core import ACTIONS, SENSOR_OPTIONS
+from src.mathematics.collision import ray_directions
+
+BATCH_LEN = 10        # Actions returned per call (same as api_rl.BATCH_LEN)
+MACRO_TICKS = 10      # Ticks one tree edge holds its action
+HORIZON = 90          # Ticks simulated per iteration (tree path + default policy)
+TIME_BUDGET = 0.10    # Seconds per call, all inclusive
+MAX_ITERATIONS = 5000
+EXPLORATION = 0.7     # UCT exploration constant
+REUSE_DECAY = 0.5     # Weight kept on the statistics of a reused subtree
+
+SENSOR_RANGE = 1000.0
+WALL_TOP = 40.0       # Inner edges of the walls (Road margin)
+WALL_BOTTOM = 1160.0
+REL_V_AHEAD = -2.5    # Relative speed assumed for a car seen for the first time ahead of us
+REL_V_BEHIND = 2.5    # ... and behind us
+VELOCITY_SMOOTHING = 0.5
+MAX_JUMP = 40.0       # Faster apparent motion (px/tick) means a different car took the lane
+LATERAL_LIMIT = 4.0   # No steering further sideways above this |vy|: it takes too long to stop
+
+_NAMES = [name for _, name in SENSOR_OPTIONS]
+# Axis-aligned beams keep ~1e-16 of sin/cos noise; snap it so their unused component is exactly 0
+_DIRECTIONS = {name: [0.0 if abs(c) < 1e-12 else c for c in direction]
+               for name, direction in zip(_NAMES, ray_directions([angle for angle, _ in SENSOR_OPTIONS]).tolist())}
+
+
+class Node:
+    """One tree node: the state after following the macro-actions from the root."""
+    __slots__ = ("children", "visits", "value")
+
+    def __init__(self):
+        self.children = {}   # action -> Node
+        self.visits = 0.0
+        self.value = 0.0     # Sum of returns
+
+    def decay(self, factor: float):
+        self.visits *= factor
+        self.value *= factor
+        for child in self.children.values():
+            child.decay(factor)
+
+
+class Planner:
+    def __init__(self, time_budget: float = TIME_BUDGET, batch_len: int = BATCH_LEN,
+                 macro_ticks: int = MACRO_TICKS, horizon: int = HORIZON):
+        """
+        Create a planner for one game at a time.
+
+        :param time_budget: Hard limit in seconds for one plan() call.
+        :param batch_len: Number of actions returned per call.
+        :param macro_ticks: Ticks each tree edge holds its action.
+        :param horizon: Ticks simulated per search iteration.
+        """
+        self.time_budget = time_budget
+        self.batch_len = batch_len
+        self.macro_ticks = macro_ticks
+        self.horizon = horizon
+
+        # The surrogate world: a real GameState without sensors, rebuilt from every request
+        self.world = core.create_game_state(None, 0)
+        self.world.sensors = []
+        self.npcs = self.world.roster[1:]
+        self.rng_state = self.world.rng.getstate()
+        self.lanes = self.world.road.lanes
+        self.ego_center_x = self.world.ego.x + self.world.ego.width // 2
+        self.start_center_y = self.world.ego.y + self.world.ego.height // 2
+        self.reset()
+
+    def reset(self):
+        """Forget everything about the current game (tracked cars, search tree)."""
+        self.tick = None
+        self.ego_y = None        # Estimated center y of the ego car
+        self.tracks = {}         # lane index -> (car x, relative vx, x measured exactly)
+        self.root = None
+        self.expected_tick = None
+        self.iterations = 0      # Iterations done in the last call
+
+    # ---------------- surrogate model ----------------
+    def _estimate_ego_y(self, sensors: dict, vy: float, dt: int) -> float:
+        # A ray that hits something pointing up/down bounds the ego center from below/above;
+        # the bound is exact when the hit is the wall. Dead reckoning picks a value in between.
+        low, high = WALL_TOP, WALL_BOTTOM
+        for name, d in sensors.items():
+            dy = _DIRECTIONS[name][1]
+            if d >= SENSOR_RANGE or dy == 0:
+                continue
+            if dy < 0:
+                low = max(low, WALL_TOP - d * dy)
+            else:
+                high = min(high, WALL_BOTTOM - d * dy)
+        if self.ego_y is None:
+            guess = self.start_center_y  # First call of a game: the ego car starts centered
+        else:
+            guess = self.ego_y + vy * dt
+        return min(max(guess, low), high) if low <= high else guess
+
+    def _observe(self, req: dict):
+        sensors = {}
+        for name, value in (req.get("sensors") or {}).items():
+            if name in _DIRECTIONS:
+                sensors[name] = SENSOR_RANGE if value in (None, "") else float(value)
+        velocity = req.get("velocity") or {}
+        vx, vy = float(velocity.get("x", 0.0)), float(velocity.get("y", 0.0))
+        tick = int(req.get("elapsed_ticks", 0))
+
+        if self.tick is not None and tick <= self.tick:
+            self.reset()  # A new game started
+        dt = tick - self.tick if self.tick is not None else 0
+        self.tick = tick
+        self.ego_y = cy = self._estimate_ego_y(sensors, vy, dt)
+
+        # Sensor hits that are not on a wall belong to a car; group them by lane
+        hits = {}
+        for name, d in sensors.items():
+            if d >= SENSOR_RANGE:
+                continue
+            dx, dy = _DIRECTIONS[name]
+            hx, hy = self.ego_center_x + d * dx, cy + d * dy
+            if hy <= WALL_TOP + 1 or hy >= WALL_BOTTOM - 1:
+                continue
+            for index, lane in enumerate(self.lanes):
+                if lane.y_start <= hy < lane.y_end:
+                    hits.setdefault(index, []).append((hx, hy))
+                    break
+
+        width, height = self.npcs[0].width, self.npcs[0].height
+        tracks = {}
+        for index, points in hits.items():
+            lane = self.lanes[index]
+            top = int((lane.y_start + lane.y_end) / 2 - height / 2)
+            xs = [hx for hx, _ in points]
+            lo, hi = min(xs), max(xs)
+            ahead = lo >= self.ego_center_x
+            previous = self.tracks.get(index)
+            predicted = previous[0] + previous[1] * dt if previous is not None else None
+            if predicted is not None and abs(predicted - (lo + hi) / 2) > width + MAX_JUMP * dt:
+                previous = predicted = None  # Too far from where the old car should be: a new car
+
+            # A hit strictly between the car's top and bottom edge lies on its front or back
+            # edge, which pins x down exactly
+            exact = [hx if hx >= self.ego_center_x else hx - width
+                     for hx, hy in points if top + 0.5 < hy < top + height - 0.5]
+            if exact:
+                x = min(exact) if ahead else max(exact)
+                if previous is not None and previous[2] and dt > 0:
+                    rel_v = previous[1] + VELOCITY_SMOOTHING * ((x - previous[0]) / dt - previous[1])
+                elif previous is not None:
+                    rel_v = previous[1]
+                else:
+                    rel_v = None
+            else:
+                # Only the top/bottom edge was seen: the car spans every hit, somewhere in
+                # [hi - width, lo]. Trust the track if it fits, else assume the end facing us
+                # reaches as far as it possibly can
+                if predicted is not None:
+                    x = min(max(predicted, hi - width), lo)
+                elif ahead:
+                    x = hi - width
+                elif hi <= self.ego_center_x:
+                    x = lo
+                else:
+                    x = (hi - width + lo) / 2
+                rel_v = previous[1] if previous is not None else None
+            if rel_v is None:
+                rel_v = REL_V_AHEAD if ahead else REL_V_BEHIND
+            tracks[index] = (x, rel_v, bool(exact))
+        self.tracks = tracks
+
+        # Write the picture into the surrogate world
+        world = self.world
+        ego = world.ego
+        ego.y = cy - ego.height // 2
+        ego.velocity.x, ego.velocity.y = vx, vy
+        world.cars = [ego]
+        for car, (index, (x, rel_v, _)) in zip(self.npcs, sorted(tracks.items())):
+            lane = self.lanes[index]
+            car.lane = lane
+            car.x = x
+            car.y = int((lane.y_start + lane.y_end) / 2 - car.height / 2)
+            car.velocity.x, car.velocity.y = vx + rel_v, 0
+            world.cars.append(car)
+        world.car_bucket = []  # No spawns: the search only plans around cars it has seen
+        world.reindex()
+        world.crashed = False
+        world.distance = 0.0
+        world.ticks = tick
+        world.rng.setstate(self.rng_state)
+
+    # ---------------- search ----------------
+    def _default_action(self) -> str:
+        # Hold speed and steer back to driving straight
+        vy = self.world.ego.velocity.y
+        if vy > 0.05:
+            return "STEER_LEFT"
+        if vy < -0.05:
+            return "STEER_RIGHT"
+        return "NOTHING"
+
+    def _actions(self) -> list:
+        velocity = self.world.ego.velocity
+        if velocity.y <= -LATERAL_LIMIT:
+            return [a for a in ACTIONS if a != "STEER_LEFT"]
+        if velocity.y >= LATERAL_LIMIT:
+            return [a for a in ACTIONS if a != "STEER_RIGHT"]
+        return ACTIONS
+
+    def _simulate(self, action: str, ticks: int) -> int:
+        """Step the surrogate; return the number of ticks survived."""
+        world = self.world
+        for k in range(ticks):
+            world.step(action or self._default_action())
+            if world.crashed:
+                return k
+        return ticks
+
+    def _score(self, survived: int) -> float:
+        # Surviving always beats crashing; among survivors, further is better
+        if self.world.crashed:
+            return -1.0 + 0.5 * survived / self.horizon
+        return self.world.distance / (self.horizon * 20.0)
+
+    def _iterate(self, root: Node, snapshot):
+        world = self.world
+        world.restore(snapshot)
+        path = [root]
+        node = root
+        elapsed = 0
+        # Selection / expansion
+        while elapsed < self.horizon and not world.crashed:
+            untried = [a for a in self._actions() if a not in node.children]
+            if untried:
+                action = untried[0]
+                node.children[action] = child = Node()
+            else:
+                log_n = math.log(max(node.visits, 1.0))
+                action, child = max(
+                    node.children.items(),
+                    key=lambda item: item[1].value / max(item[1].visits, 1e-9)
+                    + EXPLORATION * math.sqrt(log_n / max(item[1].visits, 1e-9)),
+                )
+            elapsed += self._simulate(action, min(self.macro_ticks, self.horizon - elapsed))
+            path.append(child)
+            node = child
+            if untried:
+                break
+        # Default-policy rollout to the horizon
+        if not world.crashed and elapsed < self.horizon:
+            elapsed += self._simulate(None, self.horizon - elapsed)
+        value = self._score(elapsed)
+        for n in path:
+            n.visits += 1
+            n.value += value
+
+    def plan(self, req: dict) -> list:
+        """
+        Search for the best action batch for the current request.
+
+        :param req: The request dict (RaceCarPredictRequestDto.dict()).
+        :return: A list of batch_len action strings.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        self._observe(req)
+
+        root = self.root if self.expected_tick == self.tick and self.root is not None else Node()
+        root.decay(REUSE_DECAY)
+        snapshot = self.world.snapshot()
+
+        iterations = 0
+        while iterations < MAX_ITERATIONS and time.perf_counter() < deadline:
+            self._iterate(root, snapshot)
+            iterations += 1
+        self.iterations = iterations
+        self.world.restore(snapshot)
+
+        # Follow the most visited children for one batch and keep the subtree below them
+        actions = []
+        node = root
+        while len(actions) < self.batch_len:
+            if not node.children:
+                node = None
+                break
+            action, node = max(node.children.items(), key=lambda item: item[1].visits)
+            actions += [action] * self.macro_ticks
+        if node is None:
+            actions += ["NOTHING"] * (self.batch_len - len(actions))
+        # The kept subtree only lines up with the next request when whole macros were sent
+        self.root = node if self.batch_len % self.macro_ticks == 0 else None
+        self.expected_tick = self.tick + self.batch_len
+        return actions[:self.batch_len]
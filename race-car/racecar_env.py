@@ -3,73 +3,174 @@
 
 import numpy as np
 from gymnasium import Env, spaces
-import pygame
 
 FRAME_SKIP = 10              # match your API batch size; lower = more reactive
 CRASH_FRONT_THRESH = 70.0   # if min(front, diagonals) < this -> terminate early
 DANGER_NEAR = 200.0         # near zone
 DANGER_MED  = 350.0         # medium zone
 
-# Import the simulator module *as a module* so STATE is always the live object
+# Import the simulator module *as a module*; each env builds its own GameState from it
 try:
     import src.game.core as core  # typical project layout
 except ImportError:
     import core as core           # fallback if core.py is at project root
 
-# Keep sensor order stable so the observation vector is consistent
-SENSOR_ORDER = [
-    "left_side", "left_side_front", "left_front", "front_left_front",
-    "front", "front_right_front", "right_front", "right_side_front",
-    "right_side", "right_side_back", "right_back", "back_right_back",
-    "back", "back_left_back", "left_back", "left_side_back",
-]
-
-ACTIONS = ["ACCELERATE", "DECELERATE", "STEER_LEFT", "STEER_RIGHT", "NOTHING"]
-
-
-def _read_sensors():
-    vals = {}
-    for i, s in enumerate(core.STATE.sensors):
-        name = getattr(s, "name", f"sensor_{i}")
-        v = 1000.0
-        if hasattr(s, "reading"):
-            try:
-                v = float(getattr(s, "reading"))
-            except Exception:
-                v = 1000.0
-        elif hasattr(s, "sensor_strength"):
-            v = float(getattr(s, "sensor_strength"))
-        vals[name] = v
-    return vals
-
-
-def _tick_sim(action_str: str) -> float:
+# Observation columns and action indices, as everywhere else in the game (see core)
+SENSOR_ORDER = core.SENSOR_ORDER
+ACTIONS = core.ACTIONS
+
+SENSOR_INDEX = {name: k for k, name in enumerate(SENSOR_ORDER)}
+SENSOR_RANGE = 1000.0  # Reading of a missing sensor or a sensor that sees nothing
+# Column of GameState.sensor_readings (SENSOR_OPTIONS order) for every SENSOR_ORDER column
+SENSOR_COLUMNS = np.array([[name for _, name in core.SENSOR_OPTIONS].index(name) for name in SENSOR_ORDER])
+
+# Sensor clusters used by the reward, as columns of the readings array
+FRONT_CLUSTER = [SENSOR_INDEX[k] for k in ("front", "front_left_front", "front_right_front", "left_front", "right_front")]
+BACK_CLUSTER = [SENSOR_INDEX[k] for k in ("back", "back_left_back", "back_right_back", "left_back", "right_back")]
+LEFT_CLUSTER = [SENSOR_INDEX[k] for k in ("left_side", "left_front", "left_side_back")]
+RIGHT_CLUSTER = [SENSOR_INDEX[k] for k in ("right_side", "right_front", "right_side_back")]
+
+ACCELERATE, DECELERATE, STEER_LEFT, STEER_RIGHT, NOTHING = range(len(ACTIONS))
+
+# Reward shaping thresholds (pixels)
+SIDE_COLLISION = 120.0      # real left/right crash line from the car center
+SIDE_SAFE = 180.0
+FRONT_DANGER = 350.0
+BACK_DANGER = 350.0
+FRONT_SAFE = 400.0
+FRONT_TERMINATE = 60.0
+
+
+def read_sensors(state, out: np.ndarray) -> np.ndarray:
     """
-    Advance one simulation step reusing your core loop pieces.
-    Returns: delta distance progressed this step.
+    Write the game's cached readings into out (float32, SENSOR_ORDER); sensors without a
+    reading and removed sensors count as SENSOR_RANGE. No rays are cast here.
+
+    :param state: The game state; its sensors must be up to date (they are after a step).
+    :param out: The readings array, filled in place.
+    :return: out
+    """
+    readings = state.sensor_readings[SENSOR_COLUMNS]
+    out[:] = np.where(np.isnan(readings), SENSOR_RANGE, readings)
+    return out
+
+
+def observation_from(readings: np.ndarray, vx, vy) -> np.ndarray:
+    """
+    RaceCarEnv observations from readings in SENSOR_ORDER; works on one row or a batch.
+
+    :param readings: (16,) or (n, 16) sensor readings.
+    :param vx: Forward speed(s).
+    :param vy: Lateral speed(s).
+    """
+    sensors = np.clip(np.asarray(readings, dtype=np.float32) / SENSOR_RANGE, 0.0, 1.0)
+    vx_n = np.clip(np.asarray(vx, dtype=np.float64) / 20.0, 0.0, 1.0)
+    vy_n = np.clip((np.asarray(vy, dtype=np.float64) + 5.0) / 10.0, 0.0, 1.0)  # [-5..5] -> [0..1]
+    return np.concatenate([sensors, vx_n[..., None], vy_n[..., None]], axis=-1).astype(np.float32)
+
+
+def observation(state) -> np.ndarray:
+    """The RaceCarEnv observation of a game state (see RaceCarEnv); sensors must be up to date."""
+    readings = read_sensors(state, np.empty(len(SENSOR_ORDER), dtype=np.float32))
+    return observation_from(readings, state.ego.velocity.x, state.ego.velocity.y)
+
+
+def clearances(readings: np.ndarray) -> np.ndarray:
+    """
+    Closest obstacle per sensor cluster used by the reward.
+
+    :param readings: (n, 16) readings in SENSOR_ORDER.
+    :return: (n, 4) float64 columns: left, right, front, back.
+    """
+    readings = readings.astype(np.float64)
+    return np.stack([readings[:, LEFT_CLUSTER].min(axis=1), readings[:, RIGHT_CLUSTER].min(axis=1),
+                     readings[:, FRONT_CLUSTER].min(axis=1), readings[:, BACK_CLUSTER].min(axis=1)], axis=1)
+
+
+def shaping_reward(clear: np.ndarray, last: np.ndarray, vx: np.ndarray, vy: np.ndarray, delta: np.ndarray,
+                   actions: np.ndarray, crashed: np.ndarray):
+    """
+    The reward of n ticks at once, all terms vectorised. Rows can be different games
+    (BatchRaceCarEnv) or consecutive ticks of one game (RaceCarEnv's frame-skip window).
+
+    :param clear: (n, 4) clearances after the tick (see clearances).
+    :param last: (n, 3) left / right / front clearance after the previous tick; NaN = none yet.
+    :param vx: (n,) forward speeds after the tick.
+    :param vy: (n,) lateral speeds after the tick.
+    :param delta: (n,) distance progressed this tick.
+    :param actions: (n,) action indices applied this tick.
+    :param crashed: (n,) whether the game crashed.
+    :return: (rewards, terminated) arrays.
     """
-    core.handle_action(action_str)
+    min_left, min_right, min_front, min_back = clear.T
+    last_left, last_right, last_front = np.where(np.isnan(last), clear[:, :3], last).T
 
-    old_dist = core.STATE.distance
-    core.STATE.distance += core.STATE.ego.velocity.x
+    # base reward: very small forward progress, the rest is safety
+    r = 0.05 * delta
 
-    core.update_cars()
-    core.remove_passed_cars()
-    core.place_car()
+    # --- side collision awareness (uses real 120px limit + buffer) ---
+    # danger 1 at the crash line, 0 from SIDE_SAFE on; penalize tight sides, stronger when very tight
+    sd_left = np.clip(1.0 - (min_left - SIDE_COLLISION) / (SIDE_SAFE - SIDE_COLLISION), 0.0, 1.0)
+    sd_right = np.clip(1.0 - (min_right - SIDE_COLLISION) / (SIDE_SAFE - SIDE_COLLISION), 0.0, 1.0)
+    r -= 1.2 * np.maximum(sd_left, sd_right)
 
-    # Update sensors after world update
-    for sensor in core.STATE.sensors:
-        sensor.update()
+    # never reward steering into a tight side; penalize it
+    r -= 0.8 * ((actions == STEER_LEFT) & (sd_left > 0.4))
+    r -= 0.8 * ((actions == STEER_RIGHT) & (sd_right > 0.4))
 
-    # Collisions
-    for car in core.STATE.cars:
-        if car is not core.STATE.ego and core.intersects(core.STATE.ego.rect, car.rect):
-            core.STATE.crashed = True
-    for wall in core.STATE.road.walls:
-        if core.intersects(core.STATE.ego.rect, wall.rect):
-            core.STATE.crashed = True
+    # small shaping bonus for increasing side clearance (encourage preparing dodges early)
+    r += 0.002 * np.maximum(min_left - last_left, 0.0)
+    r += 0.002 * np.maximum(min_right - last_right, 0.0)
 
-    return core.STATE.distance - old_dist
+    # --- time-to-collision style danger (front) ---
+    ttc = min_front / np.maximum(vx, 1e-3)  # small ttc = very dangerous
+    # danger in [0..1], where ttc <= 30 ticks => ~1, ttc >= 90 => ~0
+    danger = 1.0 - np.clip((ttc - 30.0) / (90.0 - 30.0), 0.0, 1.0)
+    r -= 2.0 * danger  # strong: prioritize not crashing
+
+    # penalize getting closer to obstacles ahead (delta clearance)
+    r -= 0.002 * np.maximum(last_front - min_front, 0.0)
+
+    # lane centering by usable side clearance
+    r -= 0.05 * (np.abs(min_left - min_right) / 1000.0)
+
+    # smooth lateral motion
+    r -= 0.02 * np.abs(vy)
+
+    # speed management in danger zones
+    front_danger = min_front < FRONT_DANGER
+    back_danger = min_back < BACK_DANGER
+    r -= front_danger * (0.06 * np.maximum(vx - 6.0, 0.0))  # too fast into front danger
+    r -= back_danger * (0.05 * np.maximum(4.0 - vx, 0.0))   # don't crawl if tailgated
+
+    # action-aware shaping (only meaningful when danger)
+    r -= 0.8 * (front_danger & (actions == ACCELERATE))
+    r += 0.6 * (front_danger & (actions == DECELERATE))
+    r += 0.4 * (front_danger & (min_left < min_right) & (actions == STEER_RIGHT))
+    r += 0.4 * (front_danger & (min_right < min_left) & (actions == STEER_LEFT))
+
+    r += 0.2 * (back_danger & (actions == ACCELERATE))
+    r += 0.15 * (back_danger & (min_left > min_right) & (actions == STEER_LEFT))
+    r += 0.15 * (back_danger & (min_right > min_left) & (actions == STEER_RIGHT))
+
+    # tiny speed bonus only when fully safe front & back
+    r += ((min_front >= FRONT_SAFE) & (min_back >= BACK_DANGER)) * (0.002 * np.maximum(vx - 8.0, 0.0))
+
+    # hard termination
+    too_close = min_front < FRONT_TERMINATE
+    r -= 100.0 * too_close
+    r -= 100.0 * crashed
+    return r, too_close | crashed
+
+
+def _tick_sim(state, action_str: str) -> float:
+    """
+    Advance one simulation step of the given game state reusing your core loop pieces.
+    Returns: delta distance progressed this step.
+    """
+    old_dist = state.distance
+    core.step_world(action_str, state)  # action, world update, sensors, collisions
+    return state.distance - old_dist
 
 
 class RaceCarEnv(Env):
@@ -80,13 +181,19 @@ class RaceCarEnv(Env):
       - normalized vy in [0..1] (map [-5..5] -> [0..1])
 
     Action (Discrete 5): index into ACTIONS list.
+
+    With a seed_bank.CurriculumSampler, resets without an explicit seed play a seed drawn
+    from it, and every finished episode is recorded back into its seed bank.
     """
     metadata = {"render_modes": []}
 
-    def __init__(self, max_steps: int = 1800):
+    def __init__(self, max_steps: int = 1800, sampler=None):
         super().__init__()
         self.max_steps = max_steps
         self.steps = 0
+        self.state = None  # This env's own GameState, so several envs can live in one process
+        self.sampler = sampler
+        self.game_seed = None
 
         # 16 sensors + 2 velocity terms
         self.observation_space = spaces.Box(
@@ -95,30 +202,26 @@ class RaceCarEnv(Env):
         self.action_space = spaces.Discrete(len(ACTIONS))
 
     def _obs(self) -> np.ndarray:
-        svals = _read_sensors()
-        sensors = [svals.get(k, 1000.0) for k in SENSOR_ORDER]
-        sensors = np.clip(np.array(sensors, dtype=np.float32) / 1000.0, 0.0, 1.0)
-
-        vx = float(core.STATE.ego.velocity.x)
-        vy = float(core.STATE.ego.velocity.y)
-
-        vx_n = np.clip(vx / 20.0, 0.0, 1.0)
-        vy_n = np.clip((vy + 5.0) / 10.0, 0.0, 1.0)  # [-5..5] -> [0..1]
-
-        return np.concatenate([sensors, [vx_n, vy_n]]).astype(np.float32)
+        return observation_from(self.readings[self._row], self.state.ego.velocity.x, self.state.ego.velocity.y)
 
     def reset(self, *, seed=None, options=None):
-        if not pygame.get_init():
-            pygame.init()
-        core.initialize_game_state(api_url="http://localhost:9052/predict", seed_value=seed, sensor_removal=0)
-        core.STATE.crashed = False
-        core.STATE.distance = 0.0
-        core.STATE.elapsed_game_time = 0
-        core.STATE.ticks = 0
+        if seed is None and self.sampler is not None:
+            seed = self.sampler.sample()
+        self.game_seed = seed
+        self.state = core.create_game_state(api_url="http://localhost:9052/predict", seed_value=seed, sensor_removal=0)
+        self.state.crashed = False
+        self.state.distance = 0.0
+        self.state.elapsed_game_time = 0
+        self.state.ticks = 0
         self.steps = 0
+        # One preallocated row of readings per tick of a step, refreshed in place; the
+        # reward of the whole frame-skip window is then computed in one vectorised call
+        self.readings = np.full((FRAME_SKIP, len(SENSOR_ORDER)), SENSOR_RANGE, dtype=np.float32)
+        self._motion = np.zeros((FRAME_SKIP, 4))  # vx, vy, delta, crashed per tick
+        self._row = 0
+        read_sensors(self.state, self.readings[0])
         # clear shaping history
-        for a in ("_last_min_front", "_last_left", "_last_right"):
-            if hasattr(self, a): delattr(self, a)
+        self._last = np.full((1, 3), np.nan)
         return self._obs(), {}
 
     def step(self, action):
@@ -127,128 +230,30 @@ class RaceCarEnv(Env):
         act_idx = max(0, min(act_idx, len(ACTIONS) - 1))
         act_str = ACTIONS[act_idx]
 
-        total_reward = 0.0
         terminated = False
 
         # how many sim ticks per chosen action; keep this = BATCH_LEN at serve time
-        skip = FRAME_SKIP if "FRAME_SKIP" in globals() else 1
-
-        for _ in range(skip):
-            delta = _tick_sim(act_str)
-
-            # --- read sensors ---
-            s = _read_sensors()
-            # front sector
-            front = float(s.get("front", 1000.0))
-            flf = float(s.get("front_left_front", 1000.0))
-            frf = float(s.get("front_right_front", 1000.0))
-            l_front = float(s.get("left_front", 1000.0))
-            r_front = float(s.get("right_front", 1000.0))
-            # sides (incl. side-back to estimate clearance corridor)
-            left = float(s.get("left_side", 1000.0))
-            right = float(s.get("right_side", 1000.0))
-            lsb = float(s.get("left_side_back", 1000.0))
-            rsb = float(s.get("right_side_back", 1000.0))
-            # rear cluster
-            back = float(s.get("back", 1000.0))
-            blb = float(s.get("back_left_back", 1000.0))
-            brb = float(s.get("back_right_back", 1000.0))
-            l_back = float(s.get("left_back", 1000.0))
-            r_back = float(s.get("right_back", 1000.0))
-
-            min_front = min(front, flf, frf, l_front, r_front)
-            min_back = min(back, blb, brb, l_back, r_back)
-            min_left = min(left, l_front, lsb)
-            min_right = min(right, r_front, rsb)
-
-            vx = float(core.STATE.ego.velocity.x)
-            vy = float(core.STATE.ego.velocity.y)
-
-            # --------- INIT r FIRST (fixes UnboundLocalError) ----------
-            # base reward: very small forward progress, the rest is safety
-            r = 0.05 * float(delta)
-
-            # --- side collision awareness (uses real 120px limit + buffer) ---
-            SIDE_COLLISION = 120.0
-            SIDE_SAFE = 180.0
-
-            def side_danger(d):
-                if d <= SIDE_COLLISION: return 1.0
-                if d >= SIDE_SAFE:      return 0.0
-                return 1.0 - (d - SIDE_COLLISION) / (SIDE_SAFE - SIDE_COLLISION)
-
-            sd_left = side_danger(min_left)
-            sd_right = side_danger(min_right)
-
-            # penalize tight sides, stronger when very tight
-            r -= 1.2 * max(sd_left, sd_right)
-
-            # never reward steering into a tight side; penalize it
-            if act_str == "STEER_LEFT" and sd_left > 0.4: r -= 0.8
-            if act_str == "STEER_RIGHT" and sd_right > 0.4: r -= 0.8
-
-            # small shaping bonus for increasing side clearance (encourage preparing dodges early)
-            if not hasattr(self, "_last_left"):  self._last_left = min_left
-            if not hasattr(self, "_last_right"): self._last_right = min_right
-            r += 0.002 * max(min_left - self._last_left, 0.0)
-            r += 0.002 * max(min_right - self._last_right, 0.0)
-            self._last_left, self._last_right = min_left, min_right
-
-            # --- time-to-collision style danger (front) ---
-            eps = 1e-3
-            ttc = min_front / max(vx, eps)  # small ttc = very dangerous
-            # danger in [0..1], where ttc <= 30 ticks => ~1, ttc >= 90 => ~0
-            danger = 1.0 - np.clip((ttc - 30.0) / (90.0 - 30.0), 0.0, 1.0)
-            r -= 2.0 * danger  # strong: prioritize not crashing
-
-            # penalize getting closer to obstacles ahead (delta clearance)
-            if not hasattr(self, "_last_min_front"):
-                self._last_min_front = min_front
-            r -= 0.002 * max(self._last_min_front - min_front, 0.0)
-            self._last_min_front = min_front
-
-            # lane centering by usable side clearance
-            center_err = abs(min_left - min_right) / 1000.0
-            r -= 0.05 * center_err
-
-            # smooth lateral motion
-            r -= 0.02 * abs(vy)
-
-            # speed management in danger zones
-            if min_front < 350.0:
-                r -= 0.06 * max(vx - 6.0, 0.0)  # too fast into front danger
-            if min_back < 350.0:
-                r -= 0.05 * max(4.0 - vx, 0.0)  # don't crawl if tailgated
-
-            # action-aware shaping (only meaningful when danger)
-            if min_front < 350.0:
-                if act_str == "ACCELERATE": r -= 0.8
-                if act_str == "DECELERATE": r += 0.6
-                if min_left < min_right and act_str == "STEER_RIGHT": r += 0.4
-                if min_right < min_left and act_str == "STEER_LEFT":  r += 0.4
-
-            if min_back < 350.0:
-                if act_str == "ACCELERATE": r += 0.2
-                if min_left > min_right and act_str == "STEER_LEFT":  r += 0.15
-                if min_right > min_left and act_str == "STEER_RIGHT": r += 0.15
-
-            # tiny speed bonus only when fully safe front & back
-            if min_front >= 400.0 and min_back >= 350.0:
-                r += 0.002 * max(vx - 8.0, 0.0)
-
+        ticks = 0
+        for k in range(FRAME_SKIP):
+            delta = _tick_sim(self.state, act_str)
+            row = read_sensors(self.state, self.readings[k])
+            velocity = self.state.ego.velocity
+            self._motion[k] = velocity.x, velocity.y, delta, self.state.crashed
+            ticks = k + 1
             # hard termination
-            if min_front < 60.0:
-                r -= 100.0
+            if self.state.crashed or row[FRONT_CLUSTER].min() < FRONT_TERMINATE:
                 terminated = True
-            if core.STATE.crashed:
-                r -= 100.0
-                terminated = True
-
-            total_reward += r
-            if terminated:
                 break
+        self._row = ticks - 1
+
+        clear = clearances(self.readings[:ticks])
+        last = np.concatenate([self._last, clear[:-1, :3]])
+        self._last = clear[-1:, :3]
+        vx, vy, delta, crashed = self._motion[:ticks].T
+        rewards, _ = shaping_reward(clear, last, vx, vy, delta, np.full(ticks, act_idx), crashed.astype(bool))
+        total_reward = float(sum(rewards.tolist()))  # Same order as adding tick by tick
 
         truncated = self.steps >= self.max_steps
+        if self.sampler is not None and (terminated or truncated):
+            self.sampler.record(self.game_seed, terminated, self.state.distance)
         return self._obs(), float(total_reward), terminated, truncated, {}
-
-
@@ -0,0 +1,299 @@
+# reflex.py
+# The reflex planner from api_rl in compiled form: a request's sensor dict is parsed once
+# into a fixed-order array, every sensor cluster is one vectorised min / weighted sum, and
+# the decision rules are evaluated with masks, so a whole batch of games is decided in
+# one call. Each game keeps its own steering intent / cooldown row.
+#
+#   policy = ReflexPolicy()                        # one game, e.g. inside the API
+#   action = policy.decide(request.dict())
+#
+#   policy = ReflexPolicy(n_games=64)              # many games, e.g. next to BatchGame
+#   codes = policy.decide_arrays(readings, vx, sensor_names=batch.SENSOR_NAMES)
+#
+#   python reflex.py --seeds 0-99                  # play it in the batched sim, no HTTP
+
+import argparse
+import time
+from typing import List, Sequence
+
+import numpy as np
+
+from src.game.core import ACTIONS, SENSOR_ORDER
+
+ACCELERATE, DECELERATE, STEER_LEFT, STEER_RIGHT, NOTHING = range(len(ACTIONS))
+NO_INTENT, LEFT, RIGHT = 0, 1, 2
+
+SENSOR_RANGE = 1000.0  # Value of a missing sensor or a sensor without a reading
+
+# --- Reflex planner thresholds (pixels), also used by _reflex_decide in api_rl ---
+PREPARE_FRONT = 900.0        # start planning when we first see something
+COMMIT_FRONT = 650.0         # definitely start moving over
+BRAKE_FRONT = 420.0          # never accelerate below this
+HARD_FRONT = 340.0           # emergency brake
+
+SIDE_HARD = 140.0  # never steer into a side tighter than this
+SIDE_SAFE = 180.0  # prefer not to steer if corridor is tighter than this
+
+PREPARE_BACK = 450.0         # start reacting to rear cars
+
+# Speeds (px/tick)
+BRAKE_SPEED = 8.0            # near a car ahead, slow down first above this ...
+EMERGENCY_SPEED = 14.0       # ... and brake instead of steering above this
+TAILGATED_SPEED = 6.0        # accelerate away from a rear car below this
+CRUISE_SPEED = 18.0          # accelerate on a clear road below this
+
+CORRIDOR_MARGIN = 80.0       # score difference that makes a clear road worth leaving
+NARROW_PENALTY = 500.0       # a side corridor below SIDE_SAFE loses this minus its width
+COMMIT_COOLDOWN = 8          # ticks a committed dodge keeps steering
+DRIFT_COOLDOWN = 6           # ticks a move towards open space keeps steering
+
+# Sensor clusters, by name
+FRONT = ["front", "front_left_front", "front_right_front", "left_front", "right_front"]
+BACK = ["back", "back_left_back", "back_right_back", "left_back", "right_back"]
+SIDE_LEFT = ["left_side", "left_front", "left_side_back"]
+SIDE_RIGHT = ["right_side", "right_front", "right_side_back"]
+LEFT_AHEAD, LEFT_SIDE, LEFT_REAR = ["left_front", "front_left_front"], "left_side", ["left_back", "left_side_back", "back_left_back"]
+RIGHT_AHEAD, RIGHT_SIDE, RIGHT_REAR = ["right_front", "front_right_front"], "right_side", ["right_back", "right_side_back", "back_right_back"]
+
+
+def parse_sensors(sensors: dict, sensor_names: Sequence[str] = SENSOR_ORDER) -> np.ndarray:
+    """
+    One request's sensor dict as a float array in sensor_names order; missing / empty
+    readings become SENSOR_RANGE.
+    """
+    row = np.empty(len(sensor_names), dtype=np.float64)
+    for k, name in enumerate(sensor_names):
+        value = sensors.get(name)
+        row[k] = SENSOR_RANGE if value in (None, "") else float(value)
+    return row
+
+
+def parse_requests(reqs: List[dict], sensor_names: Sequence[str] = SENSOR_ORDER):
+    """
+    Request dicts as a (n, sensors) reading matrix and a (n,) forward speed vector.
+    """
+    readings = np.stack([parse_sensors(req.get("sensors") or {}, sensor_names) for req in reqs])
+    vx = np.array([float((req.get("velocity") or {}).get("x", 0.0)) for req in reqs], dtype=np.float64)
+    return readings, vx
+
+
+class ReflexPolicy:
+    """
+    Vectorised reflex planner for n_games games at once. Decisions are identical to
+    evaluating the rule list one request at a time.
+    """
+
+    def __init__(self, n_games: int = 1):
+        """
+        :param n_games: Number of games (rows) the policy keeps steering state for.
+        """
+        self.n_games = n_games
+        self.intent = np.full(n_games, NO_INTENT, dtype=np.int8)
+        self.cooldown = np.zeros(n_games, dtype=np.int64)
+        self._columns = {}  # sensor_names -> column indices of every cluster
+        self._free = []     # Rows given back by remove_game, reused by add_game
+
+    def add_game(self) -> int:
+        """
+        Add a game with fresh steering state, reusing a removed game's row if there is one.
+
+        :return: The game's row.
+        """
+        if self._free:
+            game = self._free.pop()
+        else:
+            game = self.n_games
+            self.n_games += 1
+            self.intent = np.append(self.intent, np.int8(NO_INTENT))
+            self.cooldown = np.append(self.cooldown, 0)
+        self.reset([game])
+        return game
+
+    def remove_game(self, game: int):
+        """
+        Give a game's row back for a later add_game.
+
+        :param game: A row returned by add_game.
+        """
+        self._free.append(game)
+
+    def reset(self, games=None):
+        """
+        Forget the steering state of some games (default: all of them).
+
+        :param games: Row indices or a boolean mask.
+        """
+        if games is None:
+            games = slice(None)
+        self.intent[games] = NO_INTENT
+        self.cooldown[games] = 0
+
+    def _cluster_columns(self, sensor_names: Sequence[str]) -> dict:
+        key = tuple(sensor_names)
+        columns = self._columns.get(key)
+        if columns is None:
+            index = {name: k for k, name in enumerate(key)}
+
+            def cols(names):
+                return np.array([index[name] for name in names])
+
+            columns = self._columns[key] = {
+                "front": cols(FRONT), "back": cols(BACK),
+                "side_left": cols(SIDE_LEFT), "side_right": cols(SIDE_RIGHT),
+                "left_ahead": cols(LEFT_AHEAD), "left_side": index[LEFT_SIDE], "left_rear": cols(LEFT_REAR),
+                "right_ahead": cols(RIGHT_AHEAD), "right_side": index[RIGHT_SIDE], "right_rear": cols(RIGHT_REAR),
+            }
+        return columns
+
+    def decide_arrays(self, readings: np.ndarray, vx: np.ndarray, games=None,
+                      sensor_names: Sequence[str] = SENSOR_ORDER) -> np.ndarray:
+        """
+        Decide one action per row and advance the steering state of those games.
+
+        :param readings: (n, sensors) readings in sensor_names order; NaN counts as no reading.
+        :param vx: (n,) forward speeds.
+        :param games: The game (state row) of every reading row; default: rows 0..n-1.
+        :param sensor_names: Column order of readings.
+        :return: (n,) action codes (indices into ACTIONS).
+        """
+        s = np.where(np.isnan(readings), SENSOR_RANGE, readings)
+        vx = np.asarray(vx, dtype=np.float64)
+        if games is None:
+            games = np.arange(len(s))
+        c = self._cluster_columns(sensor_names)
+
+        min_front = s[:, c["front"]].min(axis=1)
+        min_back = s[:, c["back"]].min(axis=1)
+        left_min = s[:, c["side_left"]].min(axis=1)
+        right_min = s[:, c["side_right"]].min(axis=1)
+
+        # Corridor scores; a side tighter than SIDE_SAFE is penalised hard
+        left_side, right_side = s[:, c["left_side"]], s[:, c["right_side"]]
+        left_score = 0.6 * s[:, c["left_ahead"]].min(axis=1) + 0.3 * left_side + 0.1 * s[:, c["left_rear"]].min(axis=1)
+        left_score = np.where(left_side < SIDE_SAFE, left_score - (NARROW_PENALTY - left_side), left_score)
+        right_score = 0.6 * s[:, c["right_ahead"]].min(axis=1) + 0.3 * right_side + 0.1 * s[:, c["right_rear"]].min(axis=1)
+        right_score = np.where(right_side < SIDE_SAFE, right_score - (NARROW_PENALTY - right_side), right_score)
+
+        # Best steer: never into a side that is basically unsafe, else the better corridor
+        steer = np.where(left_score >= right_score, STEER_LEFT, STEER_RIGHT)
+        steer = np.where((left_min < SIDE_HARD) & (right_min < SIDE_HARD), DECELERATE, steer)
+        steer = np.where((right_min < SIDE_HARD) & (left_min >= SIDE_SAFE), STEER_LEFT, steer)
+        steer = np.where((left_min < SIDE_HARD) & (right_min >= SIDE_SAFE), STEER_RIGHT, steer)
+        direction = np.select([steer == STEER_LEFT, steer == STEER_RIGHT], [LEFT, RIGHT], NO_INTENT)
+
+        # cooldown keeps intent steady for a few ticks so we don't jitter
+        intent = self.intent[games].copy()
+        cooldown = self.cooldown[games]
+        cooldown = np.where(cooldown > 0, cooldown - 1, cooldown)
+
+        # The rules below are checked in order; every row takes the first that matches
+        emergency = min_front <= HARD_FRONT
+        front = ~emergency & (min_front <= PREPARE_FRONT)
+        rear = ~emergency & ~front & (min_back <= PREPARE_BACK)
+        cruise = ~emergency & ~front & ~rear
+
+        # 5) CRUISE, unless 4) a recent intent keeps steering
+        actions = np.where(vx < CRUISE_SPEED, ACCELERATE, NOTHING)
+        actions = np.where((cooldown > 0) & (intent == LEFT), STEER_LEFT, actions)
+        actions = np.where((cooldown > 0) & (intent == RIGHT), STEER_RIGHT, actions)
+        actions = np.where(cruise, actions, NOTHING)
+
+        # 3) REAR danger: don't brake to zero; prefer accelerate or move to space
+        drift = rear & (vx >= TAILGATED_SPEED) & (np.abs(left_score - right_score) > CORRIDOR_MARGIN)
+        actions = np.where(rear & (vx < TAILGATED_SPEED), ACCELERATE, actions)
+        actions = np.where(drift, steer, actions)
+        intent = np.where(drift, direction, intent)
+        cooldown = np.where(drift, DRIFT_COOLDOWN, cooldown)
+
+        # 2) FRONT danger: prepare/commit a dodge early, brake first when fast
+        commit = front & (min_front <= COMMIT_FRONT)
+        intent = np.where(commit, direction, intent)
+        cooldown = np.where(commit, COMMIT_COOLDOWN, cooldown)
+        braking = front & (min_front <= BRAKE_FRONT) & (vx > BRAKE_SPEED)
+        actions = np.where(front, steer, actions)
+        actions = np.where(braking & (vx > EMERGENCY_SPEED), DECELERATE, actions)
+        blocked = ((intent == LEFT) & (left_min < SIDE_HARD)) | ((intent == RIGHT) & (right_min < SIDE_HARD))
+        intent = np.where(front & ~braking & blocked, NO_INTENT, intent)
+
+        # 1) EMERGENCY
+        actions = np.where(emergency, DECELERATE, actions)
+        intent = np.where(emergency, NO_INTENT, intent)
+        cooldown = np.where(emergency, 0, cooldown)
+
+        self.intent[games] = intent
+        self.cooldown[games] = cooldown
+        return actions
+
+    def decide_batch(self, reqs: List[dict], games=None) -> List[str]:
+        """
+        Decide one action per request dict.
+
+        A game may have several requests in one batch; they are decided in order, so the
+        result is the same as deciding the requests one at a time.
+
+        :param reqs: Request dicts (RaceCarPredictRequestDto.dict()).
+        :param games: The game of every request; default: request i is game i.
+        :return: The actions.
+        """
+        readings, vx = parse_requests(reqs)
+        if games is None:
+            return [ACTIONS[code] for code in self.decide_arrays(readings, vx)]
+        games = np.asarray(games, dtype=np.int64)
+        # Round k decides every game's k-th request, so no game appears twice in a call
+        counts, rounds = {}, []
+        for game in games.tolist():
+            rounds.append(counts.get(game, 0))
+            counts[game] = rounds[-1] + 1
+        rounds = np.array(rounds, dtype=np.int64)
+        codes = np.empty(len(reqs), dtype=np.int64)
+        for k in range(max(counts.values(), default=0)):
+            rows = rounds == k
+            codes[rows] = self.decide_arrays(readings[rows], vx[rows], games[rows])
+        return [ACTIONS[code] for code in codes]
+
+    def decide(self, req: dict, game: int = 0) -> str:
+        """Decide the action for one request dict of one game."""
+        return self.decide_batch([req], [game])[0]
+
+
+def play_batch(seeds: Sequence, batch_len: int = 10, sensor_removal: int = 0) -> dict:
+    """
+    Play the reflex policy on every seed at once in BatchGame, deciding every batch_len
+    ticks and holding the action in between like the API client does. Decisions see the
+    readings left by the previous tick (none before the first), so results are close to,
+    but not the same as, evaluate.py --policy reflex.
+
+    :param seeds: One seed per game.
+    :param batch_len: Ticks each decision is held.
+    :param sensor_removal: Number of randomly removed sensors per game.
+    :return: Dict with per-game distance, crashed and ticks arrays.
+    """
+    from src.game.batch import BatchGame, SENSOR_NAMES
+
+    game = BatchGame(seeds, sensor_removal)
+    policy = ReflexPolicy(len(seeds))
+    actions = np.full(len(seeds), NOTHING)
+    tick = 0
+    while not game.done.all():
+        if tick % batch_len == 0:
+            actions = policy.decide_arrays(game.readings, game.ego_vx, sensor_names=SENSOR_NAMES)
+        game.step(actions)
+        tick += 1
+    return {"distance": game.distance, "crashed": game.crashed, "ticks": game.ticks}
+
+
+if __name__ == "__main__":
+    from evaluate import parse_seeds
+
+    parser = argparse.ArgumentParser(description="Play the compiled reflex policy in the batched simulation.")
+    parser.add_argument("--seeds", default="0-99", help="e.g. 0-99 or 1,4,9")
+    parser.add_argument("--batch-len", type=int, default=10)
+    parser.add_argument("--sensor-removal", type=int, default=0)
+    args = parser.parse_args()
+
+    seeds = parse_seeds(args.seeds)
+    started = time.perf_counter()
+    result = play_batch(seeds, args.batch_len, args.sensor_removal)
+    seconds = time.perf_counter() - started
+    print(f"{len(seeds)} games in {seconds:.1f} s: mean distance {result['distance'].mean():.1f}, "
+          f"{int(result['crashed'].sum())} crashed")
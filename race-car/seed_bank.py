@@ -0,0 +1,181 @@
+# seed_bank.py
+# Remembers how hard every game seed has been for the policy, and samples training seeds
+# with a bias towards the hard ones, so simulation time goes where the policy still fails.
+#
+#   python seed_bank.py --bank models/seed_bank.npy --from-eval eval.json   # seed it from evaluate.py --json
+#   python train_ppo.py --seed-bank models/seed_bank.npy                    # train with the curriculum
+#   python seed_bank.py --bank models/seed_bank.npy --top 20                # hardest seeds so far
+#
+# The bank is a plain .npy file memory-mapped by every env process. Each finished episode
+# updates its seed's row in place without a lock: two workers finishing the same seed at
+# the same instant can lose one update, which is harmless for statistics that are moving
+# averages anyway, and every process sees the others' results as soon as they are written.
+
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+CAPACITY = 10_000        # Seeds 0 .. CAPACITY-1
+EMA = 0.2                # Weight of the newest episode in the moving averages
+UNSEEN_DIFFICULTY = 0.5  # Difficulty assumed for a seed that was never played
+HARD_FRACTION = 0.5      # Share of episodes the sampler spends on hard seeds
+PRIORITY_EXPONENT = 2.0  # >1 concentrates the hard share on the very hardest seeds
+PRIORITY_FLOOR = 0.01    # Keeps solved seeds from vanishing completely
+
+# Columns of the bank
+EPISODES, FAILURES, FAILURE_EMA, DISTANCE_EMA = range(4)
+
+
+def _create(path: str, capacity: int):
+    """
+    Write an empty bank to path unless another process or thread gets there first. The
+    table is written under a unique temporary name and hard-linked into place, which fails
+    instead of overwriting if the file appeared meanwhile, so nobody ever maps a
+    half-written file or loses a bank that is already being recorded into.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory or ".")
+    os.close(fd)
+    table = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=(capacity, 4))
+    table.flush()
+    del table
+    try:
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+
+
+class SeedBank:
+    """
+    Per-seed episode count, failure count and moving averages of failure (crash or early
+    termination) and distance, in a memory-mapped (capacity, 4) float64 .npy file.
+    """
+
+    def __init__(self, path: str, capacity: int = CAPACITY):
+        """
+        Open the bank, creating an empty one if the file does not exist yet.
+
+        :param path: The .npy file.
+        :param capacity: Number of seeds in a new bank; an existing file keeps its own.
+        """
+        self.path = path
+        if not os.path.exists(path):
+            _create(path, capacity)
+        self.table = np.load(path, mmap_mode="r+")
+        self.capacity = len(self.table)
+
+    # Processes get their own mapping of the same file instead of a pickled copy
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def record(self, seed: int, failed: bool, distance: float):
+        """
+        Add one finished episode.
+
+        :param seed: The seed the episode was played on; seeds outside the bank are ignored.
+        :param failed: Whether it ended in a crash (or the env's hard termination).
+        :param distance: Distance the episode reached.
+        """
+        if seed is None or not 0 <= seed < self.capacity:
+            return
+        row = self.table[seed]
+        first = row[EPISODES] == 0
+        row[EPISODES] += 1
+        row[FAILURES] += failed
+        row[FAILURE_EMA] = failed if first else row[FAILURE_EMA] + EMA * (failed - row[FAILURE_EMA])
+        row[DISTANCE_EMA] = distance if first else row[DISTANCE_EMA] + EMA * (distance - row[DISTANCE_EMA])
+
+    def difficulty(self) -> np.ndarray:
+        """Difficulty of every seed in [0, 1]: the failure average, UNSEEN_DIFFICULTY if never played."""
+        table = self.table
+        return np.where(table[:, EPISODES] > 0, table[:, FAILURE_EMA], UNSEEN_DIFFICULTY)
+
+    def hardest(self, k: int = 10) -> list:
+        """
+        The k hardest seeds that were played, hardest (then shortest distance) first.
+
+        :return: (seed, difficulty, episodes, mean distance) tuples.
+        """
+        table = np.array(self.table)  # One consistent copy
+        played = np.flatnonzero(table[:, EPISODES] > 0)
+        order = played[np.lexsort((table[played, DISTANCE_EMA], -table[played, FAILURE_EMA]))][:k]
+        return [(int(s), float(table[s, FAILURE_EMA]), int(table[s, EPISODES]), float(table[s, DISTANCE_EMA]))
+                for s in order]
+
+    def import_results(self, results) -> int:
+        """
+        Record finished games from evaluate.py results (dicts with seed, crashed, distance).
+
+        :return: The number of games recorded.
+        """
+        n = 0
+        for result in results:
+            if result.get("error") is None and result.get("distance") is not None:
+                self.record(int(result["seed"]), bool(result["crashed"]), float(result["distance"]))
+                n += 1
+        self.flush()
+        return n
+
+    def flush(self):
+        self.table.flush()
+
+
+class CurriculumSampler:
+    """
+    Draws training seeds: HARD_FRACTION of them in proportion to difficulty ** exponent,
+    the rest uniformly so new seeds keep being discovered. Finished episodes are fed back
+    with record().
+    """
+
+    def __init__(self, bank: SeedBank, hard_fraction: float = HARD_FRACTION,
+                 exponent: float = PRIORITY_EXPONENT, rng: np.random.Generator = None):
+        """
+        :param bank: The seed bank to read difficulties from and record episodes into.
+        :param hard_fraction: Share of seeds drawn by difficulty instead of uniformly.
+        :param exponent: Sharpness of the difficulty weighting.
+        :param rng: Random generator (default: a fresh one per process).
+        """
+        self.bank = bank
+        self.hard_fraction = hard_fraction
+        self.exponent = exponent
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def sample(self) -> int:
+        """Draw the seed of the next episode."""
+        if self.rng.random() >= self.hard_fraction:
+            return int(self.rng.integers(self.bank.capacity))
+        weights = (self.bank.difficulty() + PRIORITY_FLOOR) ** self.exponent
+        cumulative = np.cumsum(weights)
+        return int(np.searchsorted(cumulative, self.rng.random() * cumulative[-1], side="right"))
+
+    def record(self, seed: int, failed: bool, distance: float):
+        self.bank.record(seed, failed, distance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or fill a training seed bank.")
+    parser.add_argument("--bank", default="models/seed_bank.npy")
+    parser.add_argument("--capacity", type=int, default=CAPACITY, help="seeds in a new bank")
+    parser.add_argument("--from-eval", help="record the games of an evaluate.py --json file")
+    parser.add_argument("--top", type=int, default=10, help="show the hardest seeds")
+    args = parser.parse_args()
+
+    bank = SeedBank(args.bank, args.capacity)
+    if args.from_eval:
+        with open(args.from_eval) as f:
+            n = bank.import_results(json.load(f)["results"])
+        print(f"Recorded {n} games from {args.from_eval}")
+    played = int(np.count_nonzero(bank.table[:, EPISODES]))
+    print(f"{args.bank}: {played}/{bank.capacity} seeds played, {int(bank.table[:, EPISODES].sum())} episodes")
+    for seed, difficulty, episodes, distance in bank.hardest(args.top):
+        print(f"seed {seed:>6}: difficulty {difficulty:.2f} over {episodes} episodes, mean distance {distance:.1f}")
@@ -0,0 +1,134 @@
+# shm_vec_env.py
+# SubprocVecEnv variant that runs one RaceCarEnv per worker process and hands
+# observations back through a shared-memory buffer instead of pickling them
+# through the pipes. Only rewards / dones / infos go over the pipe.
+#
+#   env = SharedMemoryVecEnv([make_env for _ in range(8)])
+
+import multiprocessing as mp
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import SubprocVecEnv
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv
+
+
+def _shm_worker(remote, parent_remote, env_fn_wrapper, obs_buffer, index, shape, dtype):
+    # Import here to avoid a circular import (same as SB3's own worker)
+    from stable_baselines3.common.env_util import is_wrapped
+
+    parent_remote.close()
+    env = env_fn_wrapper.var()
+    # This worker's row of the shared (n_envs, *shape) observation array
+    obs_row = np.frombuffer(obs_buffer, dtype=dtype).reshape((-1,) + shape)[index]
+    while True:
+        try:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                observation, reward, terminated, truncated, info = env.step(data)
+                # convert to SB3 VecEnv api
+                done = terminated or truncated
+                info["TimeLimit.truncated"] = truncated and not terminated
+                reset_info = {}
+                if done:
+                    # save final observation where user can get it, then reset
+                    info["terminal_observation"] = observation
+                    observation, reset_info = env.reset()
+                obs_row[...] = observation
+                remote.send((reward, done, info, reset_info))
+            elif cmd == "reset":
+                maybe_options = {"options": data[1]} if data[1] else {}
+                observation, reset_info = env.reset(seed=data[0], **maybe_options)
+                obs_row[...] = observation
+                remote.send(reset_info)
+            elif cmd == "render":
+                remote.send(env.render())
+            elif cmd == "close":
+                env.close()
+                remote.close()
+                break
+            elif cmd == "get_spaces":
+                remote.send((env.observation_space, env.action_space))
+            elif cmd == "env_method":
+                method = env.get_wrapper_attr(data[0])
+                remote.send(method(*data[1], **data[2]))
+            elif cmd == "get_attr":
+                remote.send(env.get_wrapper_attr(data))
+            elif cmd == "has_attr":
+                try:
+                    env.get_wrapper_attr(data)
+                    remote.send(True)
+                except AttributeError:
+                    remote.send(False)
+            elif cmd == "set_attr":
+                remote.send(setattr(env, data[0], data[1]))
+            elif cmd == "is_wrapped":
+                remote.send(is_wrapped(env, data))
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+        except (EOFError, KeyboardInterrupt):
+            break
+
+
+class SharedMemoryVecEnv(SubprocVecEnv):
+    """
+    Multi-process VecEnv for Box observation spaces. Every worker writes its observation
+    straight into its row of one shared array, so a step costs one small pipe message per
+    env instead of a pickled observation.
+
+    attribute / method / render calls behave exactly like SubprocVecEnv.
+    """
+
+    def __init__(self, env_fns, start_method: str = None):
+        """
+        Start one worker process per env.
+
+        :param env_fns: Callables that each build one env.
+        :param start_method: multiprocessing start method (default: forkserver where available, else spawn).
+        """
+        self.waiting = False
+        self.closed = False
+        n_envs = len(env_fns)
+
+        # Build one env here just to read its spaces; the buffer must exist before the workers start
+        probe = env_fns[0]()
+        observation_space, action_space = probe.observation_space, probe.action_space
+        probe.close()
+        if not isinstance(observation_space, spaces.Box):
+            raise ValueError(f"SharedMemoryVecEnv needs a Box observation space, got {observation_space}")
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        shape, dtype = observation_space.shape, np.dtype(observation_space.dtype)
+        self._obs_buffer = ctx.RawArray("b", n_envs * int(np.prod(shape)) * dtype.itemsize)
+        self._obs = np.frombuffer(self._obs_buffer, dtype=dtype).reshape((n_envs,) + shape)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        self.processes = []
+        for index, (work_remote, remote, env_fn) in enumerate(zip(self.work_remotes, self.remotes, env_fns)):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn), self._obs_buffer, index, shape, dtype)
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=_shm_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        VecEnv.__init__(self, n_envs, observation_space, action_space)
+
+    def step_wait(self):
+        results = [remote.recv() for remote in self.remotes]
+        self.waiting = False
+        rews, dones, infos, self.reset_infos = zip(*results)
+        # Copy: SB3 keeps the returned array in its rollout buffer while the workers overwrite the rows
+        return self._obs.copy(), np.stack(rews), np.stack(dones), infos
+
+    def reset(self):
+        for env_idx, remote in enumerate(self.remotes):
+            remote.send(("reset", (self._seeds[env_idx], self._options[env_idx])))
+        self.reset_infos = [remote.recv() for remote in self.remotes]
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs.copy()
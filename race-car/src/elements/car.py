@@ -1,10 +1,39 @@
-import pygame
-from typing import Optional
-from ..mathematics.vector import Vector 
-from .road import Lane   
+import struct
+from functools import lru_cache
+from typing import Optional, Tuple
+from ..mathematics.vector import Vector
+from ..mathematics.collision import Rect
+from .road import Lane
 from ..mathematics.randomizer import random_number
 
+
+@lru_cache(maxsize=None)
+def sprite_size(path: str, target_height: int) -> Tuple[int, int]:
+    """
+    Size a sprite will have once scaled to the target height, read from the PNG header
+    so the simulation never has to load or scale the image itself.
+
+    :param path: The file path to the sprite image.
+    :param target_height: The target height to scale the sprite to.
+    :return: The (width, height) of the scaled sprite.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(24)
+        if header[:8] != b"\x89PNG\r\n\x1a\n":
+            raise ValueError("not a PNG file")
+        width, height = struct.unpack(">II", header[16:24])
+        aspect_ratio = width / height
+        return int(aspect_ratio * target_height), target_height
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Error reading sprite size: {e}")
+        return target_height, target_height  # Same size as the placeholder surface in load_sprite
+
+
 class Car:
+    __slots__ = ("color", "velocity", "lane", "x", "y", "sprite_path", "target_height", "width", "height",
+                 "_sprite", "_rect")
+
     def __init__(self, color: str, velocity: Vector, lane: Optional[Lane] = None, target_height: int = 40):
         """
         Initialize a Car object.
@@ -18,20 +47,32 @@ class Car:
         self.lane = lane
         self.x = 0
         self.y = 0
-        self.sprite = self.load_sprite(f"public/assets/{color}car.png", target_height)
+        self.sprite_path = f"public/assets/{color}car.png"
+        self.target_height = target_height
+        self.width, self.height = sprite_size(self.sprite_path, target_height)
+        self._sprite = None
+        self._rect = Rect(0, 0, self.width, self.height)  # Reused by rect, see there
+
+    @property
+    def sprite(self):
+        """The car's pygame.Surface, loaded the first time something renders the car."""
+        if self._sprite is None:
+            self._sprite = self.load_sprite(self.sprite_path, self.target_height)
+        return self._sprite
 
-    def update(self, ego: 'Car'):
+    def update(self, ego: 'Car', rng=None):
         """
         Update the car's position based on its velocity and the ego car's velocity.
 
         :param ego: The ego car (reference car).
+        :param rng: The game's random.Random (default: the global randomizer RNG).
         """
         if self == ego:
             self.y += self.velocity.y
             return
-        self.x += self.velocity.x - ego.velocity.x 
+        self.x += self.velocity.x - ego.velocity.x
         self.y += self.velocity.y
-        rn = random_number() - 0.5
+        rn = random_number(rng) - 0.5
         velocity_change = rn / 5
         self.velocity.x = self.velocity.x + velocity_change
 
@@ -63,7 +104,7 @@ class Car:
         self.velocity.y += amount
 
 
-    def load_sprite(self, path: str, target_height: int) -> pygame.Surface:
+    def load_sprite(self, path: str, target_height: int):
         """
         Load the car's sprite from the given file path.
 
@@ -71,6 +112,8 @@ class Car:
         :param target_height: The target height to scale the sprite to.
         :return: The loaded sprite as a pygame.Surface.
         """
+        import pygame
+
         try:
             sprite = pygame.image.load(path)
             aspect_ratio = sprite.get_width() / sprite.get_height()
@@ -83,21 +126,21 @@ class Car:
             return pygame.Surface((target_height, target_height))  # Return a placeholder surface if loading fails
 
     @property
-    def rect(self):
-        """Return the pygame.Rect representing the car's current position and size."""
-        if self.sprite:
-            return pygame.Rect(
-                int(self.x),
-                int(self.y),
-                self.sprite.get_width(),
-                self.sprite.get_height()
-            )
-        else:
-            # Default size if sprite is missing
-            return pygame.Rect(int(self.x), int(self.y), 50, 50)
-
-    def get_bounds(self) -> pygame.Rect:
+    def rect(self) -> Rect:
+        """
+        Return the Rect representing the car's current position and size.
+
+        This is one shared, mutable Rect that the car moves to its current position on every
+        access instead of allocating a new one. Do not hold it across a position change:
+        the next access (or get_bounds) moves it. Copy the values you need to keep.
+        """
+        rect = self._rect
+        rect.x = int(self.x)
+        rect.y = int(self.y)
+        return rect
+
+    def get_bounds(self) -> Rect:
         """
         Returns the bounding rectangle of the car for collision/sensor purposes.
         """
-        return self.rect
\ No newline at end of file
+        return self.rect
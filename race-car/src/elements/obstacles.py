@@ -0,0 +1,90 @@
+from typing import Dict, Iterator, List
+
+from .car import Car
+from .road import Lane
+from .wall import Wall
+
+
+class ObstacleIndex:
+    """
+    The other cars bucketed by lane and kept sorted by x within each lane, plus the walls.
+    GameState keeps it in step with its cars (add in place_car, remove in
+    remove_passed_cars, refresh after the cars move), so sensors and collision checks only
+    look at obstacles in the lanes and x range they can actually reach.
+    """
+
+    def __init__(self, lanes: List[Lane], walls: List[Wall]):
+        """
+        Initialize an empty index.
+
+        :param lanes: The lanes of the road; every indexed car must be in one of them.
+        :param walls: The walls of the road.
+        """
+        self.lanes = list(lanes)
+        self.walls = list(walls)
+        self._by_lane: Dict[Lane, List[Car]] = {lane: [] for lane in self.lanes}
+
+    def add(self, car: Car):
+        """
+        Index a car that was just placed in its lane.
+
+        :param car: The car; its lane and x must already be set.
+        """
+        cars = self._by_lane[car.lane]
+        i = len(cars)
+        while i > 0 and cars[i - 1].x > car.x:
+            i -= 1
+        cars.insert(i, car)
+
+    def remove(self, car: Car):
+        """
+        Drop a car from the index; call before its lane is cleared.
+
+        :param car: The car to drop.
+        """
+        self._by_lane[car.lane].remove(car)
+
+    def refresh(self):
+        """Restore the x order after the cars moved (cars in one lane rarely swap)."""
+        for cars in self._by_lane.values():
+            if len(cars) > 1:
+                cars.sort(key=_car_x)
+
+    def rebuild(self, cars: List[Car]):
+        """
+        Re-index from scratch, e.g. after a snapshot was restored.
+
+        :param cars: The cars to index, not including the ego car.
+        """
+        for lane_cars in self._by_lane.values():
+            lane_cars.clear()
+        for car in cars:
+            self._by_lane[car.lane].append(car)
+        self.refresh()
+
+    def cars_in(self, x_min: float, x_max: float, y_min: float, y_max: float) -> Iterator[Car]:
+        """
+        Cars whose bounds may overlap the given area. Cars never leave their lane, so
+        only the lanes overlapping [y_min, y_max] are scanned, each until x passes x_max.
+
+        :return: The candidate cars, lane by lane in x order.
+        """
+        for lane in self.lanes:
+            if lane.y_end < y_min or lane.y_start > y_max:
+                continue
+            for car in self._by_lane[lane]:
+                if car.x > x_max + 1:  # +1: rects truncate x to an int
+                    break
+                if car.x + car.width >= x_min - 1:
+                    yield car
+
+    def walls_in(self, y_min: float, y_max: float) -> Iterator[Wall]:
+        """Walls overlapping the band [y_min, y_max]; they span the whole road width."""
+        for wall in self.walls:
+            rect = wall.rect
+            if rect.y <= y_max and rect.y + rect.height >= y_min:
+                yield wall
+
+
+def _car_x(car: Car) -> float:
+    return car.x
@@ -1,4 +1,3 @@
-import pygame
 from typing import List, Dict
 from .wall import Wall  
 from ..mathematics.randomizer import random_number
@@ -27,8 +26,7 @@ class Road:
         self.lanes: List[Lane] = []
         self.walls: List[Wall] = []
 
-        self.surface = pygame.Surface((width, height))
-        self.build_background()
+        self._surface = None
         self.build_lanes(self.lane_height)
 
         self.y_start = self.lanes[0].y_start
@@ -39,6 +37,21 @@ class Road:
             Wall(0, self._height - self._margin, self._width, self._margin)  # Bottom wall
         ]
 
+    @property
+    def surface(self):
+        """
+        The rendered road background. Only built the first time something draws the road,
+        so headless games never allocate it.
+        """
+        if self._surface is None:
+            import pygame
+
+            self._surface = pygame.Surface((self._width, self._height))
+            self.build_background()
+            self.build_sidelines()
+            self.build_middle_lines()
+        return self._surface
+
     def first_lane(self) -> Lane:
         return self.lanes[0]
 
@@ -48,8 +61,8 @@ class Road:
     def last_lane(self) -> Lane:
         return self.lanes[-1]
 
-    def random_lane(self) -> Lane:
-        return self.lanes[int(random_number() * len(self.lanes))] 
+    def random_lane(self, rng=None) -> Lane:
+        return self.lanes[int(random_number(rng) * len(self.lanes))] 
 
     def build_background(self):
         """
@@ -64,9 +77,6 @@ class Road:
             y_end = y_start + lane_height
             self.lanes.append(Lane(y_start, y_end, f"Lane {i+1}"))
 
-        self.build_sidelines()
-        self.build_middle_lines()
-
     def build_sidelines(self):
         # Draw top and bottom sidelines
         self.draw_line(0, self.lanes[0].y_start, self._width, self._line_height, (255, 255, 255))
@@ -78,6 +88,8 @@ class Road:
             self.draw_line(0, lane.y_start, self._width, self._line_height, (255, 255, 255))
 
     def draw_line(self, x: int, y: int, width: int, height: int, color: tuple):
+        import pygame
+
         pygame.draw.rect(self.surface, color, pygame.Rect(x, int(y), width, int(height)))
 
     def get_lane_height(self):
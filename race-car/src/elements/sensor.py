@@ -1,14 +1,10 @@
-import pygame
+import math
+import numpy as np
 from ..mathematics.vector import Vector  # Assuming a Vector class exists
 from typing import List, Optional
-from ..mathematics.collision import get_intersection_point, get_lines_of_rectangle  # Assuming collision utilities exist
+from ..mathematics.collision import ray_box_distances, ray_directions
 from .car import Car  # Assuming a Car class exists
 
-class Line:
-    def __init__(self, start, end):
-        self.start = start
-        self.end = end
-
 class Sensor:
     def __init__(self, car: Car, angle: float, name: str, state):
         """
@@ -27,96 +23,119 @@ class Sensor:
         self.sensor_color = (255, 0, 0)  # Red
         self.sensor_strength = 1000
 
+        # Unit beam direction, precomputed once per sensor angle
+        self.direction = ray_directions([self.degrees])[0]
+
         # Calculate the sensor beam vector
         vector = Vector(0, -self.sensor_strength).rotate(self.degrees)
 
-        # Create the beam as a line
+        # The beam starts at the car center; its end and the text are derived from the
+        # start and the reading only when something draws them
         self.beam_start = (0, 0)
-        self.beam_end = (vector.x, vector.y)
 
         # Create a placeholder for text display
         self.text_position = (vector.x * 0.3, vector.y * 0.3)
-        self.text = ""
 
         self.state = state
 
+    @property
+    def beam_end(self) -> tuple:
+        """The end of the beam, sensor_strength away from beam_start."""
+        return (
+            self.beam_start[0] + self.direction[0] * self.sensor_strength,
+            self.beam_start[1] + self.direction[1] * self.sensor_strength,
+        )
+
+    @property
+    def text(self) -> str:
+        """The reading as drawn next to the beam, empty when nothing was hit."""
+        return f"{self.reading:.2f}" if self.reading is not None else ""
+
     def update(self):
         """
         Update the sensor's position, visibility, and reading.
         """
-        # Update visibility based on global state
-        visible = self.state.sensors_enabled
-
-        # Update position
-        car_rect = self.car.get_bounds()
-        car_center = Vector(car_rect.centerx, car_rect.centery)
-        self.beam_start = (car_center.x, car_center.y)
-        sensor_beam_end = car_center.add(Vector(0, -self.sensor_strength).rotate(self.degrees))
-        self.beam_end = (sensor_beam_end.x, sensor_beam_end.y)
+        update_sensors([self])
 
-        # Reset reading
-        self.reading = None
-        sensor_line = Line(car_center, sensor_beam_end)
-
-        min_reading = None
-
-        # Sense cars
-        for car in self.state.cars:
-            if car == self.state.ego:
-                continue
-            bounds = car.get_bounds()
-            reading = self.get_sensor_reading_for_bounding_box(bounds, sensor_line, car_center)
-            if reading is not None and 0 <= reading <= self.sensor_strength:
-                if min_reading is None or reading < min_reading:
-                    min_reading = reading
-
-        # Sense walls
-        for wall in self.state.road.walls:
-            bounds = wall.get_bounds()
-            reading = self.get_sensor_reading_for_bounding_box(bounds, sensor_line, car_center)
-            if reading is not None and 0 <= reading <= self.sensor_strength:
-                if min_reading is None or reading < min_reading:
-                    min_reading = reading
-
-        self.reading = min_reading
-
-        # Update text
-        if self.reading is not None:
-            self.text = f"{self.reading:.2f}"
-        else:
-            self.text = ""
-
-    def get_sensor_reading_for_bounding_box(self, bb: pygame.Rect, sensor_line: dict, car_center: Vector) -> Optional[float]:
+    def set_reading(self, car_center: tuple, reading: Optional[float]):
         """
-        Calculate the sensor reading for a bounding box.
+        Store a reading computed for this sensor and move the beam to the car center.
 
-        :param bb: The bounding box as a pygame.Rect.
-        :param sensor_line: The sensor line as a dictionary with 'start' and 'end' keys.
-        :param car_center: The center of the car as a Vector.
-        :return: The distance to the closest intersection, or None if no intersection.
+        :param car_center: The center of the car as an (x, y) tuple.
+        :param reading: The distance to the closest obstacle, or None if nothing was hit.
         """
-        lines = get_lines_of_rectangle(bb)
-        min_distance = None
-        for line in lines:
-            intersection = get_intersection_point(sensor_line, line)
-            if intersection:
-                distance = car_center.distance(intersection)
-                if min_distance is None or distance < min_distance:
-                    min_distance = distance
-        return min_distance
-
-    def draw(self, surface: pygame.Surface):
+        self.beam_start = car_center
+        self.reading = reading
+
+    def draw(self, surface) -> list:
         """
         Draw the sensor beam and text on the given surface.
+
+        :return: The areas that were drawn on, as pygame.Rects.
         """
+        import pygame
+        from ..game.render import glyphs
+
+        dirty = []
         if self.state.sensors_enabled:
             # Draw the beam
-            pygame.draw.line(surface, self.sensor_color, self.beam_start, self.beam_end, self.sensor_width)
-
-            # Draw the text at 30% along the beam
-            if self.text:
-                font = pygame.font.SysFont("monospace", 16)
-                text_surface = font.render(self.text, True, (255, 255, 255))  # White text
-                text_x = self.beam_start[0] + 0.3 * (self.beam_end[0] - self.beam_start[0])
-                text_y = self.beam_start[1] + 0.3 * (self.beam_end[1] - self.beam_start[1])
-                surface.blit(text_surface, (text_x, text_y))
\ No newline at end of file
+            beam_end = self.beam_end
+            dirty.append(pygame.draw.line(surface, self.sensor_color, self.beam_start, beam_end, self.sensor_width))
+
+            # Draw the text at 30% along the beam, from the shared pre-rendered glyphs
+            text = self.text
+            if text:
+                text_x = self.beam_start[0] + 0.3 * (beam_end[0] - self.beam_start[0])
+                text_y = self.beam_start[1] + 0.3 * (beam_end[1] - self.beam_start[1])
+                dirty.append(glyphs().draw(surface, text, (text_x, text_y)))
+        return dirty
+
+
+def obstacle_boxes(state, center: tuple = None, reach: float = None) -> np.ndarray:
+    """
+    Bounding boxes of everything a sensor can see: the other cars, then the walls.
+    With a center and reach, only obstacles within reach of the center (per the game's
+    obstacle index) are returned.
+
+    :param state: The game state.
+    :param center: Optional (x, y) the sensors are cast from.
+    :param reach: Optional sensor range around center.
+    :return: An array of shape (M, 4) with one (x, y, width, height) row per obstacle.
+    """
+    index = getattr(state, "obstacles", None)
+    if index is None or center is None:
+        rects = [car.get_bounds() for car in state.cars if car != state.ego]
+        rects += [wall.get_bounds() for wall in state.road.walls]
+    else:
+        x, y = center
+        rects = [car.get_bounds() for car in index.cars_in(x - reach, x + reach, y - reach, y + reach)]
+        rects += [wall.get_bounds() for wall in index.walls_in(y - reach, y + reach)]
+    return np.array([(r.x, r.y, r.width, r.height) for r in rects], dtype=np.float64).reshape(-1, 4)
+
+
+def update_sensors(sensors: List[Sensor], directions: np.ndarray = None) -> np.ndarray:
+    """
+    Update a group of sensors on the same car with a single vectorized ray cast.
+
+    :param sensors: The sensors to update; they must share car and state.
+    :param directions: Optional (K, 2) array of the sensors' directions, to reuse across calls.
+    :return: The readings in the order of sensors, NaN where nothing was hit.
+    """
+    if not sensors:
+        return np.empty(0)
+    first = sensors[0]
+    car_rect = first.car.get_bounds()
+    car_center = (car_rect.centerx, car_rect.centery)
+
+    if directions is None:
+        directions = np.array([sensor.direction for sensor in sensors])
+    boxes = obstacle_boxes(first.state, car_center, first.sensor_strength)
+    readings = ray_box_distances(car_center, directions, boxes, first.sensor_strength)
+    profiler = getattr(first.state, "profiler", None)
+    if profiler is not None:
+        profiler.count("rays", len(sensors))
+        profiler.count("ray_box_tests", len(sensors) * len(boxes))
+
+    for sensor, reading in zip(sensors, readings.tolist()):
+        sensor.set_reading(car_center, None if math.isnan(reading) else reading)
+    return readings
@@ -1,4 +1,4 @@
-import pygame
+from ..mathematics.collision import Rect
 
 class Wall:
     def __init__(self, x: int, y: int, width: int, height: int):
@@ -10,18 +10,20 @@ class Wall:
         :param width: The width of the wall.
         :param height: The height of the wall.
         """
-        self.rect = pygame.Rect(x, y, width, height)
+        self.rect = Rect(x, y, width, height)
         self.color = (21, 19, 23)  # Dark gray color
 
-    def draw(self, surface: pygame.Surface):
+    def draw(self, surface):
         """
         Draw the wall on the given surface.
 
         :param surface: The pygame surface to draw the wall on.
         """
-        pygame.draw.rect(surface, self.color, self.rect)
+        import pygame
 
-    def get_bounds(self) -> pygame.Rect:
+        pygame.draw.rect(surface, self.color, tuple(self.rect))
+
+    def get_bounds(self) -> Rect:
         """
         Returns the bounding rectangle of the car for collision/sensor purposes.
         """
@@ -0,0 +1,301 @@
+import random
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .core import ACTIONS, SCREEN_WIDTH, SCREEN_HEIGHT, LANE_COUNT, MAX_TICKS, SENSOR_OPTIONS
+from ..elements.car import sprite_size
+from ..elements.road import Road
+from ..mathematics.collision import ray_box_distances, ray_directions
+from ..mathematics.randomizer import create_rng
+
+# Action indices used by the array engine: the index in core.ACTIONS
+ACTION_INDEX = {name: i for i, name in enumerate(ACTIONS)}
+
+SENSOR_NAMES = [name for _, name in SENSOR_OPTIONS]
+SENSOR_STRENGTH = 1000
+
+# Cars are retired once they leave this x-range (see core.remove_passed_cars)
+MIN_CAR_X = -1000
+MAX_CAR_X = SCREEN_WIDTH + 1000
+
+X_OFFSET_BEHIND = -0.5
+X_OFFSET_IN_FRONT = 1.5
+SPEED_COEFF_MODIFIER = 5
+
+
+def _sprite_size(color: str, target_height: int):
+    return sprite_size(f"public/assets/{color}car.png", target_height)
+
+
+class BatchGame:
+    """
+    Array-backed engine that advances N independent seeded games per call.
+
+    Positions, velocities, lane occupancy and sensor readings for every game live in
+    NumPy arrays. Each game owns its own random.Random and draws from it in exactly the
+    same order as the scalar path in core.py, and sensors go through the same
+    ray_box_distances kernel as Sensor, so for the same seed and action sequence
+    distance, crash tick and sensor readings match GameState. tests/test_batch.py checks
+    them against traces recorded from the original one-game engine: distance and crash
+    tick match exactly, and readings do to within the last bit of ray_box_distances.
+
+    Other cars occupy fixed slots (one per car created in GameState.setup). The
+    per-game `order` list mirrors GameState.cars and `bucket` mirrors GameState.car_bucket, since
+    both determine which random draws go to which car.
+    """
+
+    def __init__(self, seeds: Sequence, sensor_removal: int = 0, max_ticks: int = MAX_TICKS):
+        """
+        :param seeds: One seed value per game (same semantics as core.initialize_game_state).
+        :param sensor_removal: Number of randomly removed sensors per game.
+        :param max_ticks: Ticks after which a game is over.
+        """
+        n = len(seeds)
+        self.size = n
+        self.sensor_removal = sensor_removal
+        self.max_ticks = max_ticks
+
+        road = Road(SCREEN_WIDTH, SCREEN_HEIGHT, LANE_COUNT)
+        self.lane_y = [(lane.y_start, lane.y_end) for lane in road.lanes]
+        self.middle_lane = road.lanes.index(road.middle_lane())
+        self.target_height = int(road.get_lane_height() * 0.8)
+        self.walls = np.array(
+            [[w.rect.x, w.rect.y, w.rect.width, w.rect.height] for w in road.walls], dtype=np.float64
+        )
+
+        slots = LANE_COUNT - 1
+        self.slots = slots
+        self.ego_w, self.ego_h = _sprite_size("yellow", self.target_height)
+
+        # Ego state
+        self.ego_x = np.zeros(n, dtype=np.float64)
+        self.ego_y = np.zeros(n, dtype=np.float64)
+        self.ego_vx = np.zeros(n, dtype=np.float64)
+        self.ego_vy = np.zeros(n, dtype=np.float64)
+
+        # Other cars, one column per slot
+        self.car_x = np.zeros((n, slots), dtype=np.float64)
+        self.car_y = np.zeros((n, slots), dtype=np.float64)
+        self.car_vx = np.zeros((n, slots), dtype=np.float64)
+        self.car_w = np.zeros((n, slots), dtype=np.int64)
+        self.car_h = np.zeros((n, slots), dtype=np.int64)
+        self.car_lane = np.full((n, slots), -1, dtype=np.int64)
+        self.active = np.zeros((n, slots), dtype=bool)
+
+        # Per-game bookkeeping
+        self.distance = np.zeros(n, dtype=np.float64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.crashed = np.zeros(n, dtype=bool)
+
+        # Sensor readings in SENSOR_OPTIONS order; NaN means no reading (None in Sensor)
+        self.sensor_mask = np.ones((n, len(SENSOR_OPTIONS)), dtype=bool)
+        self.readings = np.full((n, len(SENSOR_OPTIONS)), np.nan, dtype=np.float64)
+        self._directions = ray_directions([angle for angle, _ in SENSOR_OPTIONS])
+
+        self.rngs: List[Optional[random.Random]] = [None] * n
+        self.order: List[List[int]] = [[] for _ in range(n)]
+        self.bucket: List[List[int]] = [[] for _ in range(n)]
+
+        for i, seed_value in enumerate(seeds):
+            self.reset_game(i, seed_value)
+
+    @property
+    def done(self) -> np.ndarray:
+        """Games that are over (crashed or out of ticks)."""
+        return self.crashed | (self.ticks >= self.max_ticks)
+
+    def reset_game(self, i: int, seed_value):
+        """
+        Re-initialize game i with a new seed, mirroring core.initialize_game_state.
+        """
+        rng = create_rng(seed_value)
+        self.rngs[i] = rng
+
+        sensor_options = list(range(len(SENSOR_OPTIONS)))
+        for _ in range(self.sensor_removal):
+            sensor_options.remove(rng.choice(sensor_options))
+        self.sensor_mask[i] = False
+        self.sensor_mask[i, sensor_options] = True
+        self.readings[i] = np.nan
+
+        y_start, y_end = self.lane_y[self.middle_lane]
+        self.ego_x[i] = (SCREEN_WIDTH // 2) - (self.ego_w // 2)
+        self.ego_y[i] = int((y_start + y_end) / 2 - self.ego_h / 2)
+        self.ego_vx[i] = 10
+        self.ego_vy[i] = 0
+
+        for slot in range(self.slots):
+            color = rng.choice(["blue", "red"])
+            self.car_w[i, slot], self.car_h[i, slot] = _sprite_size(color, self.target_height)
+        self.car_x[i] = 0
+        self.car_y[i] = 0
+        self.car_vx[i] = 0
+        self.car_lane[i] = -1
+        self.active[i] = False
+        self.order[i] = []
+        self.bucket[i] = list(range(self.slots))
+
+        self.distance[i] = 0
+        self.ticks[i] = 0
+        self.crashed[i] = False
+
+    def _action_codes(self, actions) -> np.ndarray:
+        if isinstance(actions, np.ndarray) and actions.dtype.kind in "iu":
+            return actions
+        return np.array(
+            [a if isinstance(a, (int, np.integer)) else ACTION_INDEX.get(a, ACTION_INDEX["NOTHING"]) for a in actions],
+            dtype=np.int64,
+        )
+
+    def step(self, actions, active: np.ndarray = None) -> np.ndarray:
+        """
+        Advance every game that is not over by one tick.
+
+        :param actions: One action per game, as ACTIONS indices or action strings.
+        :param active: Optional boolean mask; games outside it are paused this tick.
+        :return: Boolean mask of games that were advanced.
+        """
+        live = ~self.done if active is None else ~self.done & active
+        games = np.flatnonzero(live)
+        if games.size == 0:
+            return live
+        codes = self._action_codes(actions)
+
+        self.ticks[live] += 1
+        self._handle_actions(live, codes)
+        self.distance[live] += self.ego_vx[live]
+        self._update_cars(live, games)
+        self._remove_passed_cars(live)
+        self._place_cars(games)
+        self._update_sensors(live)
+        self._check_collisions(live)
+        return live
+
+    def _handle_actions(self, live: np.ndarray, codes: np.ndarray):
+        accelerate = live & (codes == ACTION_INDEX["ACCELERATE"])
+        decelerate = live & (codes == ACTION_INDEX["DECELERATE"])
+        self.ego_vx[accelerate] += 0.1
+        self.ego_vx[decelerate] -= 0.1
+        self.ego_vx[decelerate & (self.ego_vx < 0)] = 0
+        self.ego_vy[live & (codes == ACTION_INDEX["STEER_LEFT"])] += -0.1
+        self.ego_vy[live & (codes == ACTION_INDEX["STEER_RIGHT"])] += 0.1
+
+    def _update_cars(self, live: np.ndarray, games: np.ndarray):
+        self.ego_y[live] += self.ego_vy[live]
+
+        # Draw the velocity noise per car in GameState.cars order so every game keeps
+        # consuming its RNG exactly like Car.update
+        noise = np.zeros_like(self.car_vx)
+        for g in games:
+            rnd = self.rngs[g].random
+            for slot in self.order[g]:
+                noise[g, slot] = rnd()
+
+        moving = self.active & live[:, None]
+        relative = self.car_vx - self.ego_vx[:, None]
+        self.car_x[moving] += relative[moving]
+        self.car_vx[moving] = self.car_vx[moving] + (noise[moving] - 0.5) / 5
+
+    def _remove_passed_cars(self, live: np.ndarray):
+        passed = self.active & live[:, None] & ((self.car_x < MIN_CAR_X) | (self.car_x > MAX_CAR_X))
+        for g in np.flatnonzero(passed.any(axis=1)):
+            keep = []
+            for slot in self.order[g]:
+                if passed[g, slot]:
+                    self.bucket[g].append(slot)
+                    self.car_lane[g, slot] = -1
+                    self.active[g, slot] = False
+                else:
+                    keep.append(slot)
+            self.order[g] = keep
+
+    def _place_cars(self, games: np.ndarray):
+        for g in games:
+            order = self.order[g]
+            if len(order) + 1 > LANE_COUNT:
+                continue
+            rng = self.rngs[g]
+            taken = {int(self.car_lane[g, slot]) for slot in order}
+            open_lanes = [lane for lane in range(LANE_COUNT) if lane not in taken]
+            lane = rng.choice(open_lanes)
+            x_offset = rng.choice([X_OFFSET_BEHIND, X_OFFSET_IN_FRONT])
+            coefficient = rng.random() * SPEED_COEFF_MODIFIER
+
+            bucket = self.bucket[g]
+            if not bucket:
+                continue
+            slot = bucket.pop()
+
+            ego_vx = float(self.ego_vx[g])
+            if x_offset == X_OFFSET_BEHIND:
+                self.car_vx[g, slot] = ego_vx + coefficient
+            else:
+                self.car_vx[g, slot] = ego_vx - coefficient
+            order.append(slot)
+
+            y_start, y_end = self.lane_y[lane]
+            self.car_x[g, slot] = (SCREEN_WIDTH * x_offset) - (int(self.car_w[g, slot]) // 2)
+            self.car_y[g, slot] = int((y_start + y_end) / 2 - int(self.car_h[g, slot]) / 2)
+            self.car_lane[g, slot] = lane
+            self.active[g, slot] = True
+
+    def _ego_rects(self) -> np.ndarray:
+        """Integer ego rects (x, y, w, h) like Car.rect, shape (N, 4)."""
+        n = self.size
+        return np.stack([
+            np.trunc(self.ego_x), np.trunc(self.ego_y),
+            np.full(n, self.ego_w, dtype=np.float64), np.full(n, self.ego_h, dtype=np.float64),
+        ], axis=1)
+
+    def _obstacle_rects(self):
+        """
+        Integer obstacle rects (x, y, w, h) for every car slot followed by both walls,
+        shape (N, slots + walls, 4), plus a validity mask of shape (N, slots + walls).
+        """
+        n = self.size
+        cars = np.stack([np.trunc(self.car_x), np.trunc(self.car_y), self.car_w, self.car_h], axis=2)
+        walls = np.broadcast_to(self.walls, (n,) + self.walls.shape)
+        rects = np.concatenate([cars, walls], axis=1)
+        valid = np.concatenate([self.active, np.ones((n, len(self.walls)), dtype=bool)], axis=1)
+        return rects, valid
+
+    def _update_sensors(self, live: np.ndarray):
+        ego = self._ego_rects()[live]
+        rects, valid = self._obstacle_rects()
+
+        # Car center like pygame.Rect.centerx / centery
+        centers = np.stack([ego[:, 0] + (self.ego_w // 2), ego[:, 1] + (self.ego_h // 2)], axis=1)
+        readings = ray_box_distances(centers, self._directions, rects[live], SENSOR_STRENGTH, valid[live])
+        readings[~self.sensor_mask[live]] = np.nan
+        self.readings[live] = readings
+
+    def _check_collisions(self, live: np.ndarray):
+        ego = self._ego_rects()[:, None, :]
+        rects, valid = self._obstacle_rects()
+        overlap = (
+            (ego[..., 0] < rects[..., 0] + rects[..., 2]) &
+            (ego[..., 1] < rects[..., 1] + rects[..., 3]) &
+            (ego[..., 0] + ego[..., 2] > rects[..., 0]) &
+            (ego[..., 1] + ego[..., 3] > rects[..., 1])
+        )
+        self.crashed |= live & (overlap & valid).any(axis=1)
+
+    def payload(self, i: int) -> dict:
+        """
+        Build the request dict game_loop would send to the policy server for game i.
+        Missing readings are reported as 1000.0 and removed sensors are left out.
+        """
+        sensors = {}
+        for k, name in enumerate(SENSOR_NAMES):
+            if not self.sensor_mask[i, k]:
+                continue
+            value = self.readings[i, k]
+            sensors[name] = 1000.0 if np.isnan(value) else float(value)
+        return {
+            "did_crash": bool(self.crashed[i]),
+            "elapsed_ticks": int(self.ticks[i]),
+            "distance": float(self.distance[i]),
+            "velocity": {"x": float(self.ego_vx[i]), "y": float(self.ego_vy[i])},
+            "sensors": sensors,
+        }
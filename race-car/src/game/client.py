@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List
+
+import requests
+
+from .wire import MEDIA_TYPE, decode_actions, encode_request
+
+# Protocols a game can use to talk to the policy API
+PROTOCOLS = ("json", "binary", "websocket")
+API_HOST = "localhost:9052"
+TIMEOUT = 0.15  # Seconds the game waits for an answer
+
+
+class JsonClient:
+    """POSTs the JSON payload to /predict (the original protocol)."""
+
+    def __init__(self, host: str = API_HOST, timeout: float = TIMEOUT):
+        """
+        :param host: host:port of the API.
+        :param timeout: Seconds to wait for an answer.
+        """
+        self.url = f"http://{host}/predict"
+        self.timeout = timeout
+        # Reuse one TCP connection across all posts (keep-alive)
+        self.session = requests.Session()
+        self.session.headers.update({"Connection": "keep-alive"})
+
+    def predict(self, payload: dict) -> List[str]:
+        resp = self.session.post(self.url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json().get("actions", ["NOTHING"])
+
+    def close(self):
+        self.session.close()
+
+
+class BinaryClient(JsonClient):
+    """POSTs the packed payload (see wire.py) to /predict_bin."""
+
+    def __init__(self, host: str = API_HOST, timeout: float = TIMEOUT):
+        super().__init__(host, timeout)
+        self.url = f"http://{host}/predict_bin"
+        self.session.headers.update({"Content-Type": MEDIA_TYPE})
+
+    def predict(self, payload: dict) -> List[str]:
+        resp = self.session.post(self.url, data=encode_request(payload), timeout=self.timeout)
+        resp.raise_for_status()
+        _, actions = decode_actions(resp.content)
+        return actions
+
+
+class WebSocketClient:
+    """
+    Keeps one WebSocket to /ws open for the whole game and exchanges packed messages on it,
+    so a request costs one frame each way instead of a full HTTP round trip.
+    """
+
+    def __init__(self, host: str = API_HOST, timeout: float = TIMEOUT):
+        """
+        :param host: host:port of the API.
+        :param timeout: Seconds to wait for an answer.
+        """
+        # Only needed for this protocol
+        from websockets.sync.client import connect
+
+        self.timeout = timeout
+        self.connection = connect(f"ws://{host}/ws", open_timeout=max(timeout, 1.0))
+
+    def predict(self, payload: dict) -> List[str]:
+        tick = int(payload.get("elapsed_ticks", 0))
+        self.connection.send(encode_request(payload))
+        while True:
+            answered, actions = decode_actions(self.connection.recv(timeout=self.timeout))
+            # Answers to requests that timed out earlier are still in the pipe; skip them
+            if answered == tick:
+                return actions
+
+    def close(self):
+        self.connection.close()
+
+
+class PendingBatch:
+    """An action batch that has been asked for and may not have arrived yet."""
+
+    def __init__(self, future, deadline: float):
+        """
+        :param future: concurrent.futures.Future that resolves to the actions.
+        :param deadline: time.perf_counter() value after which the answer is given up on.
+        """
+        self.future = future
+        self.deadline = deadline
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> List[str]:
+        """
+        Wait for the actions, but never past the deadline.
+
+        :return: The actions.
+        :raises TimeoutError: If the answer did not arrive in time.
+        """
+        try:
+            return self.future.result(timeout=max(self.deadline - time.perf_counter(), 0.0))
+        except FutureTimeoutError:  # Only an alias of the builtin TimeoutError from Python 3.11
+            self.future.cancel()
+            raise TimeoutError("No answer before the deadline") from None
+
+
+class PipelinedClient:
+    """
+    Runs another client's requests on a background asyncio loop, so the game can ask for
+    its next batch and keep playing the current one while the server thinks.
+
+        pipeline = PipelinedClient(make_client("binary"))
+        pending = pipeline.request(payload)    # returns at once
+        ...                                    # play the remaining actions
+        actions = pending.result()             # usually ready by now
+    """
+
+    def __init__(self, client, timeout: float = TIMEOUT):
+        """
+        :param client: The client doing the actual requests (see make_client); closed with this one.
+        :param timeout: Seconds a request may take, counted from request().
+        """
+        self.client = client
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        # The clients are blocking and hold one connection: one request at a time, in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="policy-client")
+        self._thread = threading.Thread(target=self.loop.run_forever, name="policy-client-loop", daemon=True)
+        self._thread.start()
+
+    async def _fetch(self, payload: dict) -> List[str]:
+        call = self.loop.run_in_executor(self._executor, self.client.predict, payload)
+        return await asyncio.wait_for(call, self.timeout)
+
+    def request(self, payload: dict) -> PendingBatch:
+        """
+        Send a request without waiting for the answer.
+
+        :param payload: The request dict.
+        :return: The pending answer.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._fetch(payload), self.loop)
+        return PendingBatch(future, time.perf_counter() + self.timeout)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+        self._executor.shutdown(wait=False)
+        self.client.close()
+
+
+def make_client(protocol: str = "json", host: str = API_HOST, timeout: float = TIMEOUT):
+    """
+    Create a client for the policy API.
+
+    :param protocol: One of PROTOCOLS.
+    :param host: host:port of the API.
+    :param timeout: Seconds to wait for an answer.
+    :return: An object with predict(payload) -> actions and close().
+    """
+    if protocol == "json":
+        return JsonClient(host, timeout)
+    if protocol == "binary":
+        return BinaryClient(host, timeout)
+    if protocol == "websocket":
+        return WebSocketClient(host, timeout)
+    raise ValueError(f"Unknown protocol {protocol!r}, expected one of {PROTOCOLS}")
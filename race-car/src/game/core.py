@@ -1,13 +1,21 @@
-import pygame
-from time import sleep
-import requests
+from time import perf_counter_ns, sleep
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
 #from typing import List, Optional
-from ..mathematics.randomizer import seed, random_choice, random_number
+from ..mathematics.randomizer import create_rng, new_seed, random_choice, random_number
 from ..elements.car import Car
 from ..elements.road import Road
-from ..elements.sensor import Sensor
+from ..elements.sensor import Sensor, update_sensors
+from ..elements.obstacles import ObstacleIndex
+from .profiling import Profiler
+import os
 from ..mathematics.vector import Vector
 import json
+import numpy as np
+
+# replay, wire (through client) and trajectory import the tables below from this module,
+# so they are only imported where a game needs them
+if TYPE_CHECKING:
+    from .replay import ActionRecorder
 
 # Define constants
 SCREEN_WIDTH = 1600
@@ -16,14 +24,78 @@ LANE_COUNT = 5
 CAR_COLORS = ['yellow', 'blue', 'red']
 MAX_TICKS = 60 * 60  # 60 seconds @ 60 fps
 MAX_MS = 60 * 1000600   # 60 seconds flat
-
-# Reuse one TCP connection across all posts (keep-alive)
-session = requests.Session()
-session.headers.update({"Connection": "keep-alive"})
+FPS = 60
+MS_PER_TICK = 1000 / FPS  # Game time per tick when not bound to the wall clock
+
+# Sensor (angle, name) pairs in the order they are attached to the ego car
+SENSOR_OPTIONS = [
+    (90, "front"),
+    (135, "right_front"),
+    (180, "right_side"),
+    (225, "right_back"),
+    (270, "back"),
+    (315, "left_back"),
+    (0, "left_side"),
+    (45, "left_front"),
+    (22.5, "left_side_front"),
+    (67.5, "front_left_front"),
+    (112.5, "front_right_front"),
+    (157.5, "right_side_front"),
+    (202.5, "right_side_back"),
+    (247.5, "back_right_back"),
+    (292.5, "back_left_back"),
+    (337.5, "left_side_back"),
+]
+SENSOR_COLUMN = {name: k for k, (_, name) in enumerate(SENSOR_OPTIONS)}  # Index into GameState.sensor_readings
+
+# Fixed sensor order of the binary wire format (wire.py) and the policies' observation vectors
+SENSOR_ORDER = [
+    "left_side", "left_side_front", "left_front", "front_left_front",
+    "front", "front_right_front", "right_front", "right_side_front",
+    "right_side", "right_side_back", "right_back", "back_right_back",
+    "back", "back_left_back", "left_back", "left_side_back",
+]
+
+# Actions a policy can answer with; an action's index is its code in recordings, on the
+# wire and in the RL envs' action spaces
+ACTIONS = ["ACCELERATE", "DECELERATE", "STEER_LEFT", "STEER_RIGHT", "NOTHING"]
 
 # Define game state
+class GameSnapshot(NamedTuple):
+    """
+    Everything that changes while a game runs, as plain values: no cars, sprites or
+    sensors are copied, so taking and restoring one costs a few microseconds.
+    Cars are referred to by their index in GameState.roster.
+    """
+    ticks: int
+    elapsed_game_time: float
+    distance: float
+    crashed: bool
+    latest_action: str
+    cars: Tuple[Tuple[float, float, float, float, object], ...]  # (x, y, vx, vy, lane) per roster car
+    order: Tuple[int, ...]   # GameState.cars
+    bucket: Tuple[int, ...]  # GameState.car_bucket
+    rng: tuple
+    sensors: Tuple[Tuple[Optional[float], tuple], ...]  # (reading, beam_start)
+    sensor_readings: tuple  # GameState.sensor_readings
+    sensed: bool  # Whether the sensors were up to date with the world
+
+
 class GameState:
-    def __init__(self, api_url: str):
+    """
+    One self-contained game: the world, the ego car, its sensors and the RNG that drives
+    the traffic. Every update is a method, so any number of games can run side by side in
+    one process (threads, asyncio, batched evaluation) without touching each other.
+    The module-level functions below operate on STATE and are kept for existing callers.
+    """
+
+    def __init__(self, api_url: str, seed_value=None):
+        """
+        Initialize an empty game; use create_game_state() to get one that is ready to play.
+
+        :param api_url: The URL of the prediction API.
+        :param seed_value: Seed for this game's own RNG; None draws a fresh one (see new_seed).
+        """
         self.ego = None
         self.cars = []
         self.car_bucket = []
@@ -37,81 +109,321 @@ class GameState:
         self.distance = 0
         self.latest_action = "NOTHING"
         self.ticks = 0
+        self.seed_value = new_seed() if seed_value is None else seed_value
+        self.sensor_removal = 0
+        self.rng = create_rng(self.seed_value)
+        self.roster = []  # Every car of the game, ego first; fixed after setup
+        self.obstacles = None  # ObstacleIndex over the other cars, built in setup
+        self._roster_index = {}
+        self.profiler = None  # Optional profiling.Profiler; when set, step() times every phase
+        # Readings in SENSOR_OPTIONS order, NaN for no hit or a removed sensor. Refreshed by
+        # update_sensors() at most once per world_version, which every change to the world bumps
+        self.sensor_readings = np.full(len(SENSOR_OPTIONS), np.nan)
+        self.world_version = 0
+        self._sensed_version = -1
+        self._sensor_rays = (None, None, None)  # (sensors list, columns, directions) cached for it
+
+    def setup(self, sensor_removal: int = 0):
+        """
+        Build the road, the ego car, its sensors and the pool of other cars.
+
+        :param sensor_removal: Number of sensors to remove at random.
+        """
+        self.sensor_removal = sensor_removal
+        # Create environment
+        self.road = Road(SCREEN_WIDTH, SCREEN_HEIGHT, LANE_COUNT)
+        self.obstacles = ObstacleIndex(self.road.lanes, self.road.walls)
+        middle_lane = self.road.middle_lane()
+        lane_height = self.road.get_lane_height()
+
+        # Create ego car
+        ego_velocity = Vector(10, 0)
+        self.ego = Car("yellow", ego_velocity, lane=middle_lane, target_height=int(lane_height * 0.8))
+        self.ego.x = (SCREEN_WIDTH // 2) - (self.ego.width // 2)
+        self.ego.y = int((middle_lane.y_start + middle_lane.y_end) / 2 - self.ego.height / 2)
+        sensor_options = list(SENSOR_OPTIONS)
+
+        for _ in range(sensor_removal): # Removes random sensors
+            random_sensor = random_choice(sensor_options, self.rng)
+            sensor_options.remove(random_sensor)
+        self.sensors = [
+            Sensor(self.ego, angle, name, self)
+            for angle, name in sensor_options
+        ]
 
-STATE = None
-
-
-def intersects(rect1, rect2):
-    return rect1.colliderect(rect2)
-
-# Game logic
-def handle_action(action: str):
-    if action == "ACCELERATE":
-        STATE.ego.speed_up()
-    elif action == "DECELERATE":
-        STATE.ego.slow_down()
-    elif action == "STEER_LEFT":
-        STATE.ego.turn(-0.1)
-    elif action == "STEER_RIGHT":
-        STATE.ego.turn(0.1)
-    else:
-        pass
-
-def update_cars():
-    for car in STATE.cars:
-        car.update(STATE.ego)
-
-
-def remove_passed_cars():
-    min_distance = -1000
-    max_distance = SCREEN_WIDTH + 1000
-    cars_to_keep = []
-    cars_to_retire = []
-
-    for car in STATE.cars:
-        if car.x < min_distance or car.x > max_distance:
-            cars_to_retire.append(car)
+        # Create other cars and add to car bucket
+        for i in range(0, LANE_COUNT - 1):
+            car_colors = ["blue", "red"]
+            color = random_choice(car_colors, self.rng)
+            car = Car(color, Vector(8, 0), target_height=int(lane_height * 0.8))
+            self.car_bucket.append(car)
+
+        self.cars = [self.ego]
+        self.roster = [self.ego] + self.car_bucket
+        self._roster_index = {car: i for i, car in enumerate(self.roster)}
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Capture the game, including its RNG, so it can be rolled back with restore().
+        """
+        index = self._roster_index
+        return GameSnapshot(
+            self.ticks,
+            self.elapsed_game_time,
+            self.distance,
+            self.crashed,
+            self.latest_action,
+            tuple((car.x, car.y, car.velocity.x, car.velocity.y, car.lane) for car in self.roster),
+            tuple(index[car] for car in self.cars),
+            tuple(index[car] for car in self.car_bucket),
+            self.rng.getstate(),
+            tuple((s.reading, s.beam_start) for s in self.sensors),
+            tuple(self.sensor_readings.tolist()),
+            self._sensed_version == self.world_version,
+        )
+
+    def restore(self, snapshot: GameSnapshot):
+        """
+        Put the game back exactly as it was when the snapshot was taken.
+
+        :param snapshot: A snapshot taken from this game.
+        """
+        self.ticks = snapshot.ticks
+        self.elapsed_game_time = snapshot.elapsed_game_time
+        self.distance = snapshot.distance
+        self.crashed = snapshot.crashed
+        self.latest_action = snapshot.latest_action
+        for car, (x, y, vx, vy, lane) in zip(self.roster, snapshot.cars):
+            car.x, car.y, car.lane = x, y, lane
+            car.velocity.x, car.velocity.y = vx, vy
+        roster = self.roster
+        self.cars = [roster[i] for i in snapshot.order]
+        self.car_bucket = [roster[i] for i in snapshot.bucket]
+        self.rng.setstate(snapshot.rng)
+        self.reindex()
+        for sensor, (reading, beam_start) in zip(self.sensors, snapshot.sensors):
+            sensor.reading, sensor.beam_start = reading, beam_start
+        self.sensor_readings[:] = snapshot.sensor_readings
+        self._sensed_version = self.world_version if snapshot.sensed else -1
+
+    def rollout(self, actions) -> Tuple[float, Optional[int]]:
+        """
+        Play a sequence of actions ahead and roll the game back afterwards.
+
+        :param actions: The actions to apply, one per tick.
+        :return: (distance gained, number of ticks until the crash or None if it survived).
+        """
+        snapshot = self.snapshot()
+        crash_after = None
+        for k, action in enumerate(actions, 1):
+            self.step(action)
+            if self.crashed:
+                crash_after = k
+                break
+        gained = self.distance - snapshot.distance
+        self.restore(snapshot)
+        return gained, crash_after
+
+    # Game logic
+    def handle_action(self, action: str):
+        if action == "ACCELERATE":
+            self.ego.speed_up()
+        elif action == "DECELERATE":
+            self.ego.slow_down()
+        elif action == "STEER_LEFT":
+            self.ego.turn(-0.1)
+        elif action == "STEER_RIGHT":
+            self.ego.turn(0.1)
         else:
-            cars_to_keep.append(car)
+            pass
+
+    def reindex(self):
+        """Rebuild the obstacle index after self.cars was replaced wholesale."""
+        self.obstacles.rebuild([car for car in self.cars if car is not self.ego])
+        self.touch()
+
+    def touch(self):
+        """
+        Mark the world as changed, so the next update_sensors() casts the rays again. step()
+        and reindex() do this; call it after moving cars by hand.
+        """
+        self.world_version += 1
+
+    def update_cars(self):
+        for car in self.cars:
+            car.update(self.ego, self.rng)
+        self.obstacles.refresh()
+
+    def remove_passed_cars(self):
+        min_distance = -1000
+        max_distance = SCREEN_WIDTH + 1000
+        cars_to_keep = []
+        cars_to_retire = []
+
+        for car in self.cars:
+            if car.x < min_distance or car.x > max_distance:
+                cars_to_retire.append(car)
+            else:
+                cars_to_keep.append(car)
+
+        for car in cars_to_retire:
+            self.obstacles.remove(car)
+            self.car_bucket.append(car)
+            car.lane = None
+
+        self.cars = cars_to_keep
+
+    def place_car(self):
+        if len(self.cars) > LANE_COUNT:
+            return
+
+        speed_coeff_modifier = 5
+        x_offset_behind = -0.5
+        x_offset_in_front = 1.5
+
+        open_lanes = [lane for lane in self.road.lanes if not any(c.lane == lane for c in self.cars if c != self.ego)]
+        lane = random_choice(open_lanes, self.rng)
+        x_offset = random_choice([x_offset_behind, x_offset_in_front], self.rng)
+        horizontal_velocity_coefficient = random_number(self.rng) * speed_coeff_modifier
+
+        car = self.car_bucket.pop() if self.car_bucket else None
+        if not car:
+            return
+
+        velocity_x = self.ego.velocity.x + horizontal_velocity_coefficient if x_offset == x_offset_behind else self.ego.velocity.x - horizontal_velocity_coefficient
+        car.velocity.set(velocity_x, 0)  # Reuse the pooled car's vector
+        self.cars.append(car)
+
+        car.x = (SCREEN_WIDTH * x_offset) - (car.width // 2)
+        car.y = int((lane.y_start + lane.y_end) / 2 - car.height / 2)
+        car.lane = lane
+        self.obstacles.add(car)
+
+    def update_sensors(self):
+        """
+        Cast the sensor rays, unless nothing moved since the last cast: a tick's sensors are
+        cast once by update_game and then shared by the payload, observations and rendering.
+        """
+        if self._sensed_version == self.world_version:
+            return
+        sensors, columns, directions = self._sensor_rays
+        if sensors is not self.sensors:
+            sensors = self.sensors
+            columns = [SENSOR_COLUMN[sensor.name] for sensor in sensors]
+            directions = np.array([sensor.direction for sensor in sensors]).reshape(-1, 2)
+            self._sensor_rays = (sensors, columns, directions)
+        self.sensor_readings[columns] = update_sensors(sensors, directions)
+        self._sensed_version = self.world_version
+
+    def update_game(self, current_action: str):
+        self.handle_action(current_action)
+        self.distance += self.ego.velocity.x
+        self.update_cars()
+        self.remove_passed_cars()
+        self.place_car()
+        self.world_version += 1
+        self.update_sensors()
+
+        return self
+
+    def check_collisions(self):
+        ego = self.ego.rect
+        # Handle collisions - only cars in the lanes and x range the ego car covers
+        for car in self.obstacles.cars_in(ego.left, ego.right, ego.top, ego.bottom):
+            if intersects(ego, car.rect):
+                self.crashed = True
 
-    for car in cars_to_retire:
-        STATE.car_bucket.append(car)
-        car.lane = None
-
-    STATE.cars = cars_to_keep
+        # Check collision with walls
+        for wall in self.obstacles.walls_in(ego.top, ego.bottom):
+            if intersects(ego, wall.rect):
+                self.crashed = True
+
+    def step(self, action: str):
+        """
+        Apply one action and advance the world by one tick, exactly as game_loop does.
+        """
+        if self.profiler is not None:
+            self._profiled_step(action)
+            return
+        self.update_game(action)
+        self.check_collisions()
+
+    def _profiled_step(self, action: str):
+        """
+        step() with every phase of update_game and check_collisions timed into self.profiler.
+        """
+        profiler = self.profiler
+        start = perf_counter_ns()
+        self.handle_action(action)
+        self.distance += self.ego.velocity.x
+        actions_done = perf_counter_ns()
+        self.update_cars()
+        cars_done = perf_counter_ns()
+        self.remove_passed_cars()
+        self.place_car()
+        self.world_version += 1
+        placement_done = perf_counter_ns()
+        self.update_sensors()
+        sensors_done = perf_counter_ns()
+        self.check_collisions()
+        collisions_done = perf_counter_ns()
+
+        profiler.ticks += 1
+        profiler.add("actions", actions_done - start)
+        profiler.add("cars", cars_done - actions_done)
+        profiler.add("placement", placement_done - cars_done)
+        profiler.add("sensors", sensors_done - placement_done)
+        profiler.add("collisions", collisions_done - sensors_done)
+
+    def build_payload(self) -> dict:
+        """
+        Build the request sent to the policy from the current sensor readings.
+        """
+        # Uses the reading data from the sensors. If there is none or an exception set it to 1000
+        sensor_data = {}
+        for i, s in enumerate(self.sensors):
+            name = getattr(s, "name", f"sensor_{i}")
+            if hasattr(s, "reading"):
+                try:
+                    sensor_data[name] = float(s.reading)
+                except Exception:
+                    sensor_data[name] = 1000.0
+            else:
+                sensor_data[name] = float(getattr(s, "sensor_strength", 1000.0))
+
+        return {
+            "did_crash": self.crashed,
+            "elapsed_ticks": self.ticks,
+            "distance": self.distance,
+            "velocity": {"x": self.ego.velocity.x, "y": self.ego.velocity.y},
+            "sensors": sensor_data
+        }
 
-def place_car():
-    if len(STATE.cars) > LANE_COUNT:
-        return
+STATE = None
 
-    speed_coeff_modifier = 5
-    x_offset_behind = -0.5
-    x_offset_in_front = 1.5
 
-    open_lanes = [lane for lane in STATE.road.lanes if not any(c.lane == lane for c in STATE.cars if c != STATE.ego)]
-    lane = random_choice(open_lanes)
-    x_offset = random_choice([x_offset_behind, x_offset_in_front])
-    horizontal_velocity_coefficient = random_number() * speed_coeff_modifier
+def intersects(rect1, rect2):
+    return rect1.colliderect(rect2)
 
-    car = STATE.car_bucket.pop() if STATE.car_bucket else None
-    if not car:
-        return
+# Game logic on the module-level STATE (or the state passed in)
+def handle_action(action: str, state: GameState = None):
+    (state or STATE).handle_action(action)
 
-    velocity_x = STATE.ego.velocity.x + horizontal_velocity_coefficient if x_offset == x_offset_behind else STATE.ego.velocity.x - horizontal_velocity_coefficient
-    car.velocity = Vector(velocity_x, 0)
-    STATE.cars.append(car)
+def update_cars(state: GameState = None):
+    (state or STATE).update_cars()
 
-    car_sprite = car.sprite
-    car.x = (SCREEN_WIDTH * x_offset) - (car_sprite.get_width() // 2)
-    car.y = int((lane.y_start + lane.y_end) / 2 - car_sprite.get_height() / 2)
-    car.lane = lane
+def remove_passed_cars(state: GameState = None):
+    (state or STATE).remove_passed_cars()
 
+def place_car(state: GameState = None):
+    (state or STATE).place_car()
 
 def get_action():
     """
     Reads pygame events and returns an action string based on arrow keys or spacebar.
     Up: ACCELERATE, Down: DECELERATE, Left: STEER_LEFT, Right: STEER_RIGHT, Space: NOTHING
     """
+    import pygame
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -156,101 +468,185 @@ def get_action():
     #return STATE.latest_action if hasattr(STATE, "latest_action") else "NOTHING"
     return "NOTHING"
 
-def get_action_json():
+_ACTION_JSON = {"key": None, "actions": {}}  # Parsed actions_log.json, keyed by tick
+
+def get_action_json(path: str = "actions_log.json"):
     """
     Get action depending on tick from the actions_log.json.
-    Finds the action for the current STATE.ticks.
+    Finds the action for the current STATE.ticks. The file is parsed once and only
+    re-read when it changes, so each lookup is a dict access.
     """
     try:
-        with open("actions_log.json", "r") as f:
-            actions = json.load(f)
-            for entry in actions:
-                if entry.get("tick") == STATE.ticks:
-                    return entry.get("action", "NOTHING")
-            return "NOTHING"
+        stat = os.stat(path)
     except FileNotFoundError:
         return "NOTHING"
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if _ACTION_JSON["key"] != key:
+        with open(path, "r") as f:
+            entries = json.load(f)
+        actions = {}
+        for entry in entries:
+            actions.setdefault(entry.get("tick"), entry.get("action", "NOTHING"))  # First entry wins, like the scan did
+        _ACTION_JSON["key"], _ACTION_JSON["actions"] = key, actions
+    return _ACTION_JSON["actions"].get(STATE.ticks, "NOTHING")
 
 
 def initialize_game_state( api_url: str, seed_value: str, sensor_removal = 0):
-    seed(seed_value)
     global STATE
-    STATE = GameState(api_url)
+    STATE = create_game_state(api_url, seed_value, sensor_removal)
 
-    # Create environment
-    STATE.road = Road(SCREEN_WIDTH, SCREEN_HEIGHT, LANE_COUNT)
-    middle_lane = STATE.road.middle_lane()
-    lane_height = STATE.road.get_lane_height()
-
-    # Create ego car
-    ego_velocity = Vector(10, 0)
-    STATE.ego = Car("yellow", ego_velocity, lane=middle_lane, target_height=int(lane_height * 0.8))
-    ego_sprite = STATE.ego.sprite
-    STATE.ego.x = (SCREEN_WIDTH // 2) - (ego_sprite.get_width() // 2)
-    STATE.ego.y = int((middle_lane.y_start + middle_lane.y_end) / 2 - ego_sprite.get_height() / 2)
-    sensor_options = [
-            (90, "front"),
-            (135, "right_front"),
-            (180, "right_side"),
-            (225, "right_back"),
-            (270, "back"),
-            (315, "left_back"),
-            (0, "left_side"),
-            (45, "left_front"),
-            (22.5, "left_side_front"),
-            (67.5, "front_left_front"),
-            (112.5, "front_right_front"),
-            (157.5, "right_side_front"),
-            (202.5, "right_side_back"),
-            (247.5, "back_right_back"),
-            (292.5, "back_left_back"),
-            (337.5, "left_side_back"),
-        ]
+def create_game_state(api_url: str, seed_value: str, sensor_removal = 0) -> GameState:
+    """
+    Build a fresh game with its own RNG without touching the module-level STATE.
+    """
+    state = GameState(api_url, seed_value)
+    state.setup(sensor_removal)
+    return state
+
+def update_game(current_action: str, state: GameState = None):
+    return (state or STATE).update_game(current_action)
+
+def check_collisions(state: GameState = None):
+    (state or STATE).check_collisions()
+
+def step_world(action: str, state: GameState = None):
+    """
+    Apply one action and advance the world by one tick, exactly as game_loop does.
+    """
+    (state or STATE).step(action)
+
+def build_payload(state: GameState = None) -> dict:
+    """
+    Build the request sent to the policy from the current sensor readings.
+    """
+    return (state or STATE).build_payload()
+
+def play_headless(policy, seed_value, sensor_removal: int = 0, recorder: "ActionRecorder" = None,
+                  profiler: Profiler = None, trajectory_path: str = None) -> dict:
+    """
+    Play one fast-forward game in-process, calling the policy directly instead of over HTTP.
+    The game has its own GameState, so several can be played at once (e.g. from threads).
+
+    :param policy: Callable taking the request dict game_loop would post and returning a list of actions.
+    :param seed_value: The seed for the game.
+    :param sensor_removal: Number of randomly removed sensors.
+    :param recorder: Optional ActionRecorder that receives every applied action.
+    :param profiler: Optional Profiler that times every phase of the game and the policy calls.
+    :param trajectory_path: Optional directory to record the game's trajectory in (see trajectory.py).
+    :return: Dict with the seed, distance, whether and when the car crashed, and the ticks played.
+    """
+    state = create_game_state(None, seed_value, sensor_removal)
+    state.profiler = profiler
+    trajectory = None
+    if trajectory_path:
+        from .trajectory import TrajectoryRecorder
+        trajectory = TrajectoryRecorder(trajectory_path, state)
+    actions = []
+    crash_tick = None
+
+    while True:
+        state.ticks += 1
+        state.elapsed_game_time = state.ticks * MS_PER_TICK
+        if state.crashed or state.ticks > MAX_TICKS:
+            break
+
+        if not actions:
+            if profiler is None:
+                state.update_sensors()
+                actions = list(policy(state.build_payload()) or ["NOTHING"])
+            else:
+                profiler.time("sensors", state.update_sensors)
+                actions = list(profiler.time("policy", policy, state.build_payload()) or ["NOTHING"])
+        action = actions.pop(0)
+        if recorder is not None:
+            recorder.record(action)
+        state.step(action)
+        if trajectory is not None:
+            trajectory.record(state, action)
+
+        if state.crashed:
+            crash_tick = state.ticks
+
+    if trajectory is not None:
+        trajectory.finish(state.distance, crash_tick)
+    return {
+        "seed": seed_value,
+        "distance": state.distance,
+        "crashed": state.crashed,
+        "crash_tick": crash_tick,
+        "ticks": state.ticks - 1,  # The last tick is only used to notice the game is over
+    }
+
+def sense(state: GameState = None) -> dict:
+    """
+    Read the sensors and build the request for the policy.
+    """
+    state = state or STATE
+    if state.profiler is None:
+        state.update_sensors()
+    else:
+        state.profiler.time("sensors", state.update_sensors)
+    return state.build_payload()
 
-    for _ in range(sensor_removal): # Removes random sensors
-        random_sensor = random_choice(sensor_options)
-        sensor_options.remove(random_sensor)
-    STATE.sensors = [
-        Sensor(STATE.ego, angle, name, STATE)
-        for angle, name in sensor_options
-    ]
-
-    # Create other cars and add to car bucket
-    for i in range(0, LANE_COUNT - 1):
-        car_colors = ["blue", "red"]
-        color = random_choice(car_colors)
-        car = Car(color, Vector(8, 0), target_height=int(lane_height * 0.8))
-        STATE.car_bucket.append(car)
-
-    STATE.cars = [STATE.ego]
-
-def update_game(current_action: str):
-    handle_action(current_action)
-    STATE.distance += STATE.ego.velocity.x
-    update_cars()
-    remove_passed_cars()
-    place_car()
-    for sensor in STATE.sensors:
-        sensor.update()
-
-    return STATE
-    
 # Main game loop
-ACTION_LOG = []
+ACTION_LOG: Optional["ActionRecorder"] = None  # Actions of the current / last game_loop game, one byte per tick
 
-def game_loop(verbose: bool = True, log_actions: bool = True, log_path: str = "actions_log.json"):
-    global STATE
-    clock = pygame.time.Clock()
-    screen = None
+def game_loop(verbose: bool = True, log_actions: bool = True, log_path: str = None,
+              fast_forward: bool = False, protocol: str = "json", lookahead: Optional[int] = None,
+              profiler: Profiler = None, trajectory_path: str = None):
+    """
+    Run the game until it crashes or runs out of time.
+
+    :param verbose: Open a window and render every frame.
+    :param log_actions: Record every applied action in ACTION_LOG (left None otherwise).
+    :param log_path: Where to save the binary recording (see replay.py) when the game ends.
+    :param fast_forward: Run ticks as fast as the CPU allows instead of limiting to 60 FPS.
+        Game time is then derived from the tick count, so a full game scores the same
+        as a real-time one without taking a real minute.
+    :param protocol: How to talk to the policy API: "json" (POST /predict), "binary"
+        (POST /predict_bin) or "websocket" (one /ws connection for the whole game), see client.py.
+    :param lookahead: None asks for a new batch when the last one is used up and waits for it.
+        A number asks in the background as soon as at most that many actions are left, so
+        the game keeps running while the server thinks (the batch is then decided on
+        sensors that are that many ticks old). A batch that misses its deadline is
+        replaced by NOTHING and asked for again.
+    :param profiler: Optional Profiler that times every phase of every tick, rendering and
+        the API round trips; its summary is printed when the game ends.
+    :param trajectory_path: Directory to record the game's trajectory in: positions, sensor
+        readings and actions of every tick, without a display. Turn it into a video later
+        with python -m src.game.trajectory <trajectory_path> out.mp4.
+    """
+    from .client import PipelinedClient, make_client
+    from .replay import ActionRecorder
+    from .trajectory import TrajectoryRecorder
+
+    global STATE, ACTION_LOG
+    ACTION_LOG = ActionRecorder(STATE.seed_value, STATE.sensor_removal) if log_actions else None
+    crash_tick = None
+    clock = None
+    if not fast_forward:
+        import pygame
+        clock = pygame.time.Clock()
+    renderer = None
     actions = []
     if verbose:
-        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Race Car Game")
+        # Rendering is only loaded when there is something to show
+        from .render import Renderer
+        renderer = Renderer(SCREEN_WIDTH, SCREEN_HEIGHT)
+    client = make_client(protocol)
+    pipeline = PipelinedClient(client) if lookahead is not None else None
+    pending = None  # Next batch, already asked for (pipelined mode only)
+    STATE.profiler = profiler
+    trajectory = TrajectoryRecorder(trajectory_path, STATE) if trajectory_path else None
 
     while True:
-        delta = clock.tick(60)  # Limit to 60 FPS
-        STATE.elapsed_game_time += delta
-        STATE.ticks += 1
+        if clock:
+            delta = clock.tick(FPS)  # Limit to 60 FPS
+            STATE.elapsed_game_time += delta
+            STATE.ticks += 1
+        else:
+            STATE.ticks += 1
+            STATE.elapsed_game_time = STATE.ticks * MS_PER_TICK
 
         if STATE.crashed or STATE.ticks > MAX_TICKS or STATE.elapsed_game_time > MAX_MS:
             print(f"Game over: Crashed: {STATE.crashed}, Ticks: {STATE.ticks}, Elapsed time: {STATE.elapsed_game_time} ms, Distance: {STATE.distance}")
@@ -263,104 +659,62 @@ def game_loop(verbose: bool = True, log_actions: bool = True, log_path: str = "a
             # for act in action_list:
             #     actions.append(act)
 
-            for sensor in STATE.sensors:
-                sensor.update()
-                # print(sensor)
-            # Uses the reading data from the sensors. If there is none or an exception set it to 1000
-            sensor_data = {}
-            for i, s in enumerate(STATE.sensors):
-                name = getattr(s, "name", f"sensor_{i}")
-                if hasattr(s, "reading"):
-                    try:
-                        sensor_data[name] = float(getattr(s, "reading"))
-                    except Exception:
-                        sensor_data[name] = 1000.0
-                else:
-                    sensor_data[name] = float(getattr(s, "sensor_strength", 1000.0))
-
-            payload = {
-                "did_crash": STATE.crashed,
-                "elapsed_ticks": STATE.ticks,
-                "distance": STATE.distance,
-                "velocity": {"x": STATE.ego.velocity.x, "y": STATE.ego.velocity.y},
-                "sensors": sensor_data
-            }
-
+            payload = sense() if pending is None else None
+            asked = perf_counter_ns()
             try:
-                resp = session.post("http://localhost:9052/predict", json=payload, timeout=0.15)
-                resp.raise_for_status()
-                actions = resp.json().get("actions", ["NOTHING"])
+                if pipeline:
+                    if pending is None:
+                        pending = pipeline.request(payload)
+                    batch, pending = pending, None
+                    actions = batch.result()  # Waits at most until the request's deadline
+                else:
+                    actions = client.predict(payload)
                 if not actions:
                     actions = ["NOTHING"]
             except Exception as e:
                 print(f"API error: {e}")
                 actions = ["NOTHING"]
+            if profiler:
+                profiler.add("http", perf_counter_ns() - asked)
         action = actions.pop(0)
 
-        # Log the action with tick
+        # Log the action (its tick is its position in the log)
         if log_actions:
-            ACTION_LOG.append({"tick": STATE.ticks, "action": action})
-
-        handle_action(action)
-
-        STATE.distance += STATE.ego.velocity.x
-        update_cars()
-        remove_passed_cars()
-        place_car()
-
-        print("Current action:", action)
-        print("Currnet tick:", STATE.ticks)
-
-        # Update sensors
-        for sensor in STATE.sensors:
-            sensor.update()
-        
-        # Handle collisions
-        for car in STATE.cars:
-            if car != STATE.ego and intersects(STATE.ego.rect, car.rect):
-                STATE.crashed = True
-        
-        # Check collision with walls
-        for wall in STATE.road.walls:
-            if intersects(STATE.ego.rect, wall.rect):
-                STATE.crashed = True
+            ACTION_LOG.record(action)
 
-        # Render game (only if verbose)
-        if verbose:
-            screen.fill((0, 0, 0))  # Clear the screen with black
-
-            # Draw the road background
-            screen.blit(STATE.road.surface, (0, 0))
-
-            # Draw all walls
-            for wall in STATE.road.walls:
-                wall.draw(screen)
-
-            # Draw all cars
-            for car in STATE.cars:
-                if car.sprite:
-                    screen.blit(car.sprite, (car.x, car.y))
-                    bounds = car.get_bounds()
-                    color = (255, 0, 0) if car == STATE.ego else (0, 255, 0)
-                    pygame.draw.rect(screen, color, bounds, width=2)
-                else:
-                    pygame.draw.rect(screen, (255, 255, 0) if car == STATE.ego else (0, 0, 255), car.rect)
+        step_world(action)
+        if STATE.crashed and crash_tick is None:
+            crash_tick = STATE.ticks
+        if trajectory is not None:
+            trajectory.record(STATE, action)
 
-            # Draw sensors if enabled
-            if STATE.sensors_enabled:
-                for sensor in STATE.sensors:
-                    sensor.draw(screen)
+        # Pipelined: ask for the next batch while the remaining actions play out
+        if pipeline and pending is None and len(actions) <= lookahead and not STATE.crashed:
+            pending = pipeline.request(sense())
 
-            pygame.display.flip()
-
-    # # Save actions to file after game ends
-    # import os
-    # if log_actions:
-    #     log_dir = os.path.dirname(log_path)
-    #     if log_dir and not os.path.exists(log_dir):
-    #         os.makedirs(log_dir, exist_ok=True)
-    #     with open(log_path, "w") as f:
-    #         json.dump(ACTION_LOG, f, indent=2)
+        # Render game (only if verbose)
+        if renderer:
+            print("Current action:", action)
+            print("Currnet tick:", STATE.ticks)
+            if profiler:
+                profiler.time("render", renderer.draw, STATE)
+            else:
+                renderer.draw(STATE)
+
+    (pipeline or client).close()
+    if profiler:
+        STATE.profiler = None
+        print(profiler.format_summary())
+
+    if trajectory is not None:
+        trajectory.finish(STATE.distance, crash_tick)
+
+    # Save actions to file after game ends; replay with python -m src.game.replay <log_path>
+    if log_actions and log_path:
+        log_dir = os.path.dirname(log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        ACTION_LOG.finish(STATE.distance, crash_tick).save(log_path)
 
 # Initialization - not used
 def init(api_url: str):
@@ -371,6 +725,7 @@ def init(api_url: str):
 
 # Entry point
 if __name__ == "__main__":
+    import pygame
     seed_value = None
     pygame.init()
     initialize_game_state("http://example.com/api/predict", seed_value)  # Replace with actual API URL
@@ -0,0 +1,175 @@
+from time import perf_counter_ns
+from typing import Dict, List
+
+# Phases a game tick is split into, in the order they run
+PHASES = ["actions", "cars", "placement", "sensors", "collisions", "render", "policy", "http"]
+
+HISTOGRAM_BUCKETS = 40  # Bucket k holds durations in [2^(k-1), 2^k) ns; 2^40 ns is ~18 minutes
+
+
+class PhaseStats:
+    """
+    Count, total and a power-of-two histogram of the durations of one phase. Adding a
+    sample is a few integer operations, so it can run on every tick.
+    """
+
+    __slots__ = ("count", "total_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, duration_ns: int):
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.histogram[min(duration_ns.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile_ns(self, q: float) -> int:
+        """
+        Upper bound of the q-th percentile (0..100), to within a factor of two.
+        """
+        if not self.count:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for k, n in enumerate(self.histogram):
+            seen += n
+            if seen >= rank and n:
+                return min(1 << k, self.max_ns)
+        return self.max_ns
+
+
+class Profiler:
+    """
+    Opt-in timings of the game loop. Attach one to a GameState (state.profiler) and its
+    step() times every phase; game_loop and play_headless take one as an argument and
+    also time rendering and the policy round trip. Without a profiler none of this runs.
+
+        profiler = Profiler()
+        play_headless(policy, seed, profiler=profiler)
+        print(profiler.format_summary())
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.ticks = 0
+        self.started_ns = perf_counter_ns()
+
+    def add(self, phase: str, duration_ns: int):
+        """
+        Record one duration of a phase.
+
+        :param phase: The phase name, usually one of PHASES.
+        :param duration_ns: The duration in nanoseconds (perf_counter_ns differences).
+        """
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.add(duration_ns)
+
+    def count(self, counter: str, n: int = 1):
+        """
+        Add n to a plain event counter (rays cast, obstacles tested, ...).
+        """
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def time(self, phase: str, fn, *args):
+        """
+        Call fn(*args) and record its duration under phase.
+
+        :return: What fn returned.
+        """
+        start = perf_counter_ns()
+        result = fn(*args)
+        self.add(phase, perf_counter_ns() - start)
+        return result
+
+    def reset(self):
+        self.__init__()
+
+    def summary(self) -> dict:
+        """
+        The collected numbers as plain values, e.g. to dump as JSON next to a game's result.
+
+        :return: Dict with ticks, wall time, counters and per-phase count / total / mean /
+            p50 / p99 / max in microseconds and the share of the wall time.
+        """
+        wall_ns = max(perf_counter_ns() - self.started_ns, 1)
+        order = {name: k for k, name in enumerate(PHASES)}
+        phases = {}
+        for name in sorted(self.phases, key=lambda name: order.get(name, len(PHASES))):
+            stats = self.phases[name]
+            phases[name] = {
+                "count": stats.count,
+                "total_ms": stats.total_ns / 1e6,
+                "mean_us": stats.total_ns / stats.count / 1e3,
+                "p50_us": stats.percentile_ns(50) / 1e3,
+                "p99_us": stats.percentile_ns(99) / 1e3,
+                "max_us": stats.max_ns / 1e3,
+                "share": stats.total_ns / wall_ns,
+            }
+        return {
+            "ticks": self.ticks,
+            "wall_ms": wall_ns / 1e6,
+            "counters": dict(self.counters),
+            "phases": phases,
+        }
+
+    def format_summary(self) -> str:
+        """
+        The summary as a table, one line per phase.
+        """
+        summary = self.summary()
+        ticks = summary["ticks"]
+        lines = [f"{ticks} ticks in {summary['wall_ms']:.1f} ms "
+                 f"({summary['wall_ms'] * 1e3 / max(ticks, 1):.1f} us/tick)",
+                 f"{'phase':<12}{'count':>8}{'total ms':>11}{'mean us':>10}{'p50 us':>10}"
+                 f"{'p99 us':>10}{'max us':>10}{'share':>8}"]
+        for name, p in summary["phases"].items():
+            lines.append(f"{name:<12}{p['count']:>8}{p['total_ms']:>11.1f}{p['mean_us']:>10.1f}"
+                         f"{p['p50_us']:>10.1f}{p['p99_us']:>10.1f}{p['max_us']:>10.1f}{p['share']:>8.1%}")
+        for name, n in summary["counters"].items():
+            lines.append(f"{name}: {n} ({n / max(ticks, 1):.1f} per tick)")
+        return "\n".join(lines)
+
+
+def merge(profilers: List[Profiler]) -> Profiler:
+    """
+    Combine the profilers of several games into one, e.g. to summarise a whole evaluation.
+    """
+    merged = Profiler()
+    merged.started_ns = min((p.started_ns for p in profilers), default=merged.started_ns)
+    for profiler in profilers:
+        merged.ticks += profiler.ticks
+        for name, n in profiler.counters.items():
+            merged.count(name, n)
+        for name, stats in profiler.phases.items():
+            target = merged.phases.setdefault(name, PhaseStats())
+            target.count += stats.count
+            target.total_ns += stats.total_ns
+            target.max_ns = max(target.max_ns, stats.max_ns)
+            target.histogram = [a + b for a, b in zip(target.histogram, stats.histogram)]
+    return merged
+
+
+if __name__ == "__main__":
+    # python -m src.game.profiling [seed ...]: profile headless games with a do-nothing policy
+    import sys
+
+    from .core import play_headless
+
+    profilers = []
+    for seed in [int(s) for s in sys.argv[1:]] or [0]:
+        profiler = Profiler()
+        result = play_headless(lambda request: ["NOTHING"] * 10, seed, profiler=profiler)
+        print(f"seed {seed}: distance {result['distance']:.1f}, {result['ticks']} ticks")
+        print(profiler.format_summary())
+        profilers.append(profiler)
+    if len(profilers) > 1:
+        print("all games:")
+        print(merge(profilers).format_summary())
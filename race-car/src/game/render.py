@@ -0,0 +1,155 @@
+import pygame
+
+FONT_NAME = "monospace"
+FONT_SIZE = 16
+TEXT_COLOR = (255, 255, 255)
+GLYPH_ATLAS = "0123456789.-"  # Everything a sensor reading is drawn with
+BACKGROUND_COLOR = (0, 0, 0)
+
+
+class GlyphCache:
+    """
+    A font loaded once and every character rendered once. Text is drawn by blitting the
+    cached glyph surfaces one advance apart, like font.render lays out the whole string.
+    """
+
+    def __init__(self, name: str = FONT_NAME, size: int = FONT_SIZE, color: tuple = TEXT_COLOR,
+                 preload: str = GLYPH_ATLAS):
+        """
+        Load the font and pre-render the glyph atlas.
+
+        :param name: The system font name.
+        :param size: The font size.
+        :param color: The text color.
+        :param preload: Characters to render up front; others are rendered on first use.
+        """
+        if not pygame.font.get_init():
+            pygame.font.init()
+        self.font = pygame.font.SysFont(name, size)
+        self.color = color
+        self.glyphs = {}    # char -> (surface, advance)
+        for char in preload:
+            self.glyph(char)
+
+    def glyph(self, char: str) -> tuple:
+        """The rendered surface of a character and how far it moves the pen."""
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            metrics = self.font.metrics(char)[0]
+            advance = metrics[4] if metrics else self.font.size(char)[0]
+            glyph = self.glyphs[char] = (self.font.render(char, True, self.color), advance)
+        return glyph
+
+    def draw(self, surface: pygame.Surface, text: str, position: tuple) -> pygame.Rect:
+        """
+        Draw text with its top left corner at position.
+
+        :return: The area that was drawn on.
+        """
+        x, y = position
+        left = x
+        height = 0
+        right = x
+        for char in text:
+            glyph, advance = self.glyph(char)
+            surface.blit(glyph, (x, y))
+            right = max(right, x + glyph.get_width())
+            height = max(height, glyph.get_height())
+            x += advance
+        return pygame.Rect(int(left), int(y), int(right - left) + 1, height).clip(surface.get_rect())
+
+
+_GLYPHS = None
+
+
+def glyphs() -> GlyphCache:
+    """The shared GlyphCache with the default font, created on first use."""
+    global _GLYPHS
+    if _GLYPHS is None:
+        _GLYPHS = GlyphCache()
+    return _GLYPHS
+
+
+class Renderer:
+    """
+    Optional pygame layer on top of the headless simulation. Only game_loop(verbose=True)
+    creates one, so display init, sprites and the road surface are never touched otherwise.
+
+    The road and the walls never change during a game, so they are drawn once into a
+    background surface. Each frame only the areas the last frame drew on are restored from
+    it, and only those and the new frame's areas are pushed to the display.
+    """
+
+    def __init__(self, width: int, height: int, caption: str = "Race Car Game", offscreen: bool = False):
+        """
+        Open the game window.
+
+        :param width: The window width in pixels.
+        :param height: The window height in pixels.
+        :param caption: The window title.
+        :param offscreen: Draw into a plain Surface (self.screen) instead of a window, e.g.
+            to write frames to a file on a machine without a display.
+        """
+        if not pygame.get_init():
+            pygame.init()
+        self.offscreen = offscreen
+        if offscreen:
+            self.screen = pygame.Surface((width, height))
+        else:
+            self.screen = pygame.display.set_mode((width, height))
+            pygame.display.set_caption(caption)
+        self.background = None
+        self._road = None  # The road the background was built for
+        self._dirty = []   # Areas drawn on in the last frame
+
+    def _build_background(self, state):
+        background = pygame.Surface(self.screen.get_size())
+        background.fill(BACKGROUND_COLOR)
+        background.blit(state.road.surface, (0, 0))
+        for wall in state.road.walls:
+            wall.draw(background)
+        self.background = background
+        self._road = state.road
+
+    def draw(self, state):
+        """
+        Draw one frame of the given game state and update the display.
+
+        :param state: The game state to draw.
+        """
+        screen = self.screen
+        full = self._road is not state.road
+        if full:
+            # New game: start from a freshly drawn background
+            self._build_background(state)
+            screen.blit(self.background, (0, 0))
+        else:
+            # Erase the last frame's cars, beams and text
+            for rect in self._dirty:
+                screen.blit(self.background, rect, rect)
+
+        dirty = []
+        # Draw all cars
+        for car in state.cars:
+            if car.sprite:
+                dirty.append(screen.blit(car.sprite, (car.x, car.y)))
+                bounds = car.get_bounds()
+                color = (255, 0, 0) if car == state.ego else (0, 255, 0)
+                dirty.append(pygame.draw.rect(screen, color, tuple(bounds), width=2))
+            else:
+                dirty.append(pygame.draw.rect(screen, (255, 255, 0) if car == state.ego else (0, 0, 255),
+                                              tuple(car.rect)))
+
+        # Draw sensors if enabled
+        if state.sensors_enabled:
+            for sensor in state.sensors:
+                dirty.extend(sensor.draw(screen))
+
+        changed = self._dirty + dirty
+        self._dirty = dirty
+        if self.offscreen:
+            return
+        if full or sum(rect.width * rect.height for rect in changed) >= screen.get_width() * screen.get_height():
+            pygame.display.flip()  # Cheaper than a list of rects that covers the screen anyway
+        else:
+            pygame.display.update(changed)
@@ -0,0 +1,201 @@
+import struct
+from typing import Optional, Union
+
+from .core import ACTIONS
+
+# Action codes stored in a recording, one byte per tick: the index in core.ACTIONS
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+NOTHING_CODE = ACTION_CODES["NOTHING"]
+
+MAGIC = b"RCRP"
+VERSION = 1
+
+# magic, version, sensor_removal, seed kind, ticks, crash tick (-1 = none), distance, seed length
+_HEADER = struct.Struct("<4sBBBxIidH")
+_SEED_INT, _SEED_STR = 1, 2  # Seed kinds
+
+
+class ReplayMismatch(Exception):
+    """A replayed game did not end like the recording."""
+
+
+def _check_seed(seed_value):
+    # Only these seed random.Random the same way again after a round trip through the file
+    if isinstance(seed_value, bool) or not isinstance(seed_value, (int, str)):
+        raise TypeError(f"Only int and str seeds can be recorded, got {seed_value!r}")
+
+
+class Recording:
+    """
+    One recorded game: the seed and sensor removal it was started with, the action
+    applied on every tick, and the outcome the game reported.
+
+    On disk it is a fixed-size header (_HEADER), the seed, then one byte per tick.
+    """
+
+    def __init__(self, seed_value=None, sensor_removal: int = 0, actions: bytes = b"",
+                 distance: float = 0.0, crash_tick: Optional[int] = None):
+        """
+        Initialize a Recording.
+
+        :param seed_value: The seed the game was played with (int or str).
+        :param sensor_removal: Number of randomly removed sensors.
+        :param actions: One action code per tick, tick 1 first.
+        :param distance: Distance the recorded game reached.
+        :param crash_tick: Tick the recorded game crashed on, or None.
+        """
+        self.seed_value = seed_value
+        self.sensor_removal = sensor_removal
+        self.actions = bytes(actions)
+        self.distance = distance
+        self.crash_tick = crash_tick
+
+    @property
+    def ticks(self) -> int:
+        return len(self.actions)
+
+    def action_at(self, tick: int) -> str:
+        """
+        The action applied on a tick, in O(1).
+
+        :param tick: The game tick, starting at 1 like GameState.ticks.
+        :return: The action, or "NOTHING" outside the recording.
+        """
+        if 1 <= tick <= len(self.actions):
+            return ACTIONS[self.actions[tick - 1]]
+        return "NOTHING"
+
+    def to_bytes(self) -> bytes:
+        _check_seed(self.seed_value)
+        kind = _SEED_INT if isinstance(self.seed_value, int) else _SEED_STR
+        seed = str(self.seed_value).encode()
+        crash_tick = -1 if self.crash_tick is None else self.crash_tick
+        header = _HEADER.pack(MAGIC, VERSION, self.sensor_removal, kind, len(self.actions),
+                              crash_tick, self.distance, len(seed))
+        return header + seed + self.actions
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Recording":
+        magic, version, sensor_removal, kind, ticks, crash_tick, distance, seed_len = \
+            _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} race-car recording")
+        if kind not in (_SEED_INT, _SEED_STR):
+            raise ValueError(f"Recording has an unknown seed kind {kind}")
+        start = _HEADER.size + seed_len
+        seed = data[_HEADER.size:start].decode()
+        seed_value = int(seed) if kind == _SEED_INT else seed
+        actions = data[start:start + ticks]
+        if len(actions) != ticks:
+            raise ValueError(f"Recording is truncated: {len(actions)} of {ticks} ticks")
+        return cls(seed_value, sensor_removal, actions, distance, None if crash_tick < 0 else crash_tick)
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ActionRecorder:
+    """
+    Collects the actions of one game as it is played, one byte per tick.
+    """
+
+    def __init__(self, seed_value=None, sensor_removal: int = 0):
+        """
+        Start recording a game.
+
+        :param seed_value: The seed the game was played with, GameState.seed_value (int or str).
+        :param sensor_removal: Number of randomly removed sensors.
+        :raises TypeError: For any other seed, which could not be replayed.
+        """
+        _check_seed(seed_value)
+        self.seed_value = seed_value
+        self.sensor_removal = sensor_removal
+        self.actions = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def record(self, action: str):
+        """
+        Append the action applied on the next tick. Unknown actions are stored as NOTHING,
+        which is also what the game does with them.
+        """
+        self.actions.append(ACTION_CODES.get(action, NOTHING_CODE))
+
+    def finish(self, distance: float, crash_tick: Optional[int]) -> Recording:
+        """
+        Close the recording with the outcome of the game.
+
+        :param distance: Distance the game reached.
+        :param crash_tick: Tick the game crashed on, or None.
+        :return: The finished Recording.
+        """
+        return Recording(self.seed_value, self.sensor_removal, self.actions, distance, crash_tick)
+
+
+def replay(recording: Union[Recording, str]) -> dict:
+    """
+    Play a recording headless at full speed.
+
+    :param recording: A Recording or the path of a saved one.
+    :return: Dict with distance, crashed, crash_tick and ticks of the replayed game.
+    """
+    from .core import create_game_state
+
+    if isinstance(recording, str):
+        recording = Recording.load(recording)
+    _check_seed(recording.seed_value)
+    state = create_game_state(None, recording.seed_value, recording.sensor_removal)
+    crash_tick = None
+    for code in recording.actions:
+        state.ticks += 1
+        state.step(ACTIONS[code])
+        if state.crashed:
+            crash_tick = state.ticks
+            break
+    return {
+        "distance": state.distance,
+        "crashed": state.crashed,
+        "crash_tick": crash_tick,
+        "ticks": state.ticks,
+    }
+
+
+def verify(recording: Union[Recording, str]) -> dict:
+    """
+    Replay a recording and check that it ends exactly like the recorded game.
+
+    :param recording: A Recording or the path of a saved one.
+    :return: The replay result (see replay).
+    :raises ReplayMismatch: If the distance or the crash tick differ.
+    """
+    if isinstance(recording, str):
+        recording = Recording.load(recording)
+    result = replay(recording)
+    if result["distance"] != recording.distance or result["crash_tick"] != recording.crash_tick:
+        raise ReplayMismatch(
+            f"seed {recording.seed_value!r}: recorded distance {recording.distance} / crash tick "
+            f"{recording.crash_tick}, replayed {result['distance']} / {result['crash_tick']}"
+        )
+    return result
+
+
+if __name__ == "__main__":
+    # python -m src.game.replay recordings/*.replay
+    import sys
+
+    failed = 0
+    for path in sys.argv[1:]:
+        try:
+            result = verify(path)
+            print(f"OK   {path}: distance {result['distance']:.1f}, crash tick {result['crash_tick']}")
+        except (ReplayMismatch, ValueError, OSError) as e:
+            failed += 1
+            print(f"FAIL {path}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,246 @@
+import json
+import os
+import shutil
+import subprocess
+from typing import Optional
+
+import numpy as np
+
+from .core import ACTIONS
+from .replay import ACTION_CODES, NOTHING_CODE
+
+VERSION = 1
+META = "meta.json"
+CHUNK_TICKS = 600  # Ticks per compressed chunk (10 s of game time)
+
+# Column name -> (dtype, per-tick shape; "roster" is one entry per GameState.roster car)
+COLUMNS = {
+    "tick": (np.int32, ()),
+    "action": (np.uint8, ()),             # replay.ACTION_CODES
+    "distance": (np.float64, ()),
+    "crashed": (np.bool_, ()),
+    "x": (np.float64, ("roster",)),       # Car positions and velocities, ego first
+    "y": (np.float64, ("roster",)),
+    "vx": (np.float64, ("roster",)),
+    "vy": (np.float64, ("roster",)),
+    "active": (np.bool_, ("roster",)),    # Whether the car is on the road (in GameState.cars)
+    "sensors": (np.float32, ("sensors",)),  # GameState.sensor_readings, NaN = no hit / removed
+}
+
+
+class TrajectoryRecorder:
+    """
+    Records everything needed to look at a game again after the fact: every car's position
+    and velocity, the sensor readings and the action of every tick. The ticks are buffered
+    in preallocated arrays and written as compressed .npz chunks of CHUNK_TICKS ticks while
+    the game runs, plus a META file with the game's setup and outcome, so a game that is
+    killed half way still leaves its chunks behind.
+
+    Nothing is drawn while recording; render_video draws the frames offscreen on demand.
+    """
+
+    def __init__(self, path: str, state, chunk_ticks: int = CHUNK_TICKS):
+        """
+        Start recording a game into a directory.
+
+        :param path: The output directory, created if needed.
+        :param state: The GameState that will be played; its setup is recorded now.
+        :param chunk_ticks: Ticks per chunk file.
+        """
+        self.path = path
+        self.chunk_ticks = chunk_ticks
+        self.chunks = []
+        self.ticks = 0
+        os.makedirs(path, exist_ok=True)
+        sizes = {"roster": len(state.roster), "sensors": len(state.sensor_readings)}
+        self._buffer = {name: np.zeros((chunk_ticks,) + tuple(sizes[d] for d in dims), dtype=dtype)
+                        for name, (dtype, dims) in COLUMNS.items()}
+        self._row = 0
+        self.meta = {
+            "version": VERSION,
+            "seed": state.seed_value,
+            "sensor_removal": state.sensor_removal,
+            "sensors": [sensor.name for sensor in state.sensors],
+            "colors": [car.color for car in state.roster],
+            "sizes": [(car.width, car.height) for car in state.roster],
+            "chunk_ticks": chunk_ticks,
+        }
+
+    def record(self, state, action: str):
+        """
+        Record the tick that was just played.
+
+        :param state: The game state after the tick.
+        :param action: The action applied on the tick.
+        """
+        buffer, k = self._buffer, self._row
+        buffer["tick"][k] = state.ticks
+        buffer["action"][k] = ACTION_CODES.get(action, NOTHING_CODE)
+        buffer["distance"][k] = state.distance
+        buffer["crashed"][k] = state.crashed
+        active = buffer["active"][k]
+        active[:] = False
+        for i, car in enumerate(state.roster):
+            buffer["x"][k, i] = car.x
+            buffer["y"][k, i] = car.y
+            buffer["vx"][k, i] = car.velocity.x
+            buffer["vy"][k, i] = car.velocity.y
+        for car in state.cars:
+            active[state._roster_index[car]] = True
+        buffer["sensors"][k] = state.sensor_readings
+        self.ticks += 1
+        self._row += 1
+        if self._row == self.chunk_ticks:
+            self._flush()
+
+    def _flush(self):
+        if not self._row:
+            return
+        name = f"chunk_{len(self.chunks):05d}.npz"
+        np.savez_compressed(os.path.join(self.path, name),
+                            **{column: values[:self._row] for column, values in self._buffer.items()})
+        self.chunks.append(name)
+        self._row = 0
+
+    def finish(self, distance: float, crash_tick: Optional[int]) -> dict:
+        """
+        Write the last chunk and the META file.
+
+        :param distance: Distance the game reached.
+        :param crash_tick: Tick the game crashed on, or None.
+        :return: The metadata that was written.
+        """
+        self._flush()
+        self.meta.update(ticks=self.ticks, distance=distance, crash_tick=crash_tick, chunks=self.chunks)
+        with open(os.path.join(self.path, META), "w") as f:
+            json.dump(self.meta, f, indent=2)
+        return self.meta
+
+
+def load_trajectory(path: str) -> tuple:
+    """
+    Read a recorded trajectory.
+
+    :param path: The directory written by TrajectoryRecorder.
+    :return: (meta dict, dict of column name -> array over all ticks)
+    """
+    with open(os.path.join(path, META)) as f:
+        meta = json.load(f)
+    chunks = []
+    for name in meta["chunks"]:
+        with np.load(os.path.join(path, name)) as data:
+            chunks.append({column: data[column] for column in COLUMNS})
+    if not chunks:
+        return meta, {}
+    return meta, {column: np.concatenate([chunk[column] for chunk in chunks]) for column in COLUMNS}
+
+
+def _replay_state(meta: dict):
+    """
+    A GameState with the recorded game's sensors and cars, to draw the recorded positions
+    with. These are taken from meta rather than re-derived from the seed, which also covers
+    games started without one.
+    """
+    from .core import create_game_state
+
+    state = create_game_state(None, meta["seed"])
+    names = set(meta["sensors"])
+    state.sensors = [sensor for sensor in state.sensors if sensor.name in names]
+    for car, color, (width, height) in zip(state.roster, meta["colors"], meta["sizes"]):
+        if car.color != color:
+            car.color = color
+            car.sprite_path = f"public/assets/{color}car.png"
+            car._sprite = None
+        car.width, car.height = width, height
+        car._rect.width, car._rect.height = width, height
+    return state
+
+
+def render_video(path: str, out: str, start: int = 0, end: Optional[int] = None, fps: int = 60,
+                 hud: bool = True) -> int:
+    """
+    Draw a recorded trajectory offscreen (no display needed) and write it as a video
+    (through ffmpeg, for an out path with a video extension) or as numbered PNG frames
+    (when out is a directory).
+
+    :param path: The trajectory directory.
+    :param out: A .mp4 / .webm / .gif / .avi / .mkv path, or a directory for PNG frames.
+    :param start: First tick index to draw; negative counts from the end (-120 = last 2 s).
+    :param end: Tick index to stop before (default: the end of the game).
+    :param fps: Frame rate of the video.
+    :param hud: Draw tick, distance and action in the top left corner.
+    :return: The number of frames written.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    from .render import Renderer, glyphs
+    from .core import SCREEN_HEIGHT, SCREEN_WIDTH, SENSOR_COLUMN
+
+    meta, columns = load_trajectory(path)
+    if not columns:
+        return 0
+    state = _replay_state(meta)
+    sensor_columns = [SENSOR_COLUMN[sensor.name] for sensor in state.sensors]
+    renderer = Renderer(SCREEN_WIDTH, SCREEN_HEIGHT, offscreen=True)
+    rows = range(len(columns["tick"]))[start:end]
+
+    video = os.path.splitext(out)[1].lower() in (".mp4", ".webm", ".gif", ".avi", ".mkv")
+    writer = None
+    if video:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg is needed to write a video; pass a directory to get PNG frames instead")
+        writer = subprocess.Popen(
+            [ffmpeg, "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}", "-r", str(fps), "-i", "-",
+             "-pix_fmt", "yuv420p", out],
+            stdin=subprocess.PIPE)
+    else:
+        os.makedirs(out, exist_ok=True)
+
+    frames = 0
+    try:
+        for k in rows:
+            for i, car in enumerate(state.roster):
+                car.x, car.y = columns["x"][k, i], columns["y"][k, i]
+                car.velocity.x, car.velocity.y = columns["vx"][k, i], columns["vy"][k, i]
+            state.cars = [car for i, car in enumerate(state.roster) if columns["active"][k, i]]
+            center = (state.ego.rect.centerx, state.ego.rect.centery)
+            for sensor, column in zip(state.sensors, sensor_columns):
+                reading = float(columns["sensors"][k, column])
+                sensor.set_reading(center, None if np.isnan(reading) else reading)
+            renderer.draw(state)
+
+            frame = renderer.screen
+            if hud:
+                frame = frame.copy()  # Keep the HUD out of the renderer's dirty-area bookkeeping
+                text = (f"tick {int(columns['tick'][k])}  distance {columns['distance'][k]:.0f}  "
+                        f"{ACTIONS[columns['action'][k]]}{'  CRASH' if columns['crashed'][k] else ''}")
+                glyphs().draw(frame, text, (10, 10))
+            if writer is not None:
+                writer.stdin.write(pygame.image.tobytes(frame, "RGB"))
+            else:
+                pygame.image.save(frame, os.path.join(out, f"frame_{int(columns['tick'][k]):05d}.png"))
+            frames += 1
+    finally:
+        if writer is not None:
+            writer.stdin.close()
+            writer.wait()
+    return frames
+
+
+if __name__ == "__main__":
+    # python -m src.game.trajectory trajectories/seed_3 crash.mp4 --start -180
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render a recorded trajectory offscreen.")
+    parser.add_argument("path", help="trajectory directory")
+    parser.add_argument("out", help="video file (needs ffmpeg) or a directory for PNG frames")
+    parser.add_argument("--start", type=int, default=0, help="first tick index; negative counts from the end")
+    parser.add_argument("--end", type=int, default=None)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--no-hud", action="store_true")
+    args = parser.parse_args()
+    n = render_video(args.path, args.out, args.start, args.end, args.fps, not args.no_hud)
+    print(f"Wrote {n} frames to {args.out}")
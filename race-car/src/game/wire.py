@@ -0,0 +1,89 @@
+import math
+import struct
+from typing import List, Tuple
+
+from .core import ACTIONS, SENSOR_ORDER
+from .replay import ACTION_CODES, NOTHING_CODE
+
+# Compact alternative to the JSON /predict payload, used by /predict_bin and /ws.
+#
+# Request:  version, did_crash, elapsed_ticks, distance, velocity x/y, then the 16 sensor
+#           readings as float32 in SENSOR_ORDER (NaN = sensor missing / no reading)
+# Response: the elapsed_ticks it answers, then one action code per action (see replay.ACTION_CODES)
+VERSION = 1
+
+_REQUEST = struct.Struct(f"<B?xxIdff{len(SENSOR_ORDER)}f")
+_RESPONSE = struct.Struct("<I")
+
+REQUEST_SIZE = _REQUEST.size
+MEDIA_TYPE = "application/octet-stream"
+
+
+def encode_request(payload: dict) -> bytes:
+    """
+    Pack a /predict payload (see GameState.build_payload) into REQUEST_SIZE bytes.
+    Velocity and sensor readings are sent as float32.
+
+    :param payload: The request dict.
+    :return: The packed request.
+    """
+    sensors = payload.get("sensors") or {}
+    readings = []
+    for name in SENSOR_ORDER:
+        value = sensors.get(name)
+        readings.append(math.nan if value in (None, "") else float(value))
+    velocity = payload.get("velocity") or {}
+    return _REQUEST.pack(VERSION, bool(payload.get("did_crash", False)),
+                         int(payload.get("elapsed_ticks", 0)), float(payload.get("distance", 0.0)),
+                         float(velocity.get("x", 0.0)), float(velocity.get("y", 0.0)), *readings)
+
+
+def decode_request(data: bytes) -> dict:
+    """
+    Unpack a request into the same dict the JSON endpoint hands to the policies.
+    Sensors sent as NaN are left out, like sensors removed from the game.
+
+    :param data: The packed request.
+    :return: The request dict.
+    :raises ValueError: If data is not a version VERSION request.
+    """
+    if len(data) != _REQUEST.size:
+        raise ValueError(f"Expected a {_REQUEST.size} byte request, got {len(data)} bytes")
+    version, did_crash, ticks, distance, vx, vy, *readings = _REQUEST.unpack(data)
+    if version != VERSION:
+        raise ValueError(f"Unsupported protocol version {version}")
+    return {
+        "did_crash": did_crash,
+        "elapsed_ticks": ticks,
+        "distance": distance,
+        "velocity": {"x": vx, "y": vy},
+        "sensors": {name: value for name, value in zip(SENSOR_ORDER, readings) if not math.isnan(value)},
+    }
+
+
+def encode_actions(tick: int, actions: List[str]) -> bytes:
+    """
+    Pack an action batch. Unknown actions are sent as NOTHING.
+
+    :param tick: elapsed_ticks of the request being answered.
+    :param actions: The actions.
+    :return: The packed response.
+    """
+    return _RESPONSE.pack(tick) + bytes(ACTION_CODES.get(action, NOTHING_CODE) for action in actions)
+
+
+def decode_actions(data: bytes) -> Tuple[int, List[str]]:
+    """
+    Unpack an action batch.
+
+    :param data: The packed response.
+    :return: The tick it answers and the actions.
+    :raises ValueError: If data is too short or holds an unknown action code.
+    """
+    if len(data) < _RESPONSE.size:
+        raise ValueError(f"Response too short: {len(data)} bytes")
+    (tick,) = _RESPONSE.unpack_from(data)
+    codes = data[_RESPONSE.size:]
+    if any(code >= len(ACTIONS) for code in codes):
+        raise ValueError("Response holds an unknown action code")
+    return tick, [ACTIONS[code] for code in codes]
@@ -2,6 +2,25 @@ import random
 
 rng = None  # Global random number generator instance
 
+def create_rng(seed_value: str) -> random.Random:
+    """
+    Create a new, independent random number generator. Each GameState owns one, so
+    games never share (or disturb) each other's random stream.
+
+    :param seed_value: The seed value as a string.
+    :return: The seeded generator.
+    """
+    return random.Random(seed_value)
+
+def new_seed() -> int:
+    """
+    Draw a seed from the OS for a game started without one. The game keeps it as its
+    seed_value, so an unseeded game can still be recorded and replayed.
+
+    :return: The seed.
+    """
+    return random.SystemRandom().randrange(2 ** 32)
+
 def seed(seed_value: str):
     """
     Seed the random number generator with the given seed value.
@@ -9,20 +28,30 @@ def seed(seed_value: str):
     :param seed_value: The seed value as a string.
     """
     global rng
-    rng = random.Random(seed_value)
+    rng = create_rng(seed_value)
     print(f"Seeded RNG with {seed_value}")
     print(rng)
 
-def random_choice(arr):
-    return rng.choice(arr)
+def random_choice(arr, generator: random.Random = None):
+    """
+    Pick a random element of arr.
+
+    :param arr: The sequence to choose from.
+    :param generator: The RNG to draw from (default: the global one).
+    """
+    return (generator or _global_rng()).choice(arr)
 
-def random_number():
+def random_number(generator: random.Random = None):
     """
     Generate a random number using the seeded RNG.
 
+    :param generator: The RNG to draw from (default: the global one).
     :return: A random float between 0 and 1.
     :raises: RuntimeError if the RNG has not been seeded.
     """
+    return (generator or _global_rng()).random()
+
+def _global_rng() -> random.Random:
     if rng is None:
         raise RuntimeError("RNG not seeded.")
-    return rng.random()
\ No newline at end of file
+    return rng
@@ -2,6 +2,13 @@ import math
 from typing import List
 
 class Vector:
+    """
+    2D vector. add / sub / scale / rotate return a new Vector; the *_ip variants (named
+    like pygame's Rect.move_ip) change this one in place and return it, for hot loops
+    that should not allocate.
+    """
+    __slots__ = ("x", "y")
+
     def __init__(self, x: float = 0, y: float = 0):
         """
         Initialize a Vector object.
@@ -76,6 +83,16 @@ class Vector:
         """
         return Vector(self.x * v, self.y * v)
 
+    def set(self, x: float, y: float):
+        """
+        Overwrite both coordinates in place.
+
+        :return: This Vector.
+        """
+        self.x = x
+        self.y = y
+        return self
+
     def dot(self, v):
         """
         Compute the dot product with another Vector.
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the game (src.*) and the root scripts the way they import each other: from race-car/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
@@ -0,0 +1,87 @@
+# record_baseline_traces.py
+# Records per-tick traces of the original one-game-at-a-time engine (the module-level
+# STATE in src/game/core.py) for tests/test_batch.py: for each game the actions played,
+# and after every tick the distance, the crash flag and every sensor reading.
+#
+# Run it from the race-car directory of a checkout that still has the scalar engine:
+#   python tests/data/record_baseline_traces.py tests/data/baseline_traces.npz
+
+import contextlib
+import io
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+
+import src.game.core as core
+
+ACTIONS = ["ACCELERATE", "DECELERATE", "STEER_LEFT", "STEER_RIGHT", "NOTHING"]  # Spelled out: old checkouts have no core.ACTIONS
+GAMES = [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (6, 0), ("abc", 0), (7, 2), (8, 3)]
+MAX_TICKS = 800
+
+
+def _actions(seed) -> list:
+    # Random actions, each held for a few ticks like a real driver would
+    rng = random.Random(f"baseline-{seed}")
+    actions = []
+    while len(actions) < MAX_TICKS:
+        action = rng.choice(["NOTHING", "NOTHING", "ACCELERATE", "DECELERATE", "STEER_LEFT", "STEER_RIGHT"])
+        actions += [action] * rng.randint(1, 12)
+    return actions[:MAX_TICKS]
+
+
+def record(seed, sensor_removal: int) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        core.initialize_game_state(None, seed, sensor_removal)
+    state = core.STATE
+    names = [name for _, name in core.SENSOR_OPTIONS]
+    trace = {"actions": [], "distance": [], "crashed": [], "readings": []}
+    for action in _actions(seed):
+        # The body of game_loop, minus drawing and the policy request
+        state.ticks += 1
+        core.handle_action(action)
+        state.distance += state.ego.velocity.x
+        core.update_cars()
+        core.remove_passed_cars()
+        core.place_car()
+        for sensor in state.sensors:
+            sensor.update()
+        for car in state.cars:
+            if car != state.ego and core.intersects(state.ego.rect, car.rect):
+                state.crashed = True
+        for wall in state.road.walls:
+            if core.intersects(state.ego.rect, wall.rect):
+                state.crashed = True
+        readings = {sensor.name: sensor.reading for sensor in state.sensors}
+        trace["actions"].append(ACTIONS.index(action))
+        trace["distance"].append(state.distance)
+        trace["crashed"].append(state.crashed)
+        trace["readings"].append([np.nan if readings.get(name) is None else readings[name] for name in names])
+        if state.crashed:
+            break
+    return trace
+
+
+def main(out_path: str):
+    arrays = {
+        "seeds": np.array([str(seed) for seed, _ in GAMES]),
+        "seed_is_int": np.array([isinstance(seed, int) for seed, _ in GAMES]),
+        "sensor_removal": np.array([removal for _, removal in GAMES], dtype=np.int64),
+        "sensor_names": np.array([name for _, name in core.SENSOR_OPTIONS]),
+    }
+    for k, (seed, sensor_removal) in enumerate(GAMES):
+        trace = record(seed, sensor_removal)
+        arrays[f"actions_{k}"] = np.array(trace["actions"], dtype=np.uint8)
+        arrays[f"distance_{k}"] = np.array(trace["distance"], dtype=np.float64)
+        arrays[f"crashed_{k}"] = np.array(trace["crashed"], dtype=bool)
+        arrays[f"readings_{k}"] = np.array(trace["readings"], dtype=np.float64)
+        print(f"seed {seed!r} removal {sensor_removal}: {len(trace['distance'])} ticks, "
+              f"distance {trace['distance'][-1]:.1f}")
+    np.savez_compressed(out_path, **arrays)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "baseline_traces.npz"))
@@ -0,0 +1,59 @@
+"""BatchGame against per-tick traces of the original one-game engine (data/baseline_traces.npz)."""
+import os
+
+import numpy as np
+import pytest
+
+from src.game.batch import SENSOR_NAMES, BatchGame
+from src.game.core import ACTIONS, create_game_state
+
+TRACES = os.path.join(os.path.dirname(__file__), "data", "baseline_traces.npz")
+NOTHING = 4  # Index of "NOTHING" in the trace's action codes, played once a game's trace has ended
+
+
+@pytest.fixture(scope="module")
+def traces():
+    with np.load(TRACES) as data:
+        seeds = [int(seed) if is_int else str(seed) for seed, is_int in zip(data["seeds"], data["seed_is_int"])]
+        columns = [SENSOR_NAMES.index(name) for name in data["sensor_names"]]
+        games = [{"seed": seed,
+                  "sensor_removal": int(data["sensor_removal"][k]),
+                  "actions": data[f"actions_{k}"],
+                  "distance": data[f"distance_{k}"],
+                  "crashed": data[f"crashed_{k}"],
+                  "readings": data[f"readings_{k}"]}
+                 for k, seed in enumerate(seeds)]
+    return games, columns
+
+
+def test_batch_game_matches_baseline_traces(traces):
+    games, columns = traces
+    for sensor_removal in sorted({game["sensor_removal"] for game in games}):
+        group = [game for game in games if game["sensor_removal"] == sensor_removal]
+        batch = BatchGame([game["seed"] for game in group], sensor_removal)
+        for tick in range(max(len(game["actions"]) for game in group)):
+            batch.step([int(game["actions"][tick]) if tick < len(game["actions"]) else NOTHING for game in group])
+            for i, game in enumerate(group):
+                if tick >= len(game["actions"]):
+                    assert batch.done[i]
+                    continue
+                where = f"seed {game['seed']!r} tick {tick + 1}"
+                assert batch.distance[i] == game["distance"][tick], where
+                assert batch.crashed[i] == game["crashed"][tick], where
+                # ray_box_distances can differ from the per-edge loop in the last bit of a distance
+                np.testing.assert_allclose(batch.readings[i, columns], game["readings"][tick],
+                                           rtol=0, atol=1e-9, err_msg=where)
+
+
+def test_game_state_matches_baseline_traces(traces):
+    games, columns = traces
+    for game in games:
+        state = create_game_state(None, game["seed"], game["sensor_removal"])
+        for tick, action in enumerate(game["actions"]):
+            state.ticks += 1
+            state.step(ACTIONS[action])
+            where = f"seed {game['seed']!r} tick {tick + 1}"
+            assert state.distance == game["distance"][tick], where
+            assert state.crashed == game["crashed"][tick], where
+            np.testing.assert_allclose(np.asarray(state.sensor_readings)[columns], game["readings"][tick],
+                                       rtol=0, atol=1e-9, err_msg=where)
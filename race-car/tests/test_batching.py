@@ -0,0 +1,125 @@
+"""MicroBatcher batching rules, and reflex answers that do not depend on how requests are batched."""
+import asyncio
+import random
+import threading
+
+import pytest
+
+import api_rl
+from batching import MicroBatcher
+from src.game.core import SENSOR_ORDER
+
+
+class Recorder:
+    # Batch function that returns each item doubled and remembers the batches it got
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, items):
+        self.release.wait(5)
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+def test_lone_item_is_sent_without_waiting():
+    async def main():
+        batcher = MicroBatcher(Recorder())
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        assert await batcher.submit(3) == 6
+        return loop.time() - start, batcher.fn.batches
+
+    elapsed, batches = asyncio.run(main())
+    assert batches == [[3]]
+    assert elapsed < 0.5
+
+
+def test_items_submitted_together_share_a_batch():
+    async def main():
+        batcher = MicroBatcher(Recorder())
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        return results, batcher.fn.batches
+
+    results, batches = asyncio.run(main())
+    assert results == [2 * i for i in range(10)]
+    assert batches == [list(range(10))]
+
+
+def test_items_arriving_during_a_batch_form_the_next_one():
+    async def main():
+        recorder = Recorder()
+        recorder.release.clear()
+        batcher = MicroBatcher(recorder)
+        first = asyncio.ensure_future(batcher.submit(0))
+        await asyncio.sleep(0.05)  # The first batch is now running and blocked
+        later = [asyncio.ensure_future(batcher.submit(i)) for i in range(1, 4)]
+        await asyncio.sleep(0.05)
+        recorder.release.set()
+        return await first, await asyncio.gather(*later), recorder.batches
+
+    first, later, batches = asyncio.run(main())
+    assert (first, later) == (0, [2, 4, 6])
+    assert batches == [[0], [1, 2, 3]]
+
+
+def test_max_batch_splits_batches():
+    async def main():
+        batcher = MicroBatcher(Recorder(), max_batch=4)
+        await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        return batcher.fn.batches
+
+    assert [len(batch) for batch in asyncio.run(main())] == [4, 4, 2]
+
+
+def test_errors_reach_every_caller_of_the_batch():
+    def fail(items):
+        raise ValueError("model broke")
+
+    def short(items):
+        return items[:-1]
+
+    async def main(fn):
+        batcher = MicroBatcher(fn)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(main(fail)))
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(main(short)))
+
+
+def _requests(rng: random.Random, n: int) -> list:
+    return [{"sensors": {name: rng.choice([None, rng.uniform(100.0, 1000.0)]) for name in SENSOR_ORDER},
+             "velocity": {"x": rng.uniform(0.0, 25.0), "y": 0.0}} for _ in range(n)]
+
+
+@pytest.fixture
+def fresh_reflex(monkeypatch):
+    monkeypatch.setattr(api_rl, "REFLEX", api_rl.ReflexPolicy(0))
+    monkeypatch.setattr(api_rl, "REFLEX_GAMES", {})
+
+
+def test_reflex_answers_do_not_depend_on_batching(fresh_reflex):
+    rng = random.Random(0)
+    games = {"a": _requests(rng, 200), "b": _requests(rng, 200), None: _requests(rng, 200)}
+
+    # Each game alone, one request at a time
+    alone = {game: [api_rl._decide_batch([(game, req)])[0] for req in reqs] for game, reqs in games.items()}
+
+    # The same requests again for fresh games, interleaved into random batches, where a
+    # game's requests may also share a batch
+    for game in list(games):
+        api_rl._forget_game(game)
+    queue, taken = [], {game: 0 for game in games}
+    while len(queue) < sum(len(reqs) for reqs in games.values()):
+        game = rng.choice([game for game in games if taken[game] < len(games[game])])
+        queue.append((game, taken[game]))
+        taken[game] += 1
+    batched = {game: [] for game in games}
+    while queue:
+        size = rng.randint(1, 12)
+        batch, queue = queue[:size], queue[size:]
+        actions = api_rl._decide_batch([(game, games[game][k]) for game, k in batch])
+        for (game, _), action in zip(batch, actions):
+            batched[game].append(action)
+    assert batched == alone
@@ -0,0 +1,98 @@
+"""PipelinedClient against a stub policy server: answer order, deadlines and timeouts."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.game.client import JsonClient, PipelinedClient
+
+DEADLINE = 0.2  # Seconds the pipeline gives each request
+
+
+class StubPolicy(BaseHTTPRequestHandler):
+    # Answers /predict with one action naming the request's tick, after the delay set for that tick
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        tick = payload["elapsed_ticks"]
+        self.server.received.append(tick)
+        time.sleep(self.server.delays.get(tick, 0.0))
+        body = json.dumps({"actions": [f"ACTION_{tick}"]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubPolicy)
+    server.received, server.delays = [], {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pipeline(server):
+    # The inner client's own timeout is generous, so only the pipeline's deadline counts
+    pipeline = PipelinedClient(JsonClient(f"127.0.0.1:{server.server_port}", timeout=5.0), timeout=DEADLINE)
+    yield pipeline
+    pipeline.close()
+
+
+def _payload(tick: int) -> dict:
+    return {"elapsed_ticks": tick}
+
+
+def test_request_returns_before_the_answer(server, pipeline):
+    server.delays[1] = 0.1
+    start = time.perf_counter()
+    pending = pipeline.request(_payload(1))
+    assert time.perf_counter() - start < 0.05
+    assert not pending.done()
+    assert pending.result() == ["ACTION_1"]
+
+
+def test_requests_are_sent_and_answered_in_order(server, pipeline):
+    # The first is the slowest, so later ones would overtake it if they ran in parallel
+    server.delays.update({0: 0.08, 1: 0.01, 2: 0.0})
+    pending = [pipeline.request(_payload(tick)) for tick in range(3)]
+    assert [batch.result() for batch in pending] == [["ACTION_0"], ["ACTION_1"], ["ACTION_2"]]
+    assert server.received == [0, 1, 2]
+
+
+def test_late_answer_raises_timeout_at_the_deadline(server, pipeline):
+    server.delays[1] = 0.6
+    pending = pipeline.request(_payload(1))
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        pending.result()
+    assert time.perf_counter() - start < DEADLINE + 0.1  # Gave up at the deadline, not at the answer
+
+
+def test_deadline_counts_from_the_request(server, pipeline):
+    server.delays[1] = 0.6
+    pending = pipeline.request(_payload(1))
+    time.sleep(DEADLINE + 0.05)  # The game plays its remaining actions meanwhile
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        pending.result()
+    assert time.perf_counter() - start < 0.05  # Already past the deadline: no further wait
+
+
+def test_late_answer_is_not_handed_to_the_next_request(server, pipeline):
+    server.delays[1] = 0.3
+    with pytest.raises(TimeoutError):
+        pipeline.request(_payload(1)).result()
+    time.sleep(0.2)  # Let the server finish tick 1
+    assert pipeline.request(_payload(2)).result() == ["ACTION_2"]
+    assert server.received == [1, 2]
@@ -0,0 +1,31 @@
+"""game_loop's action log, with a stub policy client instead of the API."""
+import pytest
+
+import src.game.client as client
+import src.game.core as core
+
+
+class StubClient:
+    def predict(self, payload: dict) -> list:
+        return ["ACCELERATE"] * 10
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    monkeypatch.setattr(client, "make_client", lambda protocol: StubClient())
+
+
+@pytest.mark.parametrize("log_actions", [False, True])
+def test_action_log_only_when_asked(stub_client, tmp_path, log_actions):
+    core.initialize_game_state(None, 0)
+    log_path = str(tmp_path / "game.bin")
+    core.game_loop(verbose=False, log_actions=log_actions, log_path=log_path, fast_forward=True)
+    if log_actions:
+        assert len(core.ACTION_LOG) == core.STATE.ticks - 1  # The last tick only ends the game
+        assert (tmp_path / "game.bin").exists()
+    else:
+        assert core.ACTION_LOG is None
+        assert not (tmp_path / "game.bin").exists()
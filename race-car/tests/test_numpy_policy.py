@@ -0,0 +1,96 @@
+"""NumpyPolicy on fixed weights, checked against a plain NumPy version of the SB3 actor."""
+import numpy as np
+import pytest
+
+from numpy_policy import NumpyPolicy
+
+OBS_DIM = 18
+HIDDEN = (64, 64)
+N_ACTIONS = 5
+
+
+def _torch_layers(seed: int):
+    # Weights laid out like torch's nn.Linear: (out, in), as export_policy.py reads them
+    rng = np.random.default_rng(seed)
+    sizes = (OBS_DIM,) + HIDDEN + (N_ACTIONS,)
+    return [(rng.normal(0.0, 1.0 / np.sqrt(n_in), (n_out, n_in)), rng.normal(0.0, 0.1, n_out))
+            for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+
+
+def _save(path, layers, activation: str):
+    # The .npz layout export_policy.py writes
+    arrays = {}
+    for i, (weight, bias) in enumerate(layers):
+        arrays[f"w{i}"] = weight.T.astype(np.float32)
+        arrays[f"b{i}"] = bias.astype(np.float32)
+    np.savez(path, n_layers=len(layers), activation=activation, **arrays)
+
+
+def _reference_logits(layers, obs: np.ndarray, activation: str) -> np.ndarray:
+    # SB3's MlpPolicy actor: Linear -> activation for every hidden layer, then action_net,
+    # one observation at a time in float64
+    act = np.tanh if activation == "tanh" else (lambda v: np.maximum(v, 0.0))
+    out = []
+    for x in obs.astype(np.float64):
+        for i, (weight, bias) in enumerate(layers):
+            x = weight @ x + bias
+            if i < len(layers) - 1:
+                x = act(x)
+        out.append(x)
+    return np.array(out)
+
+
+@pytest.mark.parametrize("activation", ["tanh", "relu"])
+def test_forward_pass_matches_reference(tmp_path, activation):
+    layers = _torch_layers(0)
+    _save(tmp_path / "policy.npz", layers, activation)
+    policy = NumpyPolicy.load(str(tmp_path / "policy.npz"))
+    assert (policy.obs_dim, policy.n_actions, policy.activation) == (OBS_DIM, N_ACTIONS, activation)
+
+    obs = np.random.default_rng(1).uniform(0.0, 1.0, (500, OBS_DIM)).astype(np.float32)
+    expected = _reference_logits(layers, obs, activation)
+    logits = policy.logits(obs)
+    assert logits.dtype == np.float32
+    np.testing.assert_allclose(logits, expected, rtol=1e-4, atol=1e-5)
+
+    # Deterministic actions are the reference argmax wherever the best two logits are not a near-tie
+    actions, state = policy.predict(obs, deterministic=True)
+    assert state is None
+    top2 = np.sort(expected, axis=1)[:, -2:]
+    clear = top2[:, 1] - top2[:, 0] > 1e-4
+    np.testing.assert_array_equal(actions[clear], expected.argmax(axis=1)[clear])
+
+
+def test_known_answer():
+    # One hidden unit: h = tanh(x0 - x1), logits = (h, -h, 0.5)
+    layers = [(np.array([[1.0, -1.0]]), np.array([0.0])),
+              (np.array([[1.0], [-1.0], [0.0]]), np.array([0.0, 0.0, 0.5]))]
+    policy = NumpyPolicy([w.T for w, _ in layers], [b for _, b in layers], "tanh")
+    h = np.tanh(0.75)
+    np.testing.assert_allclose(policy.logits(np.array([1.0, 0.25])), [[h, -h, 0.5]], rtol=1e-6)
+    assert policy.predict(np.array([1.0, 0.25]), deterministic=True)[0] == 0
+    assert policy.predict(np.array([0.25, 1.0]), deterministic=True)[0] == 1
+    assert policy.predict(np.array([0.5, 0.5]), deterministic=True)[0] == 2
+
+
+def test_single_observation_gives_single_action(tmp_path):
+    _save(tmp_path / "policy.npz", _torch_layers(2), "tanh")
+    policy = NumpyPolicy.load(str(tmp_path / "policy.npz"))
+    obs = np.random.default_rng(3).uniform(0.0, 1.0, (4, OBS_DIM)).astype(np.float32)
+    batch, _ = policy.predict(obs, deterministic=True)
+    assert batch.shape == (4,)
+    assert [policy.predict(row, deterministic=True)[0] for row in obs] == list(batch)
+
+
+def test_sampling_follows_the_softmax():
+    layers = [(np.zeros((N_ACTIONS, 1)), np.log([0.5, 0.2, 0.15, 0.1, 0.05]))]
+    policy = NumpyPolicy([w.T for w, _ in layers], [b for _, b in layers], "tanh")
+    policy.rng = np.random.default_rng(4)
+    actions, _ = policy.predict(np.zeros((40_000, 1)))
+    freq = np.bincount(actions, minlength=N_ACTIONS) / len(actions)
+    np.testing.assert_allclose(freq, [0.5, 0.2, 0.15, 0.1, 0.05], atol=0.01)
+
+
+def test_unsupported_activation_is_rejected():
+    with pytest.raises(ValueError):
+        NumpyPolicy([np.zeros((2, 2))], [np.zeros(2)], "gelu")
@@ -0,0 +1,48 @@
+"""ObstacleIndex queries against a full scan of every car and wall, on real games."""
+import random
+
+import pytest
+
+from src.game.core import create_game_state
+
+
+def _overlaps(rect, x_min, x_max, y_min, y_max) -> bool:
+    return rect.x <= x_max and rect.x + rect.width >= x_min and rect.y <= y_max and rect.y + rect.height >= y_min
+
+
+def _play(seed, ticks: int = 600):
+    # Yields the game state after every tick of a random drive, until it crashes
+    state = create_game_state(None, seed)
+    rng = random.Random(f"queries-{seed}")
+    for _ in range(ticks):
+        state.ticks += 1
+        state.step(rng.choice(["ACCELERATE", "NOTHING", "STEER_LEFT", "STEER_RIGHT"]))
+        yield state, rng
+        if state.crashed:
+            break
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_index_holds_every_other_car(seed):
+    for state, _ in _play(seed):
+        others = [car for car in state.cars if car is not state.ego]
+        indexed = list(state.obstacles.cars_in(-1e9, 1e9, -1e9, 1e9))
+        assert len(indexed) == len(others)
+        assert set(indexed) == set(others)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_queries_never_miss_an_overlapping_obstacle(seed):
+    for state, rng in _play(seed):
+        ego = state.ego.rect
+        areas = [(ego.left, ego.right, ego.top, ego.bottom)]
+        for _ in range(20):
+            x, y, reach = rng.uniform(-200, 1800), rng.uniform(0, 1200), rng.uniform(0, 1000)
+            areas.append((x - reach, x + reach, y - reach, y + reach))
+        for area in areas:
+            # Extra candidates are fine, a missed car is not
+            found = set(state.obstacles.cars_in(*area))
+            assert all(car in found for car in state.cars
+                       if car is not state.ego and _overlaps(car.rect, *area)), (state.ticks, area)
+            walls = [wall for wall in state.road.walls if _overlaps(wall.rect, -1e9, 1e9, area[2], area[3])]
+            assert list(state.obstacles.walls_in(area[2], area[3])) == walls, (state.ticks, area)
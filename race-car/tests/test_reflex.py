@@ -0,0 +1,50 @@
+"""The compiled reflex policy (reflex.py) against the Python reflex planner in api_rl."""
+import random
+
+import pytest
+
+import api_rl
+from reflex import ReflexPolicy
+from src.game.core import SENSOR_ORDER, play_headless
+
+# Readings and speeds on the thresholds, where the two forms are most likely to disagree
+EDGES = [140.0, 180.0, 340.0, 420.0, 450.0, 650.0, 900.0, 1000.0]
+SPEEDS = [6.0, 8.0, 14.0, 18.0]
+
+
+def _python_decide(req: dict, state: dict) -> str:
+    # _reflex_decide keeps its steering state in the module; swap this game's state in and out
+    api_rl.REFLEX_STATE.clear()
+    api_rl.REFLEX_STATE.update(state)
+    action = api_rl._reflex_decide(req)
+    state.update(api_rl.REFLEX_STATE)
+    return action
+
+
+def _random_request(rng: random.Random) -> dict:
+    sensors = {name: rng.choice([None, rng.uniform(0.0, 1000.0), rng.choice(EDGES)])
+               for name in SENSOR_ORDER if rng.random() > 0.1}
+    return {"sensors": sensors, "velocity": {"x": rng.choice([rng.uniform(0.0, 25.0), rng.choice(SPEEDS)]), "y": 0.0}}
+
+
+def test_batch_matches_python_on_random_requests():
+    rng = random.Random(0)
+    policy = ReflexPolicy(20)
+    states = [{"intent": None, "cooldown": 0} for _ in range(20)]
+    for step in range(1000):
+        reqs = [_random_request(rng) for _ in states]
+        expected = [_python_decide(req, state) for req, state in zip(reqs, states)]
+        assert policy.decide_batch(reqs) == expected, step
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_matches_python_in_games(seed):
+    policy = ReflexPolicy()
+    state = {"intent": None, "cooldown": 0}
+
+    def decide(req):
+        action = _python_decide(req, state)
+        assert policy.decide(req) == action
+        return [action] * api_rl.BATCH_LEN
+
+    play_headless(decide, seed, seed % 3)
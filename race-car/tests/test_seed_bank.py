@@ -0,0 +1,116 @@
+"""SeedBank creation under concurrency, its moving averages, and CurriculumSampler's weighting."""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from seed_bank import (EMA, EPISODES, FAILURE_EMA, PRIORITY_FLOOR, UNSEEN_DIFFICULTY, CurriculumSampler,
+                       SeedBank, _create)
+
+RACE_CAR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKERS = 8
+
+
+def _check_bank(path, capacity: int):
+    # The file is a complete bank and no temporary file was left behind
+    table = np.load(path)
+    assert table.shape == (capacity, 4) and table.dtype == np.float64
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
+
+
+def test_threads_creating_the_same_bank(tmp_path):
+    for trial in range(20):
+        path = str(tmp_path / f"trial{trial}" / "bank.npy")
+        barrier, errors = threading.Barrier(WORKERS), []
+
+        def create():
+            barrier.wait()
+            try:
+                _create(path, 1000)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=create) for _ in range(WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        _check_bank(path, 1000)
+
+
+def test_processes_opening_the_same_bank_keep_every_record(tmp_path):
+    # Every worker opens (and so maybe creates) the bank at the same instant and records its
+    # own seed; a bank created over another one would lose the records made into it
+    path = str(tmp_path / "models" / "bank.npy")
+    start = time.time() + 1.0
+    script = ("import sys, time; from seed_bank import SeedBank\n"
+              "time.sleep(max(float(sys.argv[2]) - time.time(), 0))\n"
+              "bank = SeedBank(sys.argv[1], 500)\n"
+              "bank.record(int(sys.argv[3]), True, 100.0)\n"
+              "bank.flush()\n")
+    workers = [subprocess.Popen([sys.executable, "-c", script, path, str(start), str(seed)], cwd=RACE_CAR)
+               for seed in range(WORKERS)]
+    assert [worker.wait(60) for worker in workers] == [0] * WORKERS
+    _check_bank(path, 500)
+    np.testing.assert_array_equal(np.load(path)[:, EPISODES], [1] * WORKERS + [0] * (500 - WORKERS))
+
+
+def test_existing_bank_is_kept(tmp_path):
+    path = str(tmp_path / "bank.npy")
+    SeedBank(path, 100).record(7, True, 50.0)
+    _create(path, 100)
+    bank = SeedBank(path, capacity=200)  # An existing file keeps its own capacity
+    assert bank.capacity == 100 and bank.table[7, EPISODES] == 1
+    _check_bank(path, 100)
+
+
+def test_record_keeps_moving_averages(tmp_path):
+    bank = SeedBank(str(tmp_path / "bank.npy"), 10)
+    bank.record(3, True, 100.0)
+    bank.record(3, False, 300.0)
+    bank.record(-1, True, 0.0)  # Outside the bank: ignored
+    bank.record(10, True, 0.0)
+    assert list(bank.table[3]) == [2, 1, 1 - EMA, 100.0 + EMA * 200.0]
+    assert bank.table[:, EPISODES].sum() == 2
+    assert bank.difficulty()[3] == pytest.approx(1 - EMA)
+    assert bank.difficulty()[0] == UNSEEN_DIFFICULTY
+    assert [seed for seed, *_ in bank.hardest()] == [3]
+
+
+def _frequencies(sampler: CurriculumSampler, n: int = 60_000) -> np.ndarray:
+    seeds = [sampler.sample() for _ in range(n)]
+    return np.bincount(seeds, minlength=sampler.bank.capacity) / n
+
+
+@pytest.fixture
+def bank(tmp_path):
+    # Seed 0 always fails, seed 1 never, seed 2 failed then did not, seed 3 was never played
+    bank = SeedBank(str(tmp_path / "bank.npy"), 4)
+    bank.record(0, True, 10.0)
+    bank.record(1, False, 900.0)
+    bank.record(2, True, 10.0)
+    bank.record(2, False, 900.0)
+    return bank
+
+
+@pytest.mark.parametrize("hard_fraction,exponent", [(1.0, 2.0), (1.0, 1.0), (0.5, 2.0), (0.0, 2.0)])
+def test_sampler_weights_seeds_by_difficulty(bank, hard_fraction, exponent):
+    sampler = CurriculumSampler(bank, hard_fraction, exponent, rng=np.random.default_rng(0))
+    # hard_fraction of the draws in proportion to (difficulty + floor) ** exponent, the rest uniform
+    weights = (np.array([1.0, 0.0, 1 - EMA, UNSEEN_DIFFICULTY]) + PRIORITY_FLOOR) ** exponent
+    expected = hard_fraction * weights / weights.sum() + (1 - hard_fraction) / 4
+    np.testing.assert_allclose(_frequencies(sampler), expected, atol=0.01)
+
+
+def test_sampler_follows_new_records(bank):
+    sampler = CurriculumSampler(bank, hard_fraction=1.0, rng=np.random.default_rng(1))
+    for _ in range(30):
+        sampler.record(0, False, 900.0)
+    assert bank.table[0, FAILURE_EMA] < 0.01
+    frequencies = _frequencies(sampler, 20_000)
+    assert frequencies[0] < 0.01 and frequencies[2:].sum() > 0.95  # The remaining hard seeds take over
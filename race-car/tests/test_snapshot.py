@@ -0,0 +1,89 @@
+"""GameState snapshot / restore / rollout leave the game exactly as it was."""
+import random
+
+import numpy as np
+import pytest
+
+from src.game.core import ACTIONS, create_game_state
+
+
+def _fingerprint(state) -> dict:
+    # Everything a later tick or a request can see; sensor readings hold NaN for "nothing seen"
+    return {
+        "scalars": np.array([state.ticks, state.elapsed_game_time, state.distance, state.crashed], dtype=np.float64),
+        "cars": np.array([(car.x, car.y, car.velocity.x, car.velocity.y) for car in state.cars]),
+        "lanes": [state.road.lanes.index(car.lane) if car.lane is not None else -1 for car in state.cars],
+        "order": [state.roster.index(car) for car in state.cars],
+        "bucket": [state.roster.index(car) for car in state.car_bucket],
+        "sensor_readings": np.array(state.sensor_readings),
+        "rng": state.rng.getstate(),
+    }
+
+
+def _assert_same(before: dict, after: dict):
+    for key in before:
+        if isinstance(before[key], np.ndarray):
+            np.testing.assert_array_equal(after[key], before[key], err_msg=key)  # NaN == NaN here
+        else:
+            assert after[key] == before[key], key
+
+
+def _play(seed, ticks: int, history=None):
+    state = create_game_state(None, seed)
+    rng = random.Random(f"snapshot-{seed}")
+    for _ in range(ticks):
+        state.ticks += 1
+        state.step(rng.choice(["ACCELERATE", "NOTHING", "NOTHING", "STEER_LEFT", "STEER_RIGHT"]))
+        if state.crashed:
+            break
+    for action in history or []:
+        state.ticks += 1
+        state.step(action)
+    return state
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_rollout_leaves_the_game_unchanged(seed):
+    state = _play(seed, 150)
+    assert np.isnan(state.sensor_readings).any()  # The NaN-aware comparison is exercised
+    before = _fingerprint(state)
+    state.rollout(["ACCELERATE"] * 200)  # Seeds 0 and 2 crash in it, so a crash is rolled back too
+    _assert_same(before, _fingerprint(state))
+
+
+def test_restore_after_play_returns_to_the_snapshot():
+    state = _play(3, 100)
+    snapshot = state.snapshot()
+    before = _fingerprint(state)
+    for action in ["STEER_LEFT"] * 30 + ["ACCELERATE"] * 30:
+        state.step(action)
+    state.restore(snapshot)
+    _assert_same(before, _fingerprint(state))
+
+
+def test_rollout_predicts_the_real_outcome_and_play_continues_identically():
+    probed, plain = _play(4, 80), _play(4, 80)
+    rng = random.Random(4)
+    history = []
+    for tick in range(200):
+        plan = [rng.choice(ACTIONS) for _ in range(15)]
+        gained, crash_after = probed.rollout(plan)
+
+        if tick % 10 == 0:
+            # Playing the plan for real on a fresh copy of the game gives what the rollout reported
+            real = _play(4, 80, history)
+            start, real_crash = real.distance, None
+            for k, action in enumerate(plan, 1):
+                real.step(action)
+                if real.crashed:
+                    real_crash = k
+                    break
+            assert (gained, crash_after) == (real.distance - start, real_crash)
+
+        history.append(plan[0])
+        for game in (probed, plain):
+            game.ticks += 1
+            game.step(plan[0])
+        _assert_same(_fingerprint(plain), _fingerprint(probed))
+        if plain.crashed:
+            break
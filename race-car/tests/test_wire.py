@@ -0,0 +1,62 @@
+"""Round trips of the packed /predict_bin formats and of game recordings through bytes."""
+import math
+import random
+
+import numpy as np
+import pytest
+
+from src.game.core import ACTIONS, create_game_state, play_headless
+from src.game.replay import ActionRecorder, Recording, verify
+from src.game.wire import REQUEST_SIZE, decode_actions, decode_request, encode_actions, encode_request
+
+SEEDS = [0, 1, 2, "abc"]
+
+
+def _f32(value: float) -> float:
+    return float(np.float32(value))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_request_round_trip(seed):
+    state = create_game_state(None, seed, 2)
+    rng = random.Random(f"wire-{seed}")
+    while not state.crashed and state.ticks < 600:
+        state.ticks += 1
+        state.step(rng.choice(ACTIONS))
+        payload = state.build_payload()
+        data = encode_request(payload)
+        assert len(data) == REQUEST_SIZE
+        decoded = decode_request(data)
+        assert decoded["did_crash"] == payload["did_crash"]
+        assert decoded["elapsed_ticks"] == payload["elapsed_ticks"]
+        assert decoded["distance"] == payload["distance"]
+        assert decoded["velocity"] == {axis: _f32(v) for axis, v in payload["velocity"].items()}
+        # Sensors travel as float32; removed sensors (and NaN) are left out
+        assert decoded["sensors"] == {name: _f32(v) for name, v in payload["sensors"].items() if not math.isnan(v)}
+
+
+def test_action_round_trip():
+    rng = random.Random(0)
+    for tick in [0, 1, 599, 2 ** 32 - 1]:
+        actions = [rng.choice(ACTIONS) for _ in range(rng.randint(0, 20))]
+        assert decode_actions(encode_actions(tick, actions)) == (tick, actions)
+
+
+def test_unknown_action_decodes_as_nothing():
+    assert decode_actions(encode_actions(5, ["BOOST"])) == (5, ["NOTHING"])
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_recording_round_trip(seed):
+    rng = random.Random(f"recording-{seed}")
+    recorder = ActionRecorder(seed, 2)
+    result = play_headless(lambda request: [rng.choice(ACTIONS) for _ in range(10)], seed, 2, recorder)
+    recording = recorder.finish(result["distance"], result["crash_tick"])
+    loaded = Recording.from_bytes(recording.to_bytes())
+    assert loaded.seed_value == seed and type(loaded.seed_value) is type(seed)
+    assert loaded.sensor_removal == 2
+    assert loaded.actions == recording.actions
+    assert loaded.ticks == result["ticks"]
+    assert loaded.distance == result["distance"]
+    assert loaded.crash_tick == result["crash_tick"]
+    verify(loaded)  # Raises ReplayMismatch unless the replay ends exactly as recorded
@@ -1,17 +1,88 @@
 # train_ppo.py
 # Trains a quick PPO on the RaceCarEnv and saves it to models/ppo_racecar.zip
 
+#
+#   python train_ppo.py                 # one env per CPU core
+#   python train_ppo.py --n-envs 1      # single in-process env (easier to debug)
+#   python train_ppo.py --batched --n-envs 64   # all envs in one vectorised BatchRaceCarEnv
+#   python train_ppo.py --pretrain data/reflex   # behaviour-clone imitation_data.py samples first
+#   python train_ppo.py --seed-bank models/seed_bank.npy   # spend more episodes on seeds that still crash
+
+import argparse
+import functools
 import os
 from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv
 from racecar_env import RaceCarEnv
+from shm_vec_env import SharedMemoryVecEnv
+
+def make_sampler(seed_bank: str = None):
+    if not seed_bank:
+        return None
+    from seed_bank import CurriculumSampler, SeedBank
+    return CurriculumSampler(SeedBank(seed_bank))
+
+def make_env(seed_bank: str = None):
+    # Runs in the worker process, so every worker maps the seed bank file itself
+    return RaceCarEnv(max_steps=1800, sampler=make_sampler(seed_bank))
+
+def behaviour_clone(model, dataset_dir: str, epochs: int, batch_size: int = 1024):
+    """
+    Warm-start the policy by maximising the log-likelihood of the dataset's actions
+    (cross-entropy), using the policy's own optimizer.
+    """
+    import torch as th
+    from imitation_data import load_dataset
 
-def make_env():
-    return RaceCarEnv(max_steps=1800)
+    data = load_dataset(dataset_dir, ["obs", "action"])
+    obs = th.as_tensor(data["obs"], device=model.device)
+    actions = th.as_tensor(data["action"], device=model.device)
+    policy = model.policy
+    policy.set_training_mode(True)
+    for epoch in range(epochs):
+        order = th.randperm(len(obs), device=model.device)
+        total = 0.0
+        for start in range(0, len(obs), batch_size):
+            idx = order[start:start + batch_size]
+            _, log_prob, _ = policy.evaluate_actions(obs[idx], actions[idx])
+            loss = -log_prob.mean()
+            policy.optimizer.zero_grad()
+            loss.backward()
+            policy.optimizer.step()
+            total += loss.item() * len(idx)
+        with th.no_grad():
+            correct = (policy.get_distribution(obs).distribution.probs.argmax(dim=1) == actions).sum().item()
+        print(f"[BC] epoch {epoch + 1}/{epochs}: loss {total / len(obs):.4f}, accuracy {correct / len(obs):.3f}")
+    policy.set_training_mode(False)
 
 if __name__ == "__main__":
-    # Single-process vectorized env keeps SB3 happy
-    env = DummyVecEnv([make_env])
+    parser = argparse.ArgumentParser(description="Train PPO on RaceCarEnv.")
+    parser.add_argument("--n-envs", type=int, default=os.cpu_count() or 1,
+                        help="parallel envs, one worker process each (default: all cores)")
+    parser.add_argument("--batched", action="store_true",
+                        help="step all envs together in one process with batch_env.BatchRaceCarEnv")
+    parser.add_argument("--timesteps", type=int, default=200_000)
+    parser.add_argument("--pretrain", default=None, help="imitation_data.py dataset to behaviour-clone first")
+    parser.add_argument("--pretrain-epochs", type=int, default=10)
+    parser.add_argument("--seed-bank", default=None,
+                        help="seed_bank.py file: sample hard seeds more often and record every episode in it")
+    args = parser.parse_args()
+
+    if args.seed_bank:
+        # Create the bank file before any worker starts, so they all map the same one
+        from seed_bank import SeedBank
+        SeedBank(args.seed_bank).flush()
+
+    # Each RaceCarEnv owns its game state, so envs can run in worker processes side by side;
+    # observations come back through shared memory. One env stays in-process.
+    # --batched instead steps every game at once on the array-backed simulator.
+    if args.batched:
+        from batch_env import BatchRaceCarEnv
+        env = BatchRaceCarEnv(args.n_envs, max_steps=1800, sampler=make_sampler(args.seed_bank))
+    elif args.n_envs > 1:
+        env = SharedMemoryVecEnv([functools.partial(make_env, args.seed_bank) for _ in range(args.n_envs)])
+    else:
+        env = DummyVecEnv([functools.partial(make_env, args.seed_bank)])
 
     # Small MLP, reasonable defaults for a quick first pass
     policy_kwargs = dict(net_arch=[64, 64])
@@ -29,7 +100,10 @@ if __name__ == "__main__":
         policy_kwargs=policy_kwargs,
     )
 
-    model.learn(total_timesteps=200_000)
+    if args.pretrain:
+        behaviour_clone(model, args.pretrain, args.pretrain_epochs)
+
+    model.learn(total_timesteps=args.timesteps)
 
     os.makedirs("models", exist_ok=True)
     model_path = "models/ppo_racecar"
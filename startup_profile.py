@@ -0,0 +1,82 @@
+# startup_profile.py
+# What the services' --profile-startup flag prints: how long importing a service module
+# takes, split into its own code and its imports, and its slowest direct imports. The
+# import is measured with -X importtime in a fresh interpreter, so caches of the running
+# process do not hide anything.
+#
+#   python race-car/api_rl.py --profile-startup
+#   python tumor-segmentation/api.py --profile-startup
+#   python emergency-healthcare-rag/ucloud/api.py --profile-startup
+#
+# The services only import this file when the flag is given, from the repository root.
+
+import os
+import subprocess
+import sys
+from typing import Optional
+
+TOP_IMPORTS = 10
+
+
+def parse_import_report(report: str, module: str) -> Optional[dict]:
+    """
+    Timings of one module from -X importtime output.
+
+    Every line is "self | cumulative | name", with the name indented by two spaces per
+    nesting level, and a module is listed after everything it imported. So the direct
+    children of module are the depth 1 lines between the depth 0 line before it and
+    its own line; depth 0 lines of the interpreter's startup (encodings, site, ...) and
+    deeper imports are not counted.
+
+    :param report: The -X importtime output (stderr of the interpreter).
+    :param module: The name of the module imported at the top level.
+    :return: A dict with the module's "self" and "cumulative" microseconds and its direct
+        "imports" as (cumulative microseconds, name) tuples, slowest first; None if the
+        module does not appear in the report.
+    """
+    children = []
+    for line in report.splitlines():
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # The header line
+        name = fields[2].strip()
+        depth = (len(fields[2]) - len(fields[2].lstrip(" ")) - 1) // 2
+        if depth == 1:
+            children.append((int(fields[1]), name))
+        elif depth == 0:
+            if name == module:
+                return {"self": int(fields[0].split(":")[-1]), "cumulative": int(fields[1]),
+                        "imports": sorted(children, reverse=True)}
+            children = []
+    return None
+
+
+def print_startup_profile(path: str, phases: Optional[dict] = None, top: int = TOP_IMPORTS):
+    """
+    Print the startup profile of the service module at path.
+
+    :param path: The service module's file (its __file__).
+    :param phases: Optional phase -> seconds the running process recorded while loading.
+    :param top: How many direct imports to list.
+    """
+    directory, filename = os.path.split(os.path.abspath(path))
+    module = os.path.splitext(filename)[0]
+    if phases:
+        print("[startup] phases of this process:")
+        for phase, seconds in phases.items():
+            print(f"  {phase:<10} {seconds * 1000:8.1f} ms")
+        print(f"  {'total':<10} {sum(phases.values()) * 1000:8.1f} ms")
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=directory)
+    timings = parse_import_report(result.stderr, module)
+    if result.returncode != 0 or timings is None:
+        last_line = (result.stderr.strip().splitlines() or ["no output"])[-1]
+        print(f"[startup] importing {module} failed: {last_line}")
+        return
+    print(f"[startup] import {module}: {timings['cumulative'] / 1000:.1f} ms "
+          f"(own code {timings['self'] / 1000:.1f} ms, "
+          f"imports {(timings['cumulative'] - timings['self']) / 1000:.1f} ms)")
+    print(f"[startup] slowest imports of {module}:")
+    for microseconds, name in timings["imports"][:top]:
+        print(f"  {name:<30} {microseconds / 1000:8.1f} ms")
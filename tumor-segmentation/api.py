@@ -1,3 +1,5 @@
+import os
+import sys
 import uvicorn
 import time
 import datetime
@@ -54,6 +56,12 @@ def index():
 
 if __name__ == '__main__':
 
+    if "--profile-startup" in sys.argv:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+        from startup_profile import print_startup_profile
+        print_startup_profile(__file__)
+        sys.exit(0)
+
     uvicorn.run(
         'api:app',
         host=HOST,
@@ -2,8 +2,6 @@
 import numpy as np
 import cv2
 import base64 
-from matplotlib import pyplot as plt
-import matplotlib.patches as mpatches
 
 
 def validate_segmentation(pet_mip, seg_pred):
@@ -47,6 +45,9 @@ def decode_request(request) -> np.ndarray:
 
 
 def plot_prediction(mip,seg,seg_pred):
+    # matplotlib is only needed for plotting; importing it at module load slows down the API
+    from matplotlib import pyplot as plt
+    import matplotlib.patches as mpatches
 
     score = dice_score(seg,seg_pred)
     print("Dice Score:", dice_score(seg,seg_pred))